@@ -1,4 +1,8 @@
+from .backends import get_backend, set_backend
+from .ensemble import Ensemble
 from .pycap_exceptions import PycapException
+from .response_cache import RESPONSE_CACHE, ResponseCache
+from .result_cache import ResultCache
 from .solutions import (
     ALL_DD_METHODS,
     ALL_DEPL_METHODS,
@@ -20,4 +24,4 @@ from .utilities import (
     Q2ts,
     create_timeseries_template,
 )
-from .wells import Well, WellResponse
+from .wells import Well, WellField, WellResponse
@@ -0,0 +1,105 @@
+import numba
+import numpy as np
+from numba import types
+from scipy import LowLevelCallable
+
+""" Numba-compiled versions of the inner kernels of the analytical
+    solutions, used when the "numba" backend is selected with
+    pycap.set_backend. Importing this module requires numba.
+
+"""
+
+_EULER = 0.5772156649015329
+
+
+@numba.njit(cache=True)
+def _exp1(x):
+    """Exponential integral E1 for x > 0, from its power series
+    for x <= 1 and its continued fraction otherwise"""
+    if x <= 0.0:
+        return np.inf
+    if x <= 1.0:
+        total = -_EULER - np.log(x)
+        term = 1.0
+        for k in range(1, 100):
+            term *= -x / k
+            total -= term / k
+            if abs(term / k) < 1e-17 * abs(total):
+                break
+        return total
+    # modified Lentz evaluation of the continued fraction
+    b = x + 1.0
+    c = 1.0e300
+    d = 1.0 / b
+    h = d
+    for i in range(1, 200):
+        an = -float(i * i)
+        b += 2.0
+        d = 1.0 / (an * d + b)
+        c = b + an / c
+        delta = c * d
+        h *= delta
+        if abs(delta - 1.0) < 1e-16:
+            break
+    return h * np.exp(-x)
+
+
+@numba.njit(cache=True)
+def _ddwn2_scalar(theta, dist, x, y, T, streambed, time, S):
+    """Hunt (1999) drawdown integrand, see pycap.solutions._ddwn2"""
+    if streambed == 0.0:
+        return 0.0
+    u2 = ((dist + abs(x) + 2 * T * theta / streambed) ** 2 + y**2) / (
+        4.0 * T * time / S
+    )
+    return np.exp(-theta) * _exp1(u2)
+
+
+@numba.cfunc(types.double(types.intc, types.CPointer(types.double)))
+def _ddwn2_cfunc(n, xx):
+    """C callback with the scipy.integrate.quad signature, the
+    integration variable followed by the extra arguments"""
+    return _ddwn2_scalar(xx[0], xx[1], xx[2], xx[3], xx[4], xx[5], xx[6], xx[7])
+
+
+# integrand for scipy.integrate.quad in hunt_99_drawdown
+ddwn2_integrand = LowLevelCallable(_ddwn2_cfunc.ctypes)
+
+
+@numba.njit(cache=True)
+def _G_series_flat(x, r2, tol, nterms):
+    """Hunt (2003) G series for flat arrays, see
+    pycap.solutions._G_series, stopping element by element"""
+    sum1 = np.zeros(x.size)
+    for i in range(x.size):
+        xi = x[i]
+        coef = 1.0
+        P = -np.expm1(-xi)
+        d = xi * np.exp(-xi)
+        tail = np.inf
+        if 4.0 * r2[i] < 1.0:
+            tail = 1.0 / (1.0 - 4.0 * r2[i])
+        for n in range(nterms):
+            term = coef * P
+            sum1[i] += term
+            if not term * tail > tol:
+                break
+            coef *= 2.0 * (2 * n + 1) / (n + 1) * r2[i]
+            d_even = d * xi / (2 * n + 2)
+            P = max(P - d - d_even, 0.0)
+            d = d_even * xi / (2 * n + 3)
+    return sum1
+
+
+def G_series(x, r2, tol, nterms):
+    """Hunt (2003) G series, see pycap.solutions._G_series"""
+    x, r2 = np.broadcast_arrays(
+        np.asarray(x, dtype=float), np.asarray(r2, dtype=float)
+    )
+    sum1 = _G_series_flat(
+        np.ascontiguousarray(x).ravel(),
+        np.ascontiguousarray(r2).ravel(),
+        tol,
+        nterms,
+    )
+    return sum1.reshape(x.shape)
@@ -1,10 +1,18 @@
+import copy
 import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from math import asin, cos, radians, sin, sqrt
 
 import numpy as np
 import pandas as pd
 import yaml
 
+from pycap.pycap_exceptions import PycapException
+from pycap.response_cache import RESPONSE_CACHE, ResponseCache
+from pycap.result_cache import ResultCache
+from pycap.results_store import STORE_FORMATS, write_results_store
 from pycap.solutions import GPM2CFD
 from pycap.utilities import Q2ts
 from pycap.wells import Well
@@ -39,6 +47,223 @@ def _loc_to_dist(loc0, loc1):
     return dist
 
 
+def _distance_matrix(loc0, loc1, crs=None, distance_crs=None):
+    """
+    Distances between every point in loc0 and every point in loc1,
+    returned in feet, calculated in a single array operation
+
+    Locations in a geographic coordinate reference system (the default,
+    lat/long in decimal degrees) use the Haversine Formula, as in
+    _loc_to_dist, and locations in a projected coordinate reference system
+    use the straight-line distance in the units of the system. If
+    distance_crs is given, all locations are first transformed from crs
+    to distance_crs in one batch and the distances are calculated there.
+
+    Parameters
+    ----------
+    loc0: array-like of pairs of floats
+        n0 point locations as x (or long), y (or lat) pairs
+    loc1: array-like of pairs of floats
+        n1 point locations as x (or long), y (or lat) pairs
+    crs: optional, anything accepted by pyproj.CRS.from_user_input
+        coordinate reference system of the locations, e.g. "EPSG:3071".
+        Defaults to lat/long in decimal degrees.
+    distance_crs: optional, anything accepted by pyproj.CRS.from_user_input
+        coordinate reference system in which to calculate distances.
+        Defaults to crs.
+
+    Returns
+    -------
+    dist: np.array
+        (n0, n1) array of distances between loc0 and loc1 in feet
+    """
+    loc0 = np.asarray(loc0, dtype=float).reshape(-1, 2)
+    loc1 = np.asarray(loc1, dtype=float).reshape(-1, 2)
+    if crs is None and distance_crs is None:
+        return _haversine_matrix(loc0, loc1)
+
+    try:
+        crs, distance_crs, transformer = _pyproj_crs(crs, distance_crs)
+    except TypeError:
+        # unhashable definitions (e.g. dicts) are not cached
+        crs, distance_crs, transformer = _pyproj_crs.__wrapped__(
+            crs, distance_crs
+        )
+    if distance_crs is not None:
+        x, y = transformer.transform(
+            np.concatenate([loc0[:, 0], loc1[:, 0]]),
+            np.concatenate([loc0[:, 1], loc1[:, 1]]),
+        )
+        xy = np.column_stack([x, y])
+        loc0, loc1 = xy[: len(loc0)], xy[len(loc0) :]
+        crs = distance_crs
+    if crs.is_geographic:
+        return _haversine_matrix(loc0, loc1)
+    # straight-line distance, converted from the units of the crs to feet
+    to_feet = crs.axis_info[0].unit_conversion_factor / 0.3048
+    return (
+        np.hypot(
+            loc0[:, 0, None] - loc1[None, :, 0],
+            loc0[:, 1, None] - loc1[None, :, 1],
+        )
+        * to_feet
+    )
+
+
+@lru_cache(maxsize=None)
+def _pyproj_crs(crs, distance_crs):
+    """
+    pyproj coordinate reference systems for crs and distance_crs (see
+    _distance_matrix) and the transformer between them, created once in
+    each process and shared by all Projects
+    """
+    import pyproj
+
+    crs = pyproj.CRS.from_user_input("EPSG:4326" if crs is None else crs)
+    if distance_crs is None:
+        return crs, None, None
+    distance_crs = pyproj.CRS.from_user_input(distance_crs)
+    transformer = pyproj.Transformer.from_crs(
+        crs, distance_crs, always_xy=True
+    )
+    return crs, distance_crs, transformer
+
+
+def _haversine_matrix(loc0, loc1):
+    """
+    Haversine distances in feet between every point in loc0 and every
+    point in loc1, both (n, 2) arrays of long, lat in decimal degrees
+    """
+    lon0, lat0 = np.radians(loc0[:, 0, None]), np.radians(loc0[:, 1, None])
+    lon1, lat1 = np.radians(loc1[None, :, 0]), np.radians(loc1[None, :, 1])
+    a = (
+        np.sin((lat1 - lat0) / 2) ** 2
+        + np.cos(lat0) * np.cos(lat1) * np.sin((lon1 - lon0) / 2) ** 2
+    )
+    r = 3956 * 5280  # radius of the earth in feet
+    return 2 * np.arcsin(np.sqrt(a)) * r
+
+
+# C implementation of the safe YAML loader, when available,
+# which parses large project files much faster
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# file extensions of the columnar formats for a pumping time series,
+# which are read with pyarrow
+TIMESERIES_FORMATS = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".ipc": "feather",
+}
+
+
+def _read_pumping_timeseries(tsfile, wells):
+    """
+    Read a pumping time series file with a sequential_day column and
+    a column of pumping rates for each well
+
+    Parquet, Feather and Arrow IPC files (TIMESERIES_FORMATS) are read
+    with pyarrow using multiple threads, and any other file is read as
+    CSV (with the multi-threaded pyarrow parser if pyarrow is installed).
+    Only the sequential_day column and the columns for the wells are
+    read, and the rates are returned as a single contiguous float array.
+
+    Parameters
+    ----------
+    tsfile: str or pathlib.Path
+        path to the time series file
+    wells: list of str
+        names of the well columns to read. Names that are not columns
+        in the file are skipped.
+
+    Returns
+    -------
+    Q_ts: pd.DataFrame
+        pumping rates indexed by sequential_day with a column for each well
+    """
+    fmt = TIMESERIES_FORMATS.get(os.path.splitext(str(tsfile))[1].lower())
+    try:
+        import pyarrow
+    except ImportError:
+        pyarrow = None
+        if fmt is not None:
+            raise PycapException(
+                f"pyarrow is required to read the {fmt} file {tsfile}"
+            )
+
+    if fmt is None:
+        names = pd.read_csv(tsfile, nrows=0).columns
+        columns = ["sequential_day"] + [i for i in names if i in wells]
+        df = pd.read_csv(
+            tsfile,
+            usecols=columns,
+            engine="c" if pyarrow is None else "pyarrow",
+        )
+    else:
+        if fmt == "parquet":
+            import pyarrow.parquet as pa_format
+
+            names = pa_format.read_schema(tsfile).names
+        else:
+            import pyarrow.feather as pa_format
+            import pyarrow.ipc
+
+            names = pyarrow.ipc.open_file(tsfile).schema.names
+        columns = ["sequential_day"] + [i for i in names if i in wells]
+        df = pa_format.read_table(
+            tsfile, columns=columns, use_threads=True
+        ).to_pandas()
+    if df.index.name != "sequential_day":
+        df = df.set_index("sequential_day")
+    # keep the file order of the well columns, without duplicates
+    columns = list(dict.fromkeys(i for i in df.columns if i in wells))
+    return pd.DataFrame(
+        np.ascontiguousarray(df[columns].to_numpy(dtype=float)),
+        index=df.index,
+        columns=columns,
+    )
+
+
+# relative cost of evaluating each solution for one time, used to
+# schedule the most expensive responses first on a process pool
+SOLUTION_COST = {
+    "theis_drawdown": 1,
+    "glover_depletion": 1,
+    "walton_depletion": 1,
+    "hunt_99_depletion": 2,
+    "hunt_03_depletion": 50,
+    "hunt_99_drawdown": 100,
+    "ward_lough_depletion": 200,
+    "ward_lough_drawdown": 500,
+}
+
+
+# results for all wells (labeled by name and status) and responses
+# (labeled by name), with a mask of the well-response pairs present
+ProjectResults = namedtuple(
+    "ProjectResults", ["wells", "status", "responses", "values", "present"]
+)
+
+
+def _evaluate_responses(responses):
+    """Evaluate a group of well responses, in a worker process
+
+    Parameters
+    ----------
+    responses: list of tuples
+        (WellResponse, response) pairs, where response is
+        either 'drawdown' or 'depletion'
+
+    Returns
+    -------
+    results: list of np.arrays
+        drawdown or depletion time series for each pair
+    """
+    return [getattr(wr, response) for wr, response in responses]
+
+
 def _print_to_screen_and_file(s, ofp):
     """function to print formatted output to both
     the screen and a file
@@ -110,7 +335,7 @@ def _print_combined_well_results(ofp, cw_dat):
 
 
 class Project:
-    def __init__(self, ymlfile):
+    def __init__(self, ymlfile, n_workers=1, result_cache=None):
         """
         Highest-level Class for a well drawdown and/or depletion analysis.
         This Class is developed for the specific analysis needs of the
@@ -123,6 +348,18 @@ class Project:
         ----------
         ymlfile: string or pathlib.Path
             Path to a yml file containing configuration information for a project.
+        n_workers: int, optional
+            Number of worker processes used to evaluate the well responses.
+            If greater than 1, all responses are evaluated when the Project
+            is created, on a process pool, with the most expensive responses
+            scheduled first. Results do not depend on the number of workers
+            and aggregation is done in the calling process. Defaults to 1.
+        result_cache: string, pathlib.Path or ResultCache, optional
+            Directory of (or a) persistent cache of the results of each
+            well-response pair. Pairs whose inputs did not change since
+            a previous run are loaded from the cache instead of being
+            evaluated. Defaults to None, which uses the result_cache entry
+            of the project_properties block, if any, or no cache.
 
 
         """
@@ -147,13 +384,34 @@ class Project:
         self.depl_method = (
             "walton_depletion"  # default, can specify in the yml file
         )
+        self.superposition = "loop"  # default, can specify in the yml file
+        # unit-rate step responses shared by all wells in the process,
+        # unless a size for a cache of this project is in the yml file
+        self.response_cache = RESPONSE_CACHE
         self.ts_len = np.inf
+        if int(n_workers) != n_workers or n_workers < 1:
+            raise PycapException(
+                f"n_workers must be a positive integer, not {n_workers}"
+            )
+        self.n_workers = int(n_workers)
         self.__dd_responses = None
         self.__stream_responses = None
+        # coordinate reference systems of the locations and for
+        # calculating distances, can specify in the yml file
+        self.crs = None
+        self.distance_crs = None
+        self.stream_distances = None
+        self.dd_distances = None
+        # format for write_responses, can specify in the yml file
+        self.output_format = "csv"
+        # persistent cache of well response results, can specify
+        # the directory and size in the yml file
+        self.result_cache = result_cache
+        self.result_cache_size_mb = None
 
         self.ymlfile = ymlfile
         with open(ymlfile) as ifp:
-            d = yaml.safe_load(ifp)
+            d = yaml.load(ifp, Loader=YAML_LOADER)
         # make a home for the report file
         self.outpath = self.ymlfile.parent / "output"
         if not os.path.exists(self.outpath):
@@ -167,6 +425,8 @@ class Project:
                 'Configuration YAML file must have a "project_properties" block'
             )
 
+        self._open_result_cache()
+
         # get the keys for all the remaining blocks
         self.wellkeys = [i for i in d.keys() if i.lower().startswith("well")]
         self.ddkeys = [i for i in d.keys() if i.lower().startswith("dd_resp")]
@@ -179,7 +439,11 @@ class Project:
         if "pumping_timeseries_file" in d["project_properties"].keys():
             self.tsfile = d["project_properties"]["pumping_timeseries_file"]
             self.ts = True
-            self.Q_ts = pd.read_csv(self.tsfile).set_index("sequential_day")
+            # only read the columns for the wells in the yml file
+            self.Q_ts = _read_pumping_timeseries(
+                self.tsfile,
+                self.wellkeys + [d[ck]["name"] for ck in self.wellkeys],
+            )
             # first test, if there is a time series file that all well keys are columns
             if self.ts is True:
                 try:
@@ -214,9 +478,16 @@ class Project:
         # TODO: verify that stream apportionment and stream response are same keys for a well
         # TODO: verify that all responses called out in wells exist in yaml file
 
+        # calculate distances between all wells and responses
+        self._calc_distances()
+
         # create well objects
         self._create_well_objects()
 
+        # evaluate the well responses on a process pool
+        if self.n_workers > 1:
+            self._evaluate_responses_parallel()
+
         # report out on yaml input to screen and logfile
         self._report_yaml_input()
 
@@ -230,6 +501,30 @@ class Project:
         """
         if "depl_method" in pp.keys():
             self.depl_method = pp["depl_method"]
+        if "superposition" in pp.keys():
+            self.superposition = pp["superposition"]
+        if "response_cache_size" in pp.keys():
+            size = pp["response_cache_size"]
+            if isinstance(size, bool) or not isinstance(
+                size, (int, np.integer)
+            ):
+                raise PycapException(
+                    "response_cache_size must be an integer, not "
+                    + f"{size}"
+                )
+            # a cache of this project only, so the size does not change
+            # the cache shared by other projects in the process
+            self.response_cache = ResponseCache(maxsize=int(size))
+        if "crs" in pp.keys():
+            self.crs = pp["crs"]
+        if "distance_crs" in pp.keys():
+            self.distance_crs = pp["distance_crs"]
+        if "output_format" in pp.keys():
+            self.output_format = pp["output_format"]
+        if "result_cache" in pp.keys() and self.result_cache is None:
+            self.result_cache = pp["result_cache"]
+        if "result_cache_size_mb" in pp.keys():
+            self.result_cache_size_mb = float(pp["result_cache_size_mb"])
         try:
             self.name = pp["name"]
             self.T = pp["T"]
@@ -245,6 +540,29 @@ class Project:
         except:
             raise ('Formatting problem with "project_properties" block')
 
+    def _open_result_cache(self):
+        """Open the persistent result cache, if any. A result_cache of True
+        uses a result_cache directory in the output directory, and
+        relative paths are relative to the directory of the yml file."""
+        self._result_cache_start = (0, 0)
+        if self.result_cache is None or self.result_cache is False:
+            self.result_cache = None
+            return
+        if not isinstance(self.result_cache, ResultCache):
+            if self.result_cache is True:
+                directory = self.outpath / "result_cache"
+            else:
+                directory = self.ymlfile.parent / self.result_cache
+            kwargs = {}
+            if self.result_cache_size_mb is not None:
+                kwargs["maxsize"] = int(self.result_cache_size_mb * 2**20)
+            self.result_cache = ResultCache(directory, **kwargs)
+        elif self.result_cache_size_mb is not None:
+            self.result_cache.maxsize = int(self.result_cache_size_mb * 2**20)
+        # counters at the start, to report the results of this Project
+        info = self.result_cache.info()
+        self._result_cache_start = (info.hits, info.misses)
+
     def _parse_responses(self, keys, d):
         """populate information about the responses to pull from in calculations
 
@@ -313,12 +631,46 @@ class Project:
                         d[ck][cak]["name"]
                     ] = d[ck][cak]["apportionment"]
 
+    def _calc_distances(self):
+        """
+        Calculate the distances between all wells and all stream and
+        drawdown responses at once, stored as DataFrames (stream_distances
+        and dd_distances) of distance in feet indexed by well name with a
+        column for each response name
+        """
+        wells = list(self._Project__well_data.keys())
+        well_loc = [
+            [cw["loc"]["x"], cw["loc"]["y"]]
+            for cw in self._Project__well_data.values()
+        ]
+        for attr, responses in (
+            ("stream_distances", self._Project__stream_responses),
+            ("dd_distances", self._Project__dd_responses),
+        ):
+            if responses is None:
+                continue
+            resp_loc = [[cr["x"], cr["y"]] for cr in responses.values()]
+            setattr(
+                self,
+                attr,
+                pd.DataFrame(
+                    _distance_matrix(
+                        well_loc, resp_loc, self.crs, self.distance_crs
+                    ),
+                    index=wells,
+                    columns=list(responses.keys()),
+                ),
+            )
+
     def _create_well_objects(self):
         """
         Prepare to populate a Well object for each well,
         using the attributes of each well and response
         """
 
+        if self.ts is True:
+            # convert all of the pumping rates to CFD at once
+            Q_cfd = self.Q_ts.to_numpy() * GPM2CFD
         for ck, cw in self._Project__well_data.items():
             # update defaults as appropriate
             for currdef in self.defaults:
@@ -327,16 +679,14 @@ class Project:
             # calculate all necessary distances
             # first streams
             stream_dist = None
+            streambed_conductance = None
             if "stream_response" in cw.keys():
-                stream_dist = {}
+                stream_dist = self.stream_distances.loc[
+                    ck, cw["stream_response"]
+                ].to_dict()
                 streambed_conductance = {}
                 streambed_cond_calc = 0
                 for c_resp in cw["stream_response"]:
-                    streamx = self._Project__stream_responses[c_resp]["x"]
-                    streamy = self._Project__stream_responses[c_resp]["y"]
-                    stream_dist[c_resp] = _loc_to_dist(
-                        [cw["loc"]["x"], cw["loc"]["y"]], [streamx, streamy]
-                    )
                     if (
                         "streambed_conductance"
                         in self._Project__stream_responses[c_resp].keys()
@@ -353,27 +703,22 @@ class Project:
             # next, drawdowns
             dd_dist = None
             if "dd_response" in cw.keys():
-                dd_dist = {}
-                streambed_cond_calc = 0
-
+                dd_dist = self.dd_distances.loc[
+                    ck, cw["dd_response"]
+                ].to_dict()
                 for c_resp in cw["dd_response"]:
-                    ddx = self._Project__dd_responses[c_resp]["x"]
-                    ddy = self._Project__dd_responses[c_resp]["y"]
-                    dd_dist[c_resp] = _loc_to_dist(
-                        [cw["loc"]["x"], cw["loc"]["y"]], [ddx, ddy]
-                    )
                     if (
                         "streambed_conductance"
                         in self._Project__dd_responses[c_resp].keys()
                     ):
+                        # keep the conductances of the stream responses
+                        if streambed_conductance is None:
+                            streambed_conductance = {}
                         streambed_conductance[c_resp] = (
                             self._Project__dd_responses[c_resp][
                                 "streambed_conductance"
                             ]
                         )
-                        streambed_cond_calc += 1
-                    if streambed_cond_calc < 1:
-                        streambed_conductance = None
             if ck in self.stream_apportionment_dict.keys():
                 stream_app_d = self.stream_apportionment_dict[ck]
             else:
@@ -381,7 +726,10 @@ class Project:
 
             # sort out the time series for wells and convert to CFD
             if self.ts is True:
-                Q = self.Q_ts[ck] * GPM2CFD
+                Q = pd.Series(
+                    Q_cfd[:, self.Q_ts.columns.get_loc(ck)],
+                    index=self.Q_ts.index,
+                )
             else:
                 Q = (
                     Q2ts(
@@ -401,8 +749,49 @@ class Project:
                 stream_apportionment=stream_app_d,
                 depl_method=self.depl_method,
                 streambed_conductance=streambed_conductance,
+                superposition=self.superposition,
+                response_cache=self.response_cache,
+                result_cache=self.result_cache,
             )
 
+    def _evaluate_responses_parallel(self):
+        """Evaluate the drawdown and depletion of all well responses
+        on a pool of n_workers processes
+
+        Responses that share a unit-rate step response in the response
+        cache are evaluated together, in the order of the wells, so the
+        results are the same for any number of workers. Groups are
+        submitted in order of decreasing cost (longest job first) and the
+        results are stored on the WellResponse objects in this process.
+        Results found in the result cache are loaded instead of evaluated,
+        and new results are saved to it by this process.
+        """
+        groups = {}
+        for cw in self.wells.values():
+            for response, wrs in (
+                ("drawdown", cw.drawdown_responses),
+                ("depletion", cw.stream_responses),
+            ):
+                for wr in wrs.values():
+                    if wr._load(response):
+                        continue
+                    groups.setdefault(wr._cache_key(response), []).append(
+                        (wr, response)
+                    )
+
+        def _cost(group):
+            wr, response = group[0]
+            method, _ = wr._solution(response)
+            return len(wr.Q) * (SOLUTION_COST.get(method, 1) + len(group))
+
+        jobs = sorted(groups.values(), key=_cost, reverse=True)
+        with ProcessPoolExecutor(max_workers=self.n_workers) as pool:
+            all_results = pool.map(_evaluate_responses, jobs)
+            for group, results in zip(jobs, all_results):
+                for (wr, response), result in zip(group, results):
+                    wr._store(response, result)
+                    wr._save(response)
+
     def _report_yaml_input(self):
         """
         summarize broad details of the YAML file read in
@@ -539,174 +928,349 @@ class Project:
     def aggregate_results(self):
         """
         Aggregate all results from the Project
+
+        Depletion of all existing and proposed wells at all stream responses
+        is collected once into a preallocated (well x response x time) array
+        (depletion_results) and drawdown at the drawdown time of each well
+        into a (well x response) array (drawdown_results). The existing,
+        proposed and total aggregations are sums over masks of the wells,
+        grouped by base stream name where needed, and the dictionaries of
+        aggregated results are views of those sums. With a result cache,
+        the numbers of results loaded from the cache and evaluated are
+        printed and saved as result_cache_hits and result_cache_misses.
         """
-        # make a master dataframe for all the results
-        times = range(1, self.ts_len + 1)
-        self.all_depl_ts = pd.DataFrame(index=times)
-
-        # make dictionaries to contain the drawdown results
-        self.existing_aggregated_drawdown = {}
-        self.proposed_aggregated_drawdown = {}
-        self.total_aggregated_drawdown = {}
-
-        # make dictionaries to contain the max_depletion results
-        self.existing_aggregated_max_depletion = {}
-        self.proposed_aggregated_max_depletion = {}
-        self.total_aggregated_max_depletion = {}
-
-        # make dictionaries to contain the sum_depletion results
-        self.existing_aggregated_sum_depletion = {}
-        self.proposed_aggregated_sum_depletion = {}
-        self.total_aggregated_sum_depletion = {}
-
-        # make dictionaries to contain the sum of depletion for each base stream name
-        self.existing_aggregated_base_stream_sum_depletion = {}
-        self.proposed_aggregated_base_stream_sum_depletion = {}
-        self.total_aggregated_base_stream_sum_depletion = {}
-        self.base_streams = []
-
-        # first existing wells
-        for cwell in self.existing_wells:
-            cw_dd = self.wells[cwell].drawdown
-            for ck, v in cw_dd.items():
-                if ck not in self.existing_aggregated_drawdown.keys():
-                    self.existing_aggregated_drawdown[ck] = v[
-                        self.wells[cwell].theis_dd_days
-                    ]
-                else:
-                    self.existing_aggregated_drawdown[ck] += v[
-                        self.wells[cwell].theis_dd_days
-                    ]
-            # first sum up depletion time series per well to later get max of sum by location
-            cw_dep = self.wells[cwell].depletion
-            cw_dep = {k: v / 3600 / 24 for k, v in cw_dep.items()}
-            for ck, v in cw_dep.items():
-                self.all_depl_ts = pd.concat(
-                    (
-                        self.all_depl_ts,
-                        pd.DataFrame(index=self.all_depl_ts.index, data=v),
-                    ),
-                    axis=1,
-                ).rename(columns={0: ck})
-                if ck not in self.existing_aggregated_sum_depletion.keys():
-                    self.existing_aggregated_sum_depletion[ck] = v
-                else:
-                    self.existing_aggregated_sum_depletion[ck] += v
-                # also parse to base stream name
-                base_key = ck.split(":")[0]
-                if base_key not in self.base_streams:
-                    self.base_streams.append(base_key)
-                if (
-                    base_key
-                    not in self.existing_aggregated_base_stream_sum_depletion.keys()
-                ):
-                    self.existing_aggregated_base_stream_sum_depletion[
-                        base_key
-                    ] = v
-                else:
-                    self.existing_aggregated_base_stream_sum_depletion[
-                        base_key
-                    ] += v
-
-            # then oldskool max per location
-            cw_max_dep = self.wells[cwell].max_depletion
-            cw_max_dep = {k: v / 3600 / 24 for k, v in cw_max_dep.items()}
-            for ck, v in cw_max_dep.items():
-                if ck not in self.existing_aggregated_max_depletion.keys():
-                    self.existing_aggregated_max_depletion[ck] = v
-                else:
-                    self.existing_aggregated_max_depletion[ck] += v
-
-        # next proposed wells
-        for cwell in self.proposed_wells:
-            cw_dd = self.wells[cwell].drawdown
-            for ck, v in cw_dd.items():
-                if ck not in self.proposed_aggregated_drawdown.keys():
-                    self.proposed_aggregated_drawdown[ck] = v[
-                        self.wells[cwell].theis_dd_days
-                    ]
-                else:
-                    self.proposed_aggregated_drawdown[ck] += v[
-                        self.wells[cwell].theis_dd_days
-                    ]
-            # first sum up depletion time series per well to later get max of sum by location
-            cw_dep = self.wells[cwell].depletion
-            cw_dep = {k: v / 3600 / 24 for k, v in cw_dep.items()}
-            for ck, v in cw_dep.items():
-                self.all_depl_ts = pd.concat(
-                    (
-                        self.all_depl_ts,
-                        pd.DataFrame(index=self.all_depl_ts.index, data=v),
-                    ),
-                    axis=1,
-                ).rename(columns={0: ck})
-                if ck not in self.proposed_aggregated_sum_depletion.keys():
-                    self.proposed_aggregated_sum_depletion[ck] = v
-                else:
-                    self.proposed_aggregated_sum_depletion[ck] += v
-                # also parse to base stream name
-                base_key = ck.split(":")[0]
-                if (
-                    base_key
-                    not in self.proposed_aggregated_base_stream_sum_depletion.keys()
-                ):
-                    self.proposed_aggregated_base_stream_sum_depletion[
-                        base_key
-                    ] = v
-                else:
-                    self.proposed_aggregated_base_stream_sum_depletion[
-                        base_key
-                    ] += v
-            # then oldskool max per location
-            cw_max_dep = self.wells[cwell].max_depletion
-            cw_max_dep = {k: v / 3600 / 24 for k, v in cw_max_dep.items()}
-            for ck, v in cw_max_dep.items():
-                if ck not in self.proposed_aggregated_max_depletion.keys():
-                    self.proposed_aggregated_max_depletion[ck] = v
-                else:
-                    self.proposed_aggregated_max_depletion[ck] += v
-
-        # finally calculate the totals
-        for cwell in self.existing_wells + self.proposed_wells:
-            cw_dd = self.wells[cwell].drawdown
-            for ck, v in cw_dd.items():
-                if ck not in self.total_aggregated_drawdown.keys():
-                    self.total_aggregated_drawdown[ck] = v[
-                        self.wells[cwell].theis_dd_days
-                    ]
-                else:
-                    self.total_aggregated_drawdown[ck] += v[
-                        self.wells[cwell].theis_dd_days
-                    ]
-            # first sum up depletion time series per well to later get max of sum by location
-            cw_dep = self.wells[cwell].depletion
-            cw_dep = {k: v / 3600 / 24 for k, v in cw_dep.items()}
-            for ck, v in cw_dep.items():
-                if ck not in self.total_aggregated_sum_depletion.keys():
-                    self.total_aggregated_sum_depletion[ck] = v
-                else:
-                    self.total_aggregated_sum_depletion[ck] += v
-                # also parse to base stream name
-                base_key = ck.split(":")[0]
-                if (
-                    base_key
-                    not in self.total_aggregated_base_stream_sum_depletion.keys()
-                ):
-                    self.total_aggregated_base_stream_sum_depletion[
-                        base_key
-                    ] = v
-                else:
-                    self.total_aggregated_base_stream_sum_depletion[
-                        base_key
-                    ] += v
-            # then oldskool max per location
-            cw_max_dep = self.wells[cwell].max_depletion
-            cw_max_dep = {k: v / 3600 / 24 for k, v in cw_max_dep.items()}
-            for ck, v in cw_max_dep.items():
-                if ck not in self.total_aggregated_max_depletion.keys():
-                    self.total_aggregated_max_depletion[ck] = v
-                else:
-                    self.total_aggregated_max_depletion[ck] += v
+        wells = self.existing_wells + self.proposed_wells
+        status = np.array(
+            ["existing"] * len(self.existing_wells)
+            + ["proposed"] * len(self.proposed_wells)
+        )
+        # response names for each well, in the order of the wells
+        dd_names = {
+            cwell: list(self.wells[cwell].drawdown.keys()) for cwell in wells
+        }
+        depl_names = {
+            cwell: list(self.wells[cwell].depletion.keys()) for cwell in wells
+        }
+        dd_index = {
+            ck: i
+            for i, ck in enumerate(
+                dict.fromkeys(ck for cwell in wells for ck in dd_names[cwell])
+            )
+        }
+        depl_index = {
+            ck: i
+            for i, ck in enumerate(
+                dict.fromkeys(
+                    ck for cwell in wells for ck in depl_names[cwell]
+                )
+            )
+        }
+
+        # preallocate and fill the result arrays
+        dd_values = np.zeros((len(wells), len(dd_index)))
+        dd_present = np.zeros(dd_values.shape, dtype=bool)
+        depl_values = np.zeros((len(wells), len(depl_index), self.ts_len))
+        depl_present = np.zeros(depl_values.shape[:2], dtype=bool)
+        for i, cwell in enumerate(wells):
+            cw = self.wells[cwell]
+            for ck, v in cw.drawdown.items():
+                dd_values[i, dd_index[ck]] = v[cw.theis_dd_days]
+                dd_present[i, dd_index[ck]] = True
+            for ck, v in cw.depletion.items():
+                depl_values[i, depl_index[ck]] = v / 3600 / 24
+                depl_present[i, depl_index[ck]] = True
+        self.drawdown_results = ProjectResults(
+            wells, status, list(dd_index), dd_values, dd_present
+        )
+        self.depletion_results = ProjectResults(
+            wells, status, list(depl_index), depl_values, depl_present
+        )
+
+        # one column of depletion time series for each well and response
+        columns = [
+            (i, ck)
+            for i, cwell in enumerate(wells)
+            for ck in depl_names[cwell]
+        ]
+        self.all_depl_ts = pd.DataFrame(
+            index=range(1, self.ts_len + 1),
+            data=depl_values[
+                [i for i, _ in columns], [depl_index[ck] for _, ck in columns]
+            ].T,
+            columns=[ck for _, ck in columns],
+        )
+
+        # group responses by base stream name
+        base_names = [ck.split(":")[0] for ck in depl_index]
+        base_index = {
+            base_key: i for i, base_key in enumerate(dict.fromkeys(base_names))
+        }
+        response_base = np.array(
+            [base_index[base_key] for base_key in base_names], dtype=int
+        )
+        # base streams are listed in the order found in the existing wells
+        self.base_streams = list(
+            dict.fromkeys(
+                ck.split(":")[0]
+                for cwell in self.existing_wells
+                for ck in depl_names[cwell]
+            )
+        )
+
+        for category, mask in (
+            ("existing", status == "existing"),
+            ("proposed", status == "proposed"),
+            ("total", np.ones(len(wells), dtype=bool)),
+        ):
+            # response names in the order found in the wells of the category
+            cwells = [cwell for cwell, m in zip(wells, mask) if m]
+            cat_dd = dict.fromkeys(ck for cw in cwells for ck in dd_names[cw])
+            cat_depl = dict.fromkeys(
+                ck for cw in cwells for ck in depl_names[cw]
+            )
+            cat_base = dict.fromkeys(ck.split(":")[0] for ck in cat_depl)
+
+            dd_sum = dd_values[mask].sum(axis=0)
+            depl_sum = depl_values[mask].sum(axis=0)
+            max_sum = np.where(
+                depl_present[mask],
+                np.nanmax(depl_values[mask], axis=2),
+                0.0,
+            ).sum(axis=0)
+            base_sum = np.zeros((len(base_index), self.ts_len))
+            np.add.at(base_sum, response_base, depl_sum)
+
+            setattr(
+                self,
+                f"{category}_aggregated_drawdown",
+                {ck: dd_sum[dd_index[ck]] for ck in cat_dd},
+            )
+            setattr(
+                self,
+                f"{category}_aggregated_max_depletion",
+                {ck: max_sum[depl_index[ck]] for ck in cat_depl},
+            )
+            setattr(
+                self,
+                f"{category}_aggregated_sum_depletion",
+                {ck: depl_sum[depl_index[ck]] for ck in cat_depl},
+            )
+            setattr(
+                self,
+                f"{category}_aggregated_base_stream_sum_depletion",
+                {
+                    base_key: base_sum[base_index[base_key]]
+                    for base_key in cat_base
+                },
+            )
+
+        # all results are evaluated, so report the use of the result cache
+        if self.result_cache is not None:
+            info = self.result_cache.info()
+            self.result_cache_hits = info.hits - self._result_cache_start[0]
+            self.result_cache_misses = (
+                info.misses - self._result_cache_start[1]
+            )
+            print(
+                f"result cache: {self.result_cache_hits} results loaded, "
+                + f"{self.result_cache_misses} results evaluated"
+            )
+
+    def max_pumping_rates(
+        self,
+        depletion_limit=None,
+        drawdown_limit=None,
+        streamflow=None,
+        wells=None,
+        include_pending=False,
+    ):
+        """
+        Largest pumping rate of each proposed well that keeps the total
+        maximum depletion at each stream response and the total drawdown
+        at each drawdown response (as reported by aggregate_results) at or
+        below their limits, with the existing wells at their rates
+
+        All of the solutions, and superposition in time, are linear in the
+        pumping rate, so the depletion and drawdown of a well scale with its
+        pumping schedule. The allowable rate is found directly from the
+        response of each proposed well to its schedule in the yml file
+        (pumping days or time series), scaled to meet the tightest limit
+        after the background of the existing wells, without running the
+        Project again.
+
+        Parameters
+        ----------
+        depletion_limit: float or dict, optional
+            limit of the total maximum depletion at each stream response
+            [cfs], either one value for all responses or a dict by response
+            name (responses that are not in the dict are not limited).
+            Defaults to None, which does not limit depletion.
+        drawdown_limit: float or dict, optional
+            limit of the total drawdown at each drawdown response [ft],
+            as for depletion_limit. Defaults to None.
+        streamflow: float or dict, optional
+            streamflow at each stream response [cfs]. If given,
+            depletion_limit is a percentage of the streamflow.
+            Defaults to None.
+        wells: list, optional
+            names of the proposed wells to solve for. Defaults to None,
+            which is all proposed wells.
+        include_pending: bool, optional
+            include the other proposed wells, at their rates, in the
+            background. Defaults to False, so each proposed well is
+            evaluated with only the existing wells.
+
+        Returns
+        -------
+        rates: pd.DataFrame
+            for each proposed well, the maximum rate (max_Q) in gpm (the
+            largest rate of a time series), the factor on its schedule
+            (scale), the binding constraint (response name and type, its
+            limit and the background of the other wells), or an infinite
+            max_Q if no limited response is affected by the well
+        """
+        if wells is None:
+            wells = self.proposed_wells
+
+        def _limits(limit, names):
+            if limit is None:
+                return {}
+            if isinstance(limit, dict):
+                return {k: v for k, v in limit.items() if k in names}
+            return dict.fromkeys(names, limit)
+
+        stream_names = list(
+            dict.fromkeys(
+                ck for cw in self.wells.values() for ck in cw.depletion
+            )
+        )
+        dd_names = list(
+            dict.fromkeys(
+                ck for cw in self.wells.values() for ck in cw.drawdown
+            )
+        )
+        limits = {
+            "depletion": _limits(depletion_limit, stream_names),
+            "drawdown": _limits(drawdown_limit, dd_names),
+        }
+        if streamflow is not None:
+            flows = _limits(streamflow, stream_names)
+            limits["depletion"] = {
+                k: v / 100 * flows[k]
+                for k, v in limits["depletion"].items()
+                if k in flows
+            }
+
+        def _contributions(cw):
+            # total maximum depletion in cfs and drawdown at the
+            # drawdown time in ft, as in aggregate_results
+            return {
+                "depletion": {
+                    ck: np.nanmax(v) / 3600 / 24
+                    for ck, v in cw.depletion.items()
+                },
+                "drawdown": {
+                    ck: v[cw.theis_dd_days] for ck, v in cw.drawdown.items()
+                },
+            }
+
+        contributions = {
+            cwell: _contributions(self.wells[cwell])
+            for cwell in self.existing_wells + self.proposed_wells
+        }
+
+        rows = []
+        for cwell in wells:
+            if cwell not in self.proposed_wells:
+                raise PycapException(f"{cwell} is not a proposed well")
+            background_wells = list(self.existing_wells)
+            if include_pending:
+                background_wells += [
+                    i for i in self.proposed_wells if i != cwell
+                ]
+            # rate of the schedule in the yml file, in gpm
+            if self.ts is True:
+                rate = float(np.max(self.Q_ts[cwell]))
+            else:
+                rate = float(self._Project__well_data[cwell]["Q"])
+            well_contributions = contributions[cwell]
+            if rate == 0 and self.ts is False:
+                # evaluate the schedule with a unit rate instead
+                unit_well = copy.copy(self.wells[cwell])
+                cw = self._Project__well_data[cwell]
+                unit_well.Q = (
+                    Q2ts(cw["pumping_days"], int(cw["depletion_years"]), 1.0)
+                    * GPM2CFD
+                )
+                well_contributions = _contributions(unit_well)
+                rate = 1.0
+            row = {
+                "well": cwell,
+                "max_Q": np.inf,
+                "scale": np.inf,
+                "binding_response": None,
+                "binding_type": None,
+                "limit": np.nan,
+                "background": np.nan,
+            }
+            for kind, kind_limits in limits.items():
+                for ck, limit in kind_limits.items():
+                    response = well_contributions[kind].get(ck, 0.0)
+                    if not response > 0:
+                        continue
+                    background = sum(
+                        contributions[i][kind].get(ck, 0.0)
+                        for i in background_wells
+                    )
+                    scale = max((limit - background) / response, 0.0)
+                    if scale < row["scale"]:
+                        row.update(
+                            {
+                                "scale": scale,
+                                "binding_response": ck,
+                                "binding_type": kind,
+                                "limit": limit,
+                                "background": background,
+                            }
+                        )
+            if rate == 0:
+                # a time series of zeros cannot be scaled
+                row["scale"] = np.nan
+            row["max_Q"] = row["scale"] * rate
+            rows.append(row)
+        return pd.DataFrame(rows).set_index("well")
+
+    def write_responses(self, output_format=None):
+        """
+        Write all responses in the output format of the Project, either the
+        CSV tables of write_responses_csv (the default) or a binary store
+        of the depletion and drawdown of every well at every response and
+        the aggregated results (see pycap.results_store). The store is
+        written to the output directory, named from the YML name.
+
+        Parameters
+        ----------
+        output_format: str, optional
+            "csv" or one of pycap.results_store.STORE_FORMATS ("parquet",
+            "netcdf" or "zarr"). Defaults to the output_format of the
+            Project, which is "csv" unless given in the yml file.
+        """
+        if output_format is None:
+            output_format = self.output_format
+        if output_format == "csv":
+            self.write_responses_csv()
+            return
+        if output_format not in STORE_FORMATS:
+            raise PycapException(
+                f"output format {output_format} not recognized.\n"
+                + f"Must be one of {['csv'] + list(STORE_FORMATS.keys())}"
+            )
+        if not hasattr(self, "depletion_results"):
+            self.aggregate_results()
+        self.store_filename = self.outpath / self.ymlfile.name.replace(
+            ".yml", f".results{STORE_FORMATS[output_format]}"
+        )
+        write_results_store(self, self.store_filename, output_format)
 
     def write_responses_csv(self):
         """
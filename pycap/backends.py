@@ -0,0 +1,72 @@
+import warnings
+
+from pycap.pycap_exceptions import PycapException
+
+""" Selection of the backend used for the hot inner kernels
+    of the analytical solutions as part of the pycap suite.
+
+"""
+
+# backends available for the inner kernels of the solutions
+BACKENDS = ("numpy", "numba")
+
+# currently active backend and module of compiled kernels
+_active = {"backend": "numpy", "kernels": None}
+
+
+def set_backend(backend):
+    """Select the backend for the inner kernels of the solutions
+
+    The "numba" backend uses just-in-time compiled versions of the
+    scalar kernels that remain in the solutions, including the Hunt
+    (1999) drawdown integrand, which is passed to scipy.integrate.quad
+    as a LowLevelCallable so the adaptive quadrature runs without
+    calling back into Python. If numba is not installed, a warning is
+    issued and the NumPy backend is used.
+
+    Parameters
+    ----------
+    backend: string
+        either "numpy" (the default) or "numba"
+
+    Returns
+    -------
+    backend: string
+        the backend that is active after the call
+    """
+    backend = backend.lower()
+    if backend not in BACKENDS:
+        raise PycapException(
+            f"backend must be one of {BACKENDS}, not '{backend}'"
+        )
+    kernels = None
+    if backend == "numba":
+        try:
+            from pycap import _numba_kernels as kernels
+        except ImportError:
+            warnings.warn(
+                "numba is not installed, falling back to the numpy backend"
+            )
+            backend = "numpy"
+    _active["backend"] = backend
+    _active["kernels"] = kernels
+    return backend
+
+
+def get_backend():
+    """Name of the active backend for the inner kernels
+
+    Returns
+    -------
+    backend: string
+        either "numpy" or "numba"
+    """
+    return _active["backend"]
+
+
+def _backend_kernel(name, default):
+    """Internal function to look up a kernel for the active backend,
+    returning default if the backend does not provide it"""
+    if _active["kernels"] is None:
+        return default
+    return getattr(_active["kernels"], name, default)
@@ -0,0 +1,266 @@
+import argparse
+import contextlib
+import io
+import os
+import pathlib
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from pycap.analysis_project import Project
+from pycap.pycap_exceptions import PycapException
+from pycap.response_cache import RESPONSE_CACHE
+from pycap.result_cache import ResultCache
+
+""" Batch runner for many analysis Projects, sharing caches
+    and a pool of worker processes, as part of the pycap suite.
+
+"""
+
+YML_EXTENSIONS = (".yml", ".yaml")
+# columns of the summary of a batch
+SUMMARY_COLUMNS = [
+    "ymlfile",
+    "status",
+    "seconds",
+    "nwells",
+    "unit_responses_reused",
+    "results_loaded",
+    "results_evaluated",
+    "error",
+]
+# result caches opened in this process, by directory, so the files
+# of a cache are only listed once for all of the Projects of a batch
+_RESULT_CACHES = {}
+
+
+def find_ymlfiles(source):
+    """Find the Project YML files of a batch
+
+    Parameters
+    ----------
+    source: str, pathlib.Path or list
+        a directory (all .yml and .yaml files in it, sorted by name),
+        a manifest file with the path of one YML file on each line
+        (relative paths are relative to the manifest, and blank lines
+        and lines starting with # are skipped), or a list of paths
+
+    Returns
+    -------
+    ymlfiles: list of pathlib.Path
+        paths of the YML files
+    """
+    if isinstance(source, (list, tuple)):
+        return [pathlib.Path(i) for i in source]
+    source = pathlib.Path(source)
+    if source.is_dir():
+        return sorted(
+            i
+            for i in source.iterdir()
+            if i.suffix.lower() in YML_EXTENSIONS and i.is_file()
+        )
+    if not source.exists():
+        raise PycapException(f"batch source {source} does not exist")
+    if source.suffix.lower() in YML_EXTENSIONS:
+        return [source]
+    ymlfiles = []
+    with open(source) as ifp:
+        for line in ifp:
+            line = line.strip()
+            if len(line) == 0 or line.startswith("#"):
+                continue
+            ymlfiles.append(source.parent / line)
+    return ymlfiles
+
+
+def run_project(ymlfile, output_format=None, result_cache=None):
+    """Run one Project and write its usual output files, reporting
+    failures instead of raising them
+
+    The caches of unit responses (pycap.RESPONSE_CACHE) and of pyproj
+    coordinate reference systems are process-level, so they are shared
+    by all of the Projects run in the same process, except by a Project
+    with its own response_cache_size.
+
+    Parameters
+    ----------
+    ymlfile: str or pathlib.Path
+        path to the YML file of the Project
+    output_format: str, optional
+        format for write_responses. Defaults to None, which uses the
+        output_format of the Project.
+    result_cache: str, pathlib.Path or ResultCache, optional
+        persistent result cache shared by the Projects of a batch.
+        Defaults to None, which uses the result_cache of the Project.
+
+    Returns
+    -------
+    summary: dict
+        ymlfile, status ('ok' or 'failed'), seconds, number of wells,
+        number of unit responses reused from the response cache, numbers
+        of results loaded from and evaluated for the result cache (if
+        any), and the error of a failed Project
+    """
+    summary = dict.fromkeys(SUMMARY_COLUMNS)
+    summary["ymlfile"] = str(ymlfile)
+    response_cache = RESPONSE_CACHE
+    reused = response_cache.hits
+    if isinstance(result_cache, (str, pathlib.Path)):
+        if str(result_cache) not in _RESULT_CACHES:
+            _RESULT_CACHES[str(result_cache)] = ResultCache(result_cache)
+        result_cache = _RESULT_CACHES[str(result_cache)]
+    tic = time.perf_counter()
+    try:
+        # the screen output of each Project is also in its report files
+        with contextlib.redirect_stdout(io.StringIO()):
+            ap = Project(pathlib.Path(ymlfile), result_cache=result_cache)
+            summary["nwells"] = len(ap.wells)
+            ap.report_responses()
+            ap.write_responses(output_format)
+    except Exception as e:
+        summary["status"] = "failed"
+        summary["error"] = "".join(
+            traceback.format_exception_only(type(e), e)
+        ).strip()
+    else:
+        summary["status"] = "ok"
+        if ap.response_cache is not RESPONSE_CACHE:
+            # a Project with its own response cache started empty
+            response_cache = ap.response_cache
+            reused = 0
+        if ap.result_cache is not None:
+            summary["results_loaded"] = ap.result_cache_hits
+            summary["results_evaluated"] = ap.result_cache_misses
+    summary["seconds"] = time.perf_counter() - tic
+    summary["unit_responses_reused"] = response_cache.hits - reused
+    return summary
+
+
+def run_batch(
+    source,
+    n_workers=1,
+    output_format=None,
+    result_cache=None,
+    filename=None,
+):
+    """Run a batch of Projects, e.g. one for each permit application
+
+    Each Project writes its usual files to the output directory next to
+    its YML file. With more than one worker, the Projects are run on a
+    pool of worker processes, largest YML file first, and each worker
+    imports pycap once and keeps its caches of unit responses and
+    coordinate reference systems for all of the Projects it runs, so
+    Projects that share wells and responses reuse each other's work.
+    A persistent result cache is shared by all of the workers. A Project
+    that fails is reported in the summary and does not stop the batch.
+
+    Parameters
+    ----------
+    source: str, pathlib.Path or list
+        directory, manifest file or list of YML files (see find_ymlfiles)
+    n_workers: int, optional
+        number of worker processes. Defaults to 1, which runs the
+        Projects in this process.
+    output_format: str, optional
+        format for write_responses of every Project. Defaults to None,
+        which uses the output_format of each Project.
+    result_cache: str or pathlib.Path, optional
+        directory of a persistent result cache shared by all Projects.
+        Defaults to None, which uses the result_cache of each Project.
+    filename: str or pathlib.Path, optional
+        CSV file to save the summary to
+
+    Returns
+    -------
+    summary: pd.DataFrame
+        one row for each Project, in the order of the batch, with the
+        columns of SUMMARY_COLUMNS
+    """
+    if int(n_workers) != n_workers or n_workers < 1:
+        raise PycapException(
+            f"n_workers must be a positive integer, not {n_workers}"
+        )
+    ymlfiles = find_ymlfiles(source)
+    if result_cache is not None:
+        result_cache = str(result_cache)
+    if n_workers == 1:
+        rows = [
+            run_project(i, output_format, result_cache) for i in ymlfiles
+        ]
+    else:
+        rows = [None] * len(ymlfiles)
+
+        def _size(i):
+            try:
+                return os.path.getsize(ymlfiles[i])
+            except OSError:
+                return 0
+
+        # longest job first, using the size of the YML file as its cost
+        order = sorted(range(len(ymlfiles)), key=_size, reverse=True)
+        with ProcessPoolExecutor(max_workers=int(n_workers)) as pool:
+            futures = {
+                pool.submit(
+                    run_project, ymlfiles[i], output_format, result_cache
+                ): i
+                for i in order
+            }
+            for future in as_completed(futures):
+                rows[futures[future]] = future.result()
+    summary = pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
+    if filename is not None:
+        summary.to_csv(filename, index=False)
+    return summary
+
+
+def main(argv=None):
+    """Command line interface to run_batch"""
+    parser = argparse.ArgumentParser(
+        description="Run a batch of pycap Project YML files"
+    )
+    parser.add_argument(
+        "source",
+        nargs="+",
+        help="directory of YML files, manifest file, or YML files",
+    )
+    parser.add_argument(
+        "-j", "--n-workers", type=int, default=1, help="worker processes"
+    )
+    parser.add_argument(
+        "--output-format",
+        help="output format of every Project (default from each YML file)",
+    )
+    parser.add_argument(
+        "--result-cache", help="directory of a shared result cache"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="pycap_batch_summary.csv",
+        help="CSV file for the summary",
+    )
+    args = parser.parse_args(argv)
+
+    source = args.source[0] if len(args.source) == 1 else args.source
+    summary = run_batch(
+        source,
+        n_workers=args.n_workers,
+        output_format=args.output_format,
+        result_cache=args.result_cache,
+        filename=args.output,
+    )
+    print(summary.drop(columns="error").to_string(index=False))
+    failed = summary[summary.status == "failed"]
+    for ymlfile, error in zip(failed.ymlfile, failed.error):
+        print(f"FAILED {ymlfile}: {error}")
+    print(
+        f"{len(summary) - len(failed)} of {len(summary)} projects ran in "
+        + f"{summary.seconds.sum():.1f} s"
+    )
+    return 1 if len(failed) > 0 else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
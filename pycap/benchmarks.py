@@ -0,0 +1,769 @@
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import pathlib
+import platform
+import subprocess
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import scipy
+import yaml
+
+import pycap
+from pycap import solutions
+from pycap.backends import get_backend
+from pycap.pycap_exceptions import PycapException
+from pycap.response_cache import RESPONSE_CACHE
+from pycap.utilities import Q2ts, create_timeseries_template
+
+""" Microbenchmarks of the analytical solutions and their inner
+    kernels, and scaling of the Project pipeline with synthetic
+    projects, with results saved as JSON to compare across commits,
+    as part of the pycap suite.
+
+"""
+
+# aquifer, distance and pumping used by all of the benchmarks
+_T = 1000.0
+_S = 0.1
+_DIST = 200.0
+_Q = 1.0
+_WARD_LOUGH = {
+    "T2": 100.0,
+    "S2": 1.0,
+    "width": 1.0,
+    "streambed_thick": 10.0,
+    "streambed_K": 1.0,
+    "aquitard_thick": 10.0,
+    "aquitard_K": 0.01,
+}
+
+# extra arguments for each solution in ALL_DD_METHODS and ALL_DEPL_METHODS
+BENCHMARK_KWARGS = {
+    "theis_drawdown": {},
+    "hunt_99_drawdown": {"streambed_conductance": 1.0, "x": 50.0, "y": 0.0},
+    "ward_lough_drawdown": {"x": 50.0, "y": 100.0, **_WARD_LOUGH},
+    "glover_depletion": {},
+    "walton_depletion": {},
+    "hunt_99_depletion": {"streambed_conductance": 1.0},
+    "hunt_03_depletion": {
+        "Bprime": 20.0,
+        "Bdouble": 15.0,
+        "aquitard_K": 1.0,
+        "sigma": 0.1,
+        "width": 5.0,
+        "streambed_conductance": 0.3,
+    },
+    "ward_lough_depletion": dict(_WARD_LOUGH),
+}
+
+# number of times evaluated for each problem size
+SIZES = {"scalar": 1, "1k": 1_000, "100k": 100_000}
+
+# solutions evaluated on a GRID_SIZE x GRID_SIZE grid at a single time,
+# either of distances or (for hunt_99_drawdown) of x, y locations
+GRID_METHODS = (
+    "theis_drawdown",
+    "hunt_99_drawdown",
+    "glover_depletion",
+    "walton_depletion",
+    "hunt_99_depletion",
+)
+GRID_SIZE = 100
+
+# Stehfest series levels for the Laplace-domain solutions
+STEHFEST_N = (2, 6, 10, 14, 18)
+STEHFEST_METHODS = ("ward_lough_drawdown", "ward_lough_depletion")
+
+
+def _times(n):
+    """Internal function for n times spread over 10 years, in days"""
+    return 10.0 if n == 1 else np.linspace(1.0, 3650.0, n)
+
+
+def _solution_cases(methods, quick):
+    """Internal function for the benchmark cases of the solutions"""
+    all_methods = {**pycap.ALL_DD_METHODS, **pycap.ALL_DEPL_METHODS}
+    cases = []
+    for method in methods:
+        func = all_methods[method]
+        kwargs = BENCHMARK_KWARGS[method]
+        for size, n in SIZES.items():
+            if quick and n > SIZES["1k"]:
+                continue
+            cases.append(
+                (
+                    method,
+                    size,
+                    n,
+                    lambda func=func, n=n, kwargs=kwargs: func(
+                        _T, _S, _times(n), _DIST, _Q, **kwargs
+                    ),
+                )
+            )
+        if method in GRID_METHODS:
+            if method == "hunt_99_drawdown":
+                x, y = np.meshgrid(
+                    np.linspace(-100.0, 400.0, GRID_SIZE),
+                    np.linspace(-300.0, 300.0, GRID_SIZE),
+                )
+                grid_kwargs = {**kwargs, "x": x, "y": y}
+                dist = _DIST
+            else:
+                grid_kwargs = kwargs
+                dist = np.linspace(10.0, 5000.0, GRID_SIZE**2)
+            cases.append(
+                (
+                    method,
+                    "grid",
+                    GRID_SIZE**2,
+                    lambda func=func, dist=dist, kwargs=grid_kwargs: func(
+                        _T, _S, 100.0, dist, _Q, **kwargs
+                    ),
+                )
+            )
+        if method in STEHFEST_METHODS:
+            for N in STEHFEST_N:
+                N_kwargs = {**kwargs, "NSteh1": N}
+                if method == "ward_lough_drawdown":
+                    N_kwargs["NSteh2"] = N
+                cases.append(
+                    (
+                        method,
+                        f"1k_stehfest_{N}",
+                        SIZES["1k"],
+                        lambda func=func, kwargs=N_kwargs: func(
+                            _T, _S, _times(SIZES["1k"]), _DIST, _Q, **kwargs
+                        ),
+                    )
+                )
+    return cases
+
+
+def _kernel_cases():
+    """Internal function for the benchmark cases of the inner kernels"""
+    n = SIZES["1k"]
+
+    # Hunt (2003) G function for an array of the integration variable
+    alpha = np.linspace(0.0, 1.0, n)
+
+    # Hunt (1999) drawdown integrand, called once for each quad node
+    theta = np.linspace(-np.pi / 2, np.pi / 2, n)
+    streambed = BENCHMARK_KWARGS["hunt_99_drawdown"]["streambed_conductance"]
+
+    def _ddwn2():
+        for th in theta:
+            solutions._ddwn2(th, _DIST, 50.0, 0.0, _T, streambed, 10.0, _S)
+
+    # Ward and Lough (2011) Laplace-space function for the 2 x 1k
+    # Laplace parameters of a Stehfest inversion with N = 2
+    x, y, t, T1, S1, K, lambd = solutions._WardLoughNonDimensionalize(
+        _T,
+        _WARD_LOUGH["T2"],
+        _S,
+        _WARD_LOUGH["S2"],
+        _WARD_LOUGH["width"],
+        _Q,
+        _DIST,
+        _WARD_LOUGH["streambed_thick"],
+        _WARD_LOUGH["streambed_K"],
+        _WARD_LOUGH["aquitard_thick"],
+        _WARD_LOUGH["aquitard_K"],
+        _times(n),
+        50.0,
+        100.0,
+    )
+    p = np.arange(1, 3)[:, None] * np.log(2) / t
+
+    return [
+        ("_G", "1k", n, lambda: solutions._G(alpha, 0.1, 1.0, 10.0)),
+        ("_ddwn2", "1k", n, _ddwn2),
+        (
+            "_if1",
+            "1k",
+            p.size,
+            lambda: solutions._if1(T1, S1, K, lambd, x, y, p),
+        ),
+    ]
+
+
+def _time_call(func, repeat, max_time):
+    """Internal function for the best time of one call of func in seconds
+
+    Calls are grouped in runs of at least 10 ms, like timeit.autorange.
+    The best of up to repeat runs is used, stopping early once the
+    runs take more than max_time seconds.
+    """
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= 0.01:
+            break
+        number *= 10
+    best = elapsed / number
+    total = elapsed
+    runs = 1
+    while runs < repeat and total < max_time:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - t0
+        best = min(best, elapsed / number)
+        total += elapsed
+        runs += 1
+    return best, number, runs
+
+
+def _peak_memory(func):
+    """Internal function for the peak memory allocated by a call of func,
+    in bytes, including NumPy arrays"""
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def _git_commit():
+    """Internal function for the git commit of the source, if known"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _metadata():
+    """Internal function for the time, git commit, versions, platform
+    and backend of a run"""
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "backend": get_backend(),
+    }
+
+
+def run_benchmarks(
+    methods=None,
+    kernels=True,
+    quick=False,
+    repeat=5,
+    max_time=2.0,
+    memory=True,
+    filename=None,
+):
+    """Time the analytical solutions and their inner kernels
+
+    Each solution in ALL_DD_METHODS and ALL_DEPL_METHODS is timed for a
+    scalar time, 1k and 100k times (SIZES), a grid of distances or
+    locations (GRID_METHODS) and several Stehfest series levels for the
+    Laplace-domain solutions (STEHFEST_N). The inner kernels _G (Hunt,
+    2003), _ddwn2 (Hunt, 1999 drawdown) and _if1 (Ward and Lough, 2011)
+    are timed for 1k evaluations. A case that raises an exception is
+    recorded with the error instead of a time.
+
+    Parameters
+    ----------
+    methods: list of str, optional
+        names of the solutions to time. Defaults to all of them.
+    kernels: bool, optional
+        also time the inner kernels. Defaults to True.
+    quick: bool, optional
+        skip the 100k time cases. Defaults to False.
+    repeat: int, optional
+        maximum number of timed runs of each case. Defaults to 5.
+    max_time: float, optional
+        stop repeating a case once its runs take more than max_time
+        seconds. Defaults to 2.0.
+    memory: bool, optional
+        measure the peak memory of each case with an additional call
+        under tracemalloc. Defaults to True.
+    filename: str or pathlib.Path, optional
+        JSON file to save the results to
+
+    Returns
+    -------
+    benchmarks: dict
+        "metadata" of the run (time, git commit, versions, platform and
+        backend) and a list of "results" with the method, case, number of
+        evaluations, seconds per call, evaluations per second and peak
+        memory in bytes of each case
+    """
+    all_methods = list(pycap.ALL_DD_METHODS) + list(pycap.ALL_DEPL_METHODS)
+    if methods is None:
+        methods = all_methods
+    for method in methods:
+        if method not in all_methods:
+            raise PycapException(
+                f"method {method} not recognized.\n"
+                + f"Must be one of {all_methods}"
+            )
+    cases = _solution_cases(methods, quick)
+    if kernels:
+        cases += _kernel_cases()
+
+    results = []
+    for method, case, nevals, func in cases:
+        result = {
+            "name": f"{method}[{case}]",
+            "method": method,
+            "case": case,
+            "n_evaluations": nevals,
+        }
+        try:
+            seconds, number, runs = _time_call(func, repeat, max_time)
+            result.update(
+                {
+                    "seconds": seconds,
+                    "evaluations_per_second": nevals / seconds,
+                    "number": number,
+                    "runs": runs,
+                }
+            )
+            if memory:
+                result["peak_memory_bytes"] = _peak_memory(func)
+        except Exception as e:
+            result["error"] = repr(e)
+        results.append(result)
+
+    benchmarks = {
+        "metadata": {**_metadata(), "quick": quick},
+        "results": results,
+    }
+    if filename is not None:
+        with open(filename, "w") as ofp:
+            json.dump(benchmarks, ofp, indent=2)
+    return benchmarks
+
+
+def compare_benchmarks(baseline, current):
+    """Compare two sets of benchmark results
+
+    Parameters
+    ----------
+    baseline: dict, str or pathlib.Path
+        benchmarks returned by run_benchmarks, or the JSON file they
+        were saved to
+    current: dict, str or pathlib.Path
+        benchmarks to compare to the baseline
+
+    Returns
+    -------
+    comparison: pd.DataFrame
+        evaluations per second of the baseline and current runs for each
+        case they share, indexed by case name, with their ratio (speedup,
+        greater than one when the current run is faster)
+    """
+    rates = []
+    for benchmarks in (baseline, current):
+        if not isinstance(benchmarks, dict):
+            with open(benchmarks) as ifp:
+                benchmarks = json.load(ifp)
+        rates.append(
+            pd.Series(
+                {
+                    r["name"]: r.get("evaluations_per_second", np.nan)
+                    for r in benchmarks["results"]
+                }
+            )
+        )
+    comparison = pd.concat(
+        rates, axis=1, keys=["baseline", "current"], join="inner"
+    )
+    comparison["speedup"] = comparison.current / comparison.baseline
+    return comparison
+
+
+# depletion methods supported by a Project, with the extra properties
+# of the stream responses they need
+SYNTHETIC_DEPL_METHODS = {
+    "walton_depletion": (),
+    "glover_depletion": (),
+    "hunt_99_depletion": ("streambed_conductance",),
+}
+
+# stages of the Project pipeline timed by run_scaling
+SCALING_STAGES = (
+    "parse_yaml",
+    "build_project",
+    "evaluate_responses",
+    "aggregate",
+    "report",
+    "write_csv",
+)
+
+
+def write_synthetic_project(
+    ymlfile,
+    nwells=10,
+    nstreams=2,
+    ndd=2,
+    nyears=5,
+    depl_method="walton_depletion",
+    responses_per_well=2,
+    timeseries=True,
+    seed=0,
+):
+    """Write a synthetic Project YAML file, modeled on tests/data/example.yml
+
+    Wells, stream responses and drawdown responses are scattered over
+    about 10 km around the example locations. A quarter of the wells
+    are pending and the rest existing, pumping 50 to 1000 gpm for part
+    of each year, and each well responds to responses_per_well randomly
+    chosen stream and drawdown responses with random apportionment.
+    Stream responses are named base:segment with two segments on each
+    base stream. If timeseries is True, the pumping rates are written to
+    a time series file next to the YAML file in the layout of
+    create_timeseries_template, and otherwise given as Q and pumping_days
+    for each well.
+
+    Parameters
+    ----------
+    ymlfile: str or pathlib.Path
+        path of the YAML file to write
+    nwells: int, optional
+        number of wells. Defaults to 10.
+    nstreams: int, optional
+        number of stream responses. Defaults to 2.
+    ndd: int, optional
+        number of drawdown responses. Defaults to 2.
+    nyears: int, optional
+        number of years of pumping. Defaults to 5.
+    depl_method: str, optional
+        depletion method of the Project, one of SYNTHETIC_DEPL_METHODS.
+        Defaults to "walton_depletion".
+    responses_per_well: int, optional
+        number of stream and of drawdown responses for each well.
+        Defaults to 2.
+    timeseries: bool, optional
+        write a pumping time series file. Defaults to True.
+    seed: int, optional
+        seed of the random number generator. Defaults to 0.
+
+    Returns
+    -------
+    ymlfile: pathlib.Path
+        path of the YAML file
+    """
+    if depl_method not in SYNTHETIC_DEPL_METHODS:
+        raise PycapException(
+            f"depl_method {depl_method} not supported.\n"
+            + f"Must be one of {list(SYNTHETIC_DEPL_METHODS.keys())}"
+        )
+    ymlfile = pathlib.Path(ymlfile)
+    rng = np.random.default_rng(seed)
+
+    def _loc():
+        x, y = rng.uniform(-0.05, 0.05, 2)
+        return {"x": float(89.3849 + x), "y": float(43.0748 + y)}
+
+    project = {
+        "project_properties": {
+            "name": ymlfile.stem,
+            "T": 35.0,
+            "S": 0.1,
+            "depl_method": depl_method,
+            "default_dd_days": 30,
+            "default_depletion_years": nyears,
+            "default_pumping_days": 60,
+        }
+    }
+    wells = [f"well{i}" for i in range(1, nwells + 1)]
+    streams = [f"Creek{j // 2 + 1}:{j + 1}" for j in range(nstreams)]
+    dds = [f"Muni{j + 1}" for j in range(ndd)]
+    Q = rng.uniform(50.0, 1000.0, nwells)
+    pumping_days = rng.choice([60, 90, 180, 365], nwells)
+    for i, cwell in enumerate(wells):
+        well = {
+            "name": cwell,
+            "status": "pending" if i % 4 == 0 else "existing",
+            "loc": _loc(),
+            "dd_days": min(int(rng.choice([30, 90, 365])), 365 * nyears - 1),
+        }
+        if not timeseries:
+            well["Q"] = float(Q[i])
+            well["pumping_days"] = int(pumping_days[i])
+        if nstreams > 0:
+            cstreams = list(
+                rng.choice(
+                    streams, min(responses_per_well, nstreams), replace=False
+                )
+            )
+            apportionment = 0.9 * rng.dirichlet(np.ones(len(cstreams)))
+            for k, (cs, ca) in enumerate(zip(cstreams, apportionment)):
+                well[f"stream_apportionment{k + 1}"] = {
+                    "name": str(cs),
+                    "apportionment": float(ca),
+                }
+            well["stream_response"] = [str(cs) for cs in cstreams]
+        if ndd > 0:
+            well["dd_response"] = [
+                str(cd)
+                for cd in rng.choice(
+                    dds, min(responses_per_well, ndd), replace=False
+                )
+            ]
+        project[cwell] = well
+    for j, cd in enumerate(dds):
+        project[f"dd_response{j + 1}"] = {"name": cd, "loc": _loc()}
+    for j, cs in enumerate(streams):
+        project[f"stream_response{j + 1}"] = {"name": cs, "loc": _loc()}
+        if "streambed_conductance" in SYNTHETIC_DEPL_METHODS[depl_method]:
+            project[f"stream_response{j + 1}"]["streambed_conductance"] = (
+                float(rng.uniform(1.0, 20.0))
+            )
+
+    if timeseries:
+        tsfile = ymlfile.with_suffix(".ts.csv")
+        create_timeseries_template(tsfile, numyears=nyears, well_ids=[])
+        ts = pd.read_csv(tsfile)
+        rates = np.column_stack(
+            [
+                Q2ts(int(pumping_days[i]), nyears, Q[i]).values
+                for i in range(nwells)
+            ]
+        )
+        ts = pd.concat([ts, pd.DataFrame(rates, columns=wells)], axis=1)
+        ts.to_csv(tsfile, index=None)
+        project["project_properties"]["pumping_timeseries_file"] = str(
+            tsfile.resolve()
+        )
+
+    with open(ymlfile, "w") as ofp:
+        yaml.safe_dump(project, ofp, sort_keys=False)
+    return ymlfile
+
+
+def _time_stages(ymlfile):
+    """Internal function for the time in seconds of each stage of the
+    Project pipeline (SCALING_STAGES) for a YAML file"""
+    from pycap.analysis_project import YAML_LOADER, Project
+
+    stages = {}
+    t0 = time.perf_counter()
+    with open(ymlfile) as ifp:
+        yaml.load(ifp, Loader=YAML_LOADER)
+    stages["parse_yaml"] = time.perf_counter() - t0
+
+    # the Project reports on its input to the screen
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        ap = Project(ymlfile)
+        stages["build_project"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for cw in ap.wells.values():
+            cw.drawdown
+            cw.depletion
+        stages["evaluate_responses"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        ap.aggregate_results()
+        stages["aggregate"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        ap.report_responses()
+        stages["report"] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        ap.write_responses_csv()
+        stages["write_csv"] = time.perf_counter() - t0
+    return stages
+
+
+def run_scaling(
+    workdir,
+    parameter="nwells",
+    values=(10, 20, 40, 80),
+    depl_methods=("walton_depletion",),
+    filename=None,
+    **kwargs,
+):
+    """Time the stages of the Project pipeline for synthetic Projects
+    of increasing size
+
+    For each depletion method and each value of parameter, a synthetic
+    Project is written with write_synthetic_project and the time of each
+    stage in SCALING_STAGES is measured, starting from an empty
+    RESPONSE_CACHE. The complexity of each stage is the slope of a
+    straight-line fit of log(time) against log(value), so a stage with
+    an exponent above 1 grows faster than linearly with the parameter.
+
+    Parameters
+    ----------
+    workdir: str or pathlib.Path
+        directory for the synthetic YAML and time series files. The
+        Project output is written to workdir / "output".
+    parameter: str, optional
+        argument of write_synthetic_project to scale, e.g. "nwells",
+        "nstreams", "ndd", "nyears" or "responses_per_well".
+        Defaults to "nwells".
+    values: list of int, optional
+        values of parameter. Defaults to (10, 20, 40, 80).
+    depl_methods: list of str, optional
+        depletion methods, from SYNTHETIC_DEPL_METHODS.
+        Defaults to ("walton_depletion",).
+    filename: str or pathlib.Path, optional
+        JSON file to save the timings and exponents to
+    **kwargs:
+        other arguments of write_synthetic_project, held fixed
+
+    Returns
+    -------
+    timings: pd.DataFrame
+        seconds for each stage and in total, with a row for each
+        depletion method and value of parameter
+    exponents: pd.DataFrame
+        complexity exponent of each stage and the total (columns)
+        for each depletion method (rows)
+    """
+    workdir = pathlib.Path(workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+    records = []
+    for depl_method in depl_methods:
+        for value in values:
+            ymlfile = write_synthetic_project(
+                workdir / f"scaling_{depl_method}_{parameter}_{value}.yml",
+                **{**kwargs, parameter: value, "depl_method": depl_method},
+            )
+            RESPONSE_CACHE.clear()
+            stages = _time_stages(ymlfile)
+            records.append(
+                {
+                    "depl_method": depl_method,
+                    parameter: value,
+                    **stages,
+                    "total": sum(stages.values()),
+                }
+            )
+    timings = pd.DataFrame(records)
+
+    exponents = {}
+    for depl_method, df in timings.groupby("depl_method", sort=False):
+        logv = np.log(df[parameter].values.astype(float))
+        exponents[depl_method] = {
+            stage: np.polyfit(logv, np.log(df[stage].values), 1)[0]
+            for stage in SCALING_STAGES + ("total",)
+        }
+    exponents = pd.DataFrame(exponents).T
+
+    if filename is not None:
+        with open(filename, "w") as ofp:
+            json.dump(
+                {
+                    "metadata": {**_metadata(), "parameter": parameter},
+                    "timings": records,
+                    "exponents": exponents.to_dict(orient="index"),
+                },
+                ofp,
+                indent=2,
+                default=int,
+            )
+    return timings, exponents
+
+
+def main(argv=None):
+    """Command line interface to run_benchmarks, compare_benchmarks
+    and run_scaling"""
+    parser = argparse.ArgumentParser(
+        description="Time the pycap analytical solutions and kernels"
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="pycap_benchmarks.json",
+        help="JSON file for the results",
+    )
+    parser.add_argument(
+        "-m", "--methods", nargs="+", help="solutions to time (default all)"
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="skip the 100k time cases"
+    )
+    parser.add_argument(
+        "--no-kernels", action="store_true", help="skip the inner kernels"
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip peak memory"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-time", type=float, default=2.0)
+    parser.add_argument(
+        "--compare", help="JSON file of baseline results to compare to"
+    )
+    parser.add_argument(
+        "--scaling",
+        metavar="PARAMETER",
+        help="instead time the Project pipeline for synthetic projects, "
+        + "scaling PARAMETER (e.g. nwells) over --values",
+    )
+    parser.add_argument(
+        "--values", type=int, nargs="+", default=[10, 20, 40, 80]
+    )
+    parser.add_argument(
+        "--depl-methods", nargs="+", default=["walton_depletion"]
+    )
+    parser.add_argument(
+        "--workdir",
+        default="pycap_scaling",
+        help="directory for the synthetic projects",
+    )
+    args = parser.parse_args(argv)
+
+    if args.scaling is not None:
+        timings, exponents = run_scaling(
+            args.workdir,
+            parameter=args.scaling,
+            values=args.values,
+            depl_methods=args.depl_methods,
+            filename=args.output,
+        )
+        print(timings.to_string())
+        print("\ncomplexity exponents")
+        print(exponents.to_string())
+        return
+
+    benchmarks = run_benchmarks(
+        methods=args.methods,
+        kernels=not args.no_kernels,
+        quick=args.quick,
+        repeat=args.repeat,
+        max_time=args.max_time,
+        memory=not args.no_memory,
+        filename=args.output,
+    )
+    for r in benchmarks["results"]:
+        if "error" in r:
+            print(f"{r['name']:<40} ERROR {r['error']}")
+        else:
+            print(
+                f"{r['name']:<40} {r['evaluations_per_second']:>14.4g} "
+                + f"evals/s {r['seconds']:>11.4g} s"
+            )
+    if args.compare is not None:
+        print(compare_benchmarks(args.compare, benchmarks).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+import numpy as np
+import pandas as pd
+
+import pycap
+from pycap.pycap_exceptions import PycapException
+
+""" Monte Carlo ensembles of drawdown and depletion over
+    uncertain aquifer parameters as part of the pycap suite.
+
+"""
+
+# depletion solutions evaluated for all realizations at once
+ENSEMBLE_DEPL_METHODS = (
+    "glover_depletion",
+    "walton_depletion",
+    "hunt_99_depletion",
+)
+# maximum number of (realization, well, response, time) values
+# evaluated at once, which bounds the memory used by an ensemble
+_ENSEMBLE_CHUNK = 2**22
+
+
+def _sample(name, value, nrealizations, rng):
+    """samples of a parameter for each realization, drawn from a
+    distribution (anything with an rvs method, e.g. a frozen
+    scipy.stats distribution) or given as a scalar or array"""
+    if hasattr(value, "rvs"):
+        if nrealizations is None:
+            raise PycapException(
+                f"nrealizations is required to sample {name} "
+                + "from a distribution"
+            )
+        return np.asarray(
+            value.rvs(size=nrealizations, random_state=rng), dtype=float
+        )
+    return np.asarray(value, dtype=float)
+
+
+class Ensemble:
+    """Monte Carlo ensemble of drawdown and depletion for many wells
+    and responses over uncertain aquifer parameters
+
+    T, S and streambed conductance are given as distributions or samples
+    for each realization. Depletion and drawdown are evaluated for blocks
+    of realizations at once, with the realization axis broadcast through
+    the solutions, and only summaries of each realization are kept:
+    the maximum over time of the depletion summed over all wells for each
+    stream response, and the drawdown summed over all wells for each
+    drawdown response at the drawdown time of each well (as reported by
+    Project). Memory use is bounded by the size of a block, for any number
+    of realizations.
+
+    """
+
+    def __init__(
+        self,
+        T,
+        S,
+        Q,
+        stream_dist=None,
+        drawdown_dist=None,
+        stream_apportionment=None,
+        streambed_conductance=None,
+        depl_method="glover_depletion",
+        dd_days=None,
+        nrealizations=None,
+        seed=None,
+        stream_names=None,
+        drawdown_names=None,
+        drawdown_mask=None,
+        depletion_factor=1.0,
+    ) -> None:
+        """Monte Carlo ensemble over T, S and streambed conductance
+
+        Parameters
+        ----------
+        T: float, np.array or distribution
+            Aquifer Transmissivity [L**2/T]. Either a distribution with an
+            rvs method (e.g. scipy.stats.lognorm(...)), sampled once for
+            each realization, or samples broadcast to
+            (nrealizations, nwells), where a 1D array has one value
+            for each realization.
+        S: float, np.array or distribution
+            Aquifer Storage [unitless], as for T
+        Q: np.array
+            Pumping schedules with shape (nwells, ntimes), with one rate
+            for each sequential day starting at day 1 [L**3/T]
+        stream_dist: np.array, optional
+            Distances between wells and stream responses with shape
+            (nwells, nstreams) [L]
+        drawdown_dist: np.array, optional
+            Distances between wells and drawdown responses with shape
+            (nwells, ndrawdown) [L]
+        stream_apportionment: float or np.array, optional
+            Fraction of depletion attributed to each stream, broadcast to
+            (nwells, nstreams). Zero for pairs that are not evaluated.
+            Defaults to None, which is 1.0 for all pairs.
+        streambed_conductance: float, np.array or distribution, optional
+            Streambed conductance for hunt_99_depletion [L/T]. Either a
+            distribution, sampled once for each realization, or samples
+            broadcast to (nrealizations, nwells, nstreams).
+        depl_method: string, optional
+            One of ENSEMBLE_DEPL_METHODS. Drawdown is always calculated
+            with theis_drawdown. Defaults to 'glover_depletion'.
+        dd_days: int or np.array, optional
+            Index of the time of the reported drawdown for each well.
+            Defaults to None, which is the last time.
+        nrealizations: int, optional
+            Number of realizations, required if any parameter is a
+            distribution. Defaults to None, which uses the number of
+            samples of the parameters.
+        seed: int or np.random.Generator, optional
+            Seed for sampling the distributions
+        stream_names: list, optional
+            Names of the stream responses
+        drawdown_names: list, optional
+            Names of the drawdown responses
+        drawdown_mask: np.array, optional
+            Boolean array with shape (nwells, ndrawdown) of the pairs
+            included in the drawdown. Defaults to None, which is all pairs.
+        depletion_factor: float, optional
+            Factor applied to the depletion, e.g. 1 / 86400 to report
+            depletion from rates in cubic feet per day in cubic feet per
+            second. Defaults to 1.0.
+        """
+        if depl_method.lower() not in ENSEMBLE_DEPL_METHODS:
+            raise PycapException(
+                f"depletion method {depl_method} not available in "
+                + f"Ensemble.\nMust be one of {list(ENSEMBLE_DEPL_METHODS)}"
+            )
+        self.depl_method = depl_method.lower()
+        self.Q = np.atleast_2d(np.asarray(Q, dtype=float))
+        self.nwells, self.ntimes = self.Q.shape
+        rng = np.random.default_rng(seed)
+        T = _sample("T", T, nrealizations, rng)
+        S = _sample("S", S, nrealizations, rng)
+        if streambed_conductance is not None:
+            streambed_conductance = _sample(
+                "streambed_conductance",
+                streambed_conductance,
+                nrealizations,
+                rng,
+            )
+        if nrealizations is None:
+            # the first axis of samples of T and S, or of 1D or 3D
+            # samples of the streambed conductance, is the realization
+            samples = [i for i in (T, S) if np.ndim(i) > 0]
+            if np.ndim(streambed_conductance) in (1, 3):
+                samples.append(streambed_conductance)
+            nrealizations = max([i.shape[0] for i in samples], default=1)
+        self.nrealizations = int(nrealizations)
+
+        # parameters with a realization axis first, which may be
+        # broadcast views of fewer samples
+        self.T = self._broadcast(
+            "T", T, (self.nrealizations, self.nwells), leading=True
+        )
+        self.S = self._broadcast(
+            "S", S, (self.nrealizations, self.nwells), leading=True
+        )
+        self.stream_dist = None
+        self.stream_apportionment = None
+        self.streambed_conductance = None
+        self.stream_names = None
+        if stream_dist is not None:
+            self.stream_dist = self._broadcast(
+                "stream_dist",
+                stream_dist,
+                (self.nwells, np.shape(stream_dist)[-1]),
+            )
+            nstreams = self.stream_dist.shape[1]
+            if stream_apportionment is None:
+                stream_apportionment = 1.0
+            self.stream_apportionment = self._broadcast(
+                "stream_apportionment",
+                stream_apportionment,
+                self.stream_dist.shape,
+            )
+            if streambed_conductance is not None:
+                self.streambed_conductance = self._broadcast(
+                    "streambed_conductance",
+                    streambed_conductance,
+                    (self.nrealizations,) + self.stream_dist.shape,
+                    leading=True,
+                )
+            elif self.depl_method == "hunt_99_depletion":
+                raise PycapException(
+                    "streambed_conductance is required for hunt_99_depletion"
+                )
+            if stream_names is None:
+                stream_names = list(range(nstreams))
+            self.stream_names = list(stream_names)
+        self.drawdown_dist = None
+        self.drawdown_mask = None
+        self.drawdown_names = None
+        if drawdown_dist is not None:
+            self.drawdown_dist = self._broadcast(
+                "drawdown_dist",
+                drawdown_dist,
+                (self.nwells, np.shape(drawdown_dist)[-1]),
+            )
+            if drawdown_mask is None:
+                drawdown_mask = True
+            self.drawdown_mask = np.broadcast_to(
+                np.asarray(drawdown_mask, dtype=bool),
+                self.drawdown_dist.shape,
+            )
+            if drawdown_names is None:
+                drawdown_names = list(range(self.drawdown_dist.shape[1]))
+            self.drawdown_names = list(drawdown_names)
+        if dd_days is None:
+            dd_days = self.ntimes - 1
+        self.dd_days = np.broadcast_to(
+            np.asarray(dd_days, dtype=int), (self.nwells,)
+        )
+        if np.any(self.dd_days >= self.ntimes) or np.any(self.dd_days < 0):
+            raise PycapException(
+                f"dd_days must be between 0 and {self.ntimes - 1}"
+            )
+        self.depletion_factor = depletion_factor
+        self.max_depletion = None
+        self.drawdown = None
+
+    @staticmethod
+    def _broadcast(name, value, shape, leading=False):
+        """broadcast a parameter to the shape it needs, raising a
+        PycapException if it cannot. With leading, a 1D array of
+        samples is one value for each realization."""
+        value = np.asarray(value, dtype=float)
+        if leading and value.ndim == 1:
+            value = value.reshape((-1,) + (1,) * (len(shape) - 1))
+        try:
+            return np.broadcast_to(value, shape)
+        except ValueError:
+            raise PycapException(
+                f"{name} with shape {np.shape(value)} cannot be "
+                + f"broadcast to shape {shape} in Ensemble"
+            )
+
+    @classmethod
+    def from_project(
+        cls,
+        project,
+        T=None,
+        S=None,
+        streambed_conductance=None,
+        nrealizations=None,
+        seed=None,
+        wells=None,
+    ):
+        """Ensemble for the wells and responses of a Project
+
+        Parameters
+        ----------
+        project: pycap.analysis_project.Project
+            Project with the wells, responses and pumping schedules
+        T: float, np.array or distribution, optional
+            Transmissivity [ft**2/day]. Defaults to None, which uses T
+            of the Project.
+        S: float, np.array or distribution, optional
+            Storage [unitless]. Defaults to None, which uses S of the
+            Project.
+        streambed_conductance: float, np.array or distribution, optional
+            Streambed conductance [ft/day] for hunt_99_depletion.
+            Defaults to None, which uses the streambed conductance of each
+            stream response in the Project.
+        nrealizations: int, optional
+            Number of realizations, required if any parameter is a
+            distribution
+        seed: int or np.random.Generator, optional
+            Seed for sampling the distributions
+        wells: list, optional
+            Names of the wells to include. Defaults to None, which is all
+            existing and proposed wells (the total of Project).
+
+        Returns
+        -------
+        ensemble: Ensemble
+            ensemble with depletion in cubic feet per second and drawdown
+            in feet, as in the reports of the Project
+        """
+        if wells is None:
+            wells = project.existing_wells + project.proposed_wells
+        cwells = [project.wells[i] for i in wells]
+        streams = list(
+            dict.fromkeys(
+                ck for cw in cwells for ck in (cw.stream_dist or {}).keys()
+            )
+        )
+        dds = list(
+            dict.fromkeys(
+                ck for cw in cwells for ck in (cw.drawdown_dist or {}).keys()
+            )
+        )
+        stream_dist = np.ones((len(cwells), len(streams)))
+        apportionment = np.zeros(stream_dist.shape)
+        conductance = np.full(stream_dist.shape, np.nan)
+        drawdown_dist = np.ones((len(cwells), len(dds)))
+        drawdown_mask = np.zeros(drawdown_dist.shape, dtype=bool)
+        for i, cw in enumerate(cwells):
+            for ck, dist in (cw.stream_dist or {}).items():
+                j = streams.index(ck)
+                stream_dist[i, j] = dist
+                apportionment[i, j] = cw.stream_apportionment[ck]
+                if cw.streambed_conductance is not None:
+                    conductance[i, j] = cw.streambed_conductance.get(
+                        ck, np.nan
+                    )
+            for ck, dist in (cw.drawdown_dist or {}).items():
+                j = dds.index(ck)
+                drawdown_dist[i, j] = dist
+                drawdown_mask[i, j] = True
+        if streambed_conductance is None and np.any(
+            np.isfinite(conductance)
+        ):
+            # pairs that are not evaluated do not need a conductance
+            streambed_conductance = np.where(
+                apportionment > 0, conductance, 1.0
+            )
+        return cls(
+            T=project.T if T is None else T,
+            S=project.S if S is None else S,
+            Q=np.array([np.asarray(cw.Q, dtype=float) for cw in cwells]),
+            stream_dist=stream_dist if len(streams) > 0 else None,
+            drawdown_dist=drawdown_dist if len(dds) > 0 else None,
+            stream_apportionment=apportionment,
+            streambed_conductance=streambed_conductance,
+            depl_method=project.depl_method,
+            dd_days=[cw.theis_dd_days for cw in cwells],
+            nrealizations=nrealizations,
+            seed=seed,
+            stream_names=streams,
+            drawdown_names=dds,
+            drawdown_mask=drawdown_mask,
+            depletion_factor=1.0 / 3600 / 24,
+        )
+
+    def _increments(self):
+        """changes in pumping rate starting at each time, with the same
+        convention as pycap.solutions._superpose_schedules, so the
+        response at time t is the sum of increments[:, k] times the unit
+        response at time t - k"""
+        increments = np.zeros(self.Q.shape)
+        increments[:, 0] = self.Q[:, 0]
+        increments[:, :-1] += np.diff(self.Q, axis=1)
+        return increments
+
+    def _max_depletion(self, r, increments, shifts):
+        """maximum over time of the depletion summed over wells for
+        each stream, for a block r of realizations"""
+        T = self.T[r]
+        if self.depl_method == "walton_depletion":
+            # walton_depletion method (only) needs these goofy units
+            # of gpd/dt for T
+            T = T * 7.48
+        kwargs = {}
+        if self.streambed_conductance is not None:
+            kwargs["streambed_conductance"] = self.streambed_conductance[
+                r, ..., None
+            ]
+        # unit responses with shape (realization, well, stream, time)
+        unit = pycap.ALL_DEPL_METHODS[self.depl_method](
+            T[:, :, None, None],
+            self.S[r][:, :, None, None],
+            np.arange(self.ntimes),
+            self.stream_dist[None, :, :, None],
+            1.0,
+            **kwargs,
+        )
+        # superpose the increments of all wells, apportioned to each
+        # stream and summed over the wells
+        total = np.zeros((unit.shape[0], unit.shape[2], self.ntimes))
+        for shift in shifts:
+            total[..., shift:] += np.einsum(
+                "ws,rwst->rst",
+                increments[:, shift, None] * self.stream_apportionment,
+                unit[..., : self.ntimes - shift],
+            )
+        return total.max(axis=-1) * self.depletion_factor
+
+    def _drawdown(self, r, increments, shifts):
+        """drawdown at dd_days summed over wells for each drawdown
+        response, for a block r of realizations, which only needs the
+        unit responses at dd_days minus the time of each increment"""
+        coefs = np.where(
+            shifts[None, :] <= self.dd_days[:, None],
+            increments[:, shifts],
+            0.0,
+        )
+        times = np.maximum(self.dd_days[:, None] - shifts[None, :], 0)
+        # unit responses with shape (realization, well, response, shift)
+        unit = pycap.theis_drawdown(
+            self.T[r][:, :, None, None],
+            self.S[r][:, :, None, None],
+            times[None, :, None, :],
+            self.drawdown_dist[None, :, :, None],
+            1.0,
+        )
+        return np.einsum(
+            "ws,rwds,wd->rd", coefs, unit, self.drawdown_mask.astype(float)
+        )
+
+    def run(self):
+        """Evaluate all realizations, in blocks that bound the memory
+        used, keeping the maximum depletion (nrealizations, nstreams) and
+        drawdown (nrealizations, ndrawdown) of each realization
+
+        Returns
+        -------
+        ensemble: Ensemble
+            this ensemble, with max_depletion and drawdown
+        """
+        increments = self._increments()
+        shifts = np.flatnonzero(np.any(increments != 0, axis=0))
+        nresp = max(
+            [
+                i.shape[1]
+                for i in (self.stream_dist, self.drawdown_dist)
+                if i is not None
+            ],
+            default=1,
+        )
+        block = max(
+            1, _ENSEMBLE_CHUNK // max(self.nwells * nresp * self.ntimes, 1)
+        )
+        if self.stream_dist is not None:
+            self.max_depletion = np.zeros(
+                (self.nrealizations, self.stream_dist.shape[1])
+            )
+        if self.drawdown_dist is not None:
+            self.drawdown = np.zeros(
+                (self.nrealizations, self.drawdown_dist.shape[1])
+            )
+        for start in range(0, self.nrealizations, block):
+            r = slice(start, start + block)
+            if self.stream_dist is not None:
+                self.max_depletion[r] = self._max_depletion(
+                    r, increments, shifts
+                )
+            if self.drawdown_dist is not None:
+                self.drawdown[r] = self._drawdown(r, increments, shifts)
+        return self
+
+    def percentiles(self, q=(10, 50, 90)):
+        """Percentiles of the maximum depletion and drawdown over all
+        realizations, evaluating the realizations if needed
+
+        Parameters
+        ----------
+        q: sequence of floats, optional
+            percentiles to report. Defaults to (10, 50, 90).
+
+        Returns
+        -------
+        percentiles: dict of pd.DataFrame
+            'max_depletion' and 'drawdown' tables with a row for each
+            response and a column for each percentile (e.g. P10)
+        """
+        if self.max_depletion is None and self.drawdown is None:
+            self.run()
+        columns = [f"P{i:g}" for i in q]
+        percentiles = {}
+        for name, values, index in (
+            ("max_depletion", self.max_depletion, self.stream_names),
+            ("drawdown", self.drawdown, self.drawdown_names),
+        ):
+            if values is None:
+                continue
+            percentiles[name] = pd.DataFrame(
+                np.percentile(values, q, axis=0).T,
+                index=index,
+                columns=columns,
+            )
+        return percentiles
@@ -0,0 +1,302 @@
+import functools
+from fractions import Fraction
+from math import factorial
+
+import numpy as np
+
+from pycap.pycap_exceptions import PycapException
+
+""" Numerical inversion of Laplace transforms used by the
+    Laplace-domain solutions (e.g. Ward and Lough, 2011)
+    as part of the pycap suite.
+
+"""
+
+
+@functools.lru_cache(maxsize=None)
+def _stehfest_weights_exact(N):
+    """Internal function to calculate the Gaver-Stehfest weights
+    as exact fractions using integer arithmetic
+
+    Parameters
+    ----------
+    N: int
+        Number of Stehfest series levels, must be even
+
+    Returns
+    -------
+    V: tuple of fractions.Fraction
+        Stehfest weights V_1 through V_N
+    """
+    half = N // 2
+    V = []
+    for jj in range(1, N + 1):
+        Vj = Fraction(0)
+        for kk in range((jj + 1) // 2, min(jj, half) + 1):
+            Vj += Fraction(
+                kk**half * factorial(2 * kk),
+                factorial(half - kk)
+                * factorial(kk)
+                * factorial(kk - 1)
+                * factorial(jj - kk)
+                * factorial(2 * kk - jj),
+            )
+        V.append((-1) ** (half + jj) * Vj)
+    return tuple(V)
+
+
+@functools.lru_cache(maxsize=None)
+def stehfest_weights(N):
+    """Gaver-Stehfest weights for numerical inversion of a
+    Laplace transform, f(t) = ln(2)/t * sum_j V_j * F(j*ln(2)/t)
+
+    The weights are calculated once for each N in exact rational
+    arithmetic, so there is no cancellation in the weights themselves,
+    then rounded to float and cached for the life of the process.
+
+    Stehfest, H., 1970, Algorithm 368: Numerical inversion of Laplace
+    transforms: Communications of the ACM, v. 13, no. 1, pgs. 47-49,
+    https://doi.org/10.1145/361953.361969.
+
+    Parameters
+    ----------
+    N: int
+        Number of Stehfest series levels, must be a positive even number
+
+    Returns
+    -------
+    V: np.array
+        read-only array of the N Stehfest weights V_1 through V_N
+    """
+    if int(N) != N or N < 2 or N % 2 != 0:
+        raise PycapException(
+            "The number of Stehfest series levels must be a positive\n"
+            + f"even integer, not {N}"
+        )
+    V = np.array([float(v) for v in _stehfest_weights_exact(int(N))])
+    V.setflags(write=False)
+    return V
+
+
+def _time_array(t):
+    """Internal function to make a float array of positive times"""
+    t = np.atleast_1d(np.asarray(t, dtype=float))
+    if np.any(t <= 0):
+        raise PycapException(
+            "Times for numerical Laplace inversion must be positive"
+        )
+    return t
+
+
+def _digits(accuracy):
+    """Internal function to convert a relative accuracy to a
+    number of significant digits"""
+    if not 0 < accuracy < 1:
+        raise PycapException(
+            "Laplace inversion accuracy must be between 0 and 1, "
+            + f"not {accuracy}"
+        )
+    return -np.log10(accuracy)
+
+
+def stehfest(F, t, N=None, accuracy=None):
+    """Invert a Laplace transform with the Gaver-Stehfest algorithm
+
+    Only evaluates F for real p, but round-off in the alternating sum
+    limits the accuracy in double precision to about 6 or 7 digits,
+    reached at N of 14 to 18.
+
+    Parameters
+    ----------
+    F: function
+        Laplace-space function of p, broadcasting over an
+        array of p with shape (N, len(t))
+    t: float, optionally np.array or list
+        positive times at which to invert the transform
+    N: int, optional
+        Number of Stehfest series levels, must be a positive even number.
+        Calculated from accuracy if not given.
+    accuracy: float, optional
+        target relative accuracy used to choose N. Defaults to 1e-6
+        if neither N nor accuracy are given.
+
+    Returns
+    -------
+    f: np.array
+        inverse transform at times t
+    """
+    t = _time_array(t)
+    if N is None:
+        digits = _digits(1e-6 if accuracy is None else accuracy)
+        N = int(min(max(2 * np.ceil(1.1 * digits), 2), 18))
+    V = stehfest_weights(N)
+    ln2t = np.log(2) / t
+    p = np.arange(1, N + 1)[:, None] * ln2t
+    return ln2t * np.sum(V[:, None] * F(p), axis=0)
+
+
+def fixed_talbot(F, t, M=None, accuracy=None):
+    """Invert a Laplace transform with the fixed Talbot algorithm
+
+    Integrates along a deformed Bromwich contour that wraps around
+    the negative real axis, so F is evaluated at complex p and must
+    be analytic off the negative real axis.
+
+    Abate, J., and Valko, P.P., 2004, Multi-precision Laplace transform
+    inversion: International Journal for Numerical Methods in Engineering,
+    v. 60, no. 5, pgs. 979-993, https://doi.org/10.1002/nme.995.
+
+    Parameters
+    ----------
+    F: function
+        Laplace-space function of complex p, broadcasting over an
+        array of p with shape (M, len(t))
+    t: float, optionally np.array or list
+        positive times at which to invert the transform
+    M: int, optional
+        number of points on the contour.
+        Calculated from accuracy if not given.
+    accuracy: float, optional
+        target relative accuracy used to choose M. Defaults to 1e-8
+        if neither M nor accuracy are given.
+
+    Returns
+    -------
+    f: np.array
+        inverse transform at times t
+    """
+    t = _time_array(t)
+    if M is None:
+        digits = _digits(1e-8 if accuracy is None else accuracy)
+        M = int(min(max(np.ceil(1.7 * digits), 4), 32))
+    r = 2.0 * M / (5.0 * t)
+    theta = (np.arange(1, M) * np.pi / M)[:, None]
+    cot = 1.0 / np.tan(theta)
+    p = np.vstack([r + 0j, r * theta * (cot + 1j)])
+    sigma = theta + (theta * cot - 1.0) * cot
+    terms = np.exp(t * p) * F(p)
+    total = 0.5 * terms[0].real + np.sum(
+        (terms[1:] * (1.0 + 1j * sigma)).real, axis=0
+    )
+    return r / M * total
+
+
+def de_hoog(F, t, M=None, accuracy=None):
+    """Invert a Laplace transform with the de Hoog algorithm
+
+    Accelerates the Fourier series along a Bromwich line
+    Re(p) = gamma with a continued fraction from the
+    quotient-difference algorithm, so F is evaluated at
+    complex p with positive real part.
+
+    de Hoog, F.R., Knight, J.H., and Stokes, A.N., 1982, An improved
+    method for numerical inversion of Laplace transforms: SIAM Journal
+    on Scientific and Statistical Computing, v. 3, no. 3, pgs. 357-366,
+    https://doi.org/10.1137/0903022.
+
+    Parameters
+    ----------
+    F: function
+        Laplace-space function of complex p, broadcasting over an
+        array of p with shape (2M + 1, len(t))
+    t: float, optionally np.array or list
+        positive times at which to invert the transform
+    M: int, optional
+        number of continued fraction pairs, using 2M + 1
+        evaluations of F for each time.
+        Calculated from accuracy if not given.
+    accuracy: float, optional
+        target relative accuracy used to choose M and the
+        Bromwich line. Defaults to 1e-8 if neither M nor
+        accuracy are given.
+
+    Returns
+    -------
+    f: np.array
+        inverse transform at times t
+    """
+    t = _time_array(t)
+    tol = 1e-8 if accuracy is None else accuracy
+    digits = _digits(tol)
+    if M is None:
+        M = int(min(max(np.ceil(1.2 * digits), 4), 20))
+    # period of the Fourier series is 2T, with T twice the time
+    T = 2.0 * t
+    gamma = -np.log(tol) / (2.0 * T)
+    k = np.arange(2 * M + 1)[:, None]
+    a = F(gamma + 1j * np.pi * k / T)
+    a = np.array(a, dtype=complex)
+    a[0] = a[0] / 2.0
+
+    # quotient-difference table for the continued fraction coefficients
+    d = np.zeros_like(a)
+    d[0] = a[0]
+    e = np.zeros_like(a)
+    q = a[1:] / a[:-1]
+    for r in range(1, M + 1):
+        e = q[1:] - q[:-1] + e[1 : len(q)]
+        d[2 * r - 1] = -q[0]
+        d[2 * r] = -e[0]
+        if r < M:
+            q = q[1:-1] * e[1:] / e[:-1]
+
+    # recurrence for the numerator and denominator of the continued
+    # fraction, with the remainder estimate for the last term
+    z = np.exp(1j * np.pi * t / T)
+    A_prev, A = np.zeros_like(z), d[0] * np.ones_like(z)
+    B_prev, B = np.ones_like(z), np.ones_like(z)
+    for n in range(1, 2 * M):
+        A_prev, A = A, A + d[n] * z * A_prev
+        B_prev, B = B, B + d[n] * z * B_prev
+    h = 0.5 * (1.0 + (d[2 * M - 1] - d[2 * M]) * z)
+    R = -h * (1.0 - np.sqrt(1.0 + d[2 * M] * z / h**2))
+    A = A + R * A_prev
+    B = B + R * B_prev
+    return np.exp(gamma * t) / T * (A / B).real
+
+
+LAPLACE_METHODS = {
+    "stehfest": stehfest,
+    "talbot": fixed_talbot,
+    "dehoog": de_hoog,
+}
+
+
+def invert_laplace(F, t, method="stehfest", accuracy=None, **kwargs):
+    """Numerically invert a Laplace transform at an array of times
+
+    Gaver-Stehfest is cheapest for a few digits and only uses real p.
+    Fixed Talbot and de Hoog evaluate F at complex p and reach much
+    higher accuracy; only de Hoog handles transforms with singularities
+    off the negative real axis, such as oscillating functions.
+
+    Parameters
+    ----------
+    F: function
+        Laplace-space function of p that broadcasts over a 2-D array
+        of p with one column per time. Must accept complex p for
+        the "talbot" and "dehoog" methods.
+    t: float, optionally np.array or list
+        positive times at which to invert the transform
+    method: str, optional
+        inversion algorithm, one of "stehfest" (Gaver-Stehfest),
+        "talbot" (fixed Talbot) or "dehoog" (de Hoog et al., 1982).
+        Defaults to "stehfest".
+    accuracy: float, optional
+        target relative accuracy used to choose the number of terms
+        for the method. Smaller values cost more evaluations of F.
+    **kwargs:
+        method-specific number of terms, N for "stehfest" and
+        M for "talbot" and "dehoog", which overrides accuracy
+
+    Returns
+    -------
+    f: np.array
+        inverse transform at times t
+    """
+    if method not in LAPLACE_METHODS:
+        raise PycapException(
+            f"Laplace inversion method {method} not recognized.\n"
+            + f"Must be one of {list(LAPLACE_METHODS.keys())}"
+        )
+    return LAPLACE_METHODS[method](F, t, accuracy=accuracy, **kwargs)
@@ -0,0 +1,195 @@
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+import pycap
+from pycap.pycap_exceptions import PycapException
+
+""" Process-level cache of unit-rate step responses
+    as part of the pycap suite.
+
+"""
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+def _sdf_groups(T, S, dist, kwargs):
+    """dimensionless groups for solutions that only depend on
+    the stream depletion factor, dist**2 * S / T"""
+    return (dist**2 * S / T,), 1.0
+
+
+def _theis_groups(T, S, dist, kwargs):
+    """dimensionless groups for Theis drawdown, which is 1/T times
+    a function of dist**2 * S / T"""
+    return (dist**2 * S / T,), 1.0 / T
+
+
+def _hunt_99_depletion_groups(T, S, dist, kwargs):
+    """dimensionless groups for Hunt (1999) depletion, adding the
+    dimensionless streambed conductance to the stream depletion factor"""
+    streambed_conductance = kwargs.get("streambed_conductance")
+    if streambed_conductance is None:
+        return None
+    return (dist**2 * S / T, streambed_conductance * dist / T), 1.0
+
+
+def _hunt_99_drawdown_groups(T, S, dist, kwargs):
+    """dimensionless groups for Hunt (1999) drawdown, adding the
+    drawdown location relative to the well distance, or None for a well
+    on the stream, which has no location relative to the well distance"""
+    streambed_conductance = kwargs.get("streambed_conductance")
+    x = kwargs.get("x")
+    y = kwargs.get("y")
+    if streambed_conductance is None or x is None or y is None:
+        return None
+    if dist == 0:
+        return None
+    return (
+        dist**2 * S / T,
+        streambed_conductance * dist / T,
+        x / dist,
+        y / dist,
+    ), 1.0 / T
+
+
+# functions returning the dimensionless groups and the scale factor for
+# the unit-rate step response of each solution, which is the scale factor
+# times a function of the groups and time. Solutions that are not listed
+# are cached on their dimensional parameters.
+DIMENSIONLESS_GROUPS = {
+    "theis_drawdown": _theis_groups,
+    "hunt_99_drawdown": _hunt_99_drawdown_groups,
+    "glover_depletion": _sdf_groups,
+    "walton_depletion": _sdf_groups,
+    "hunt_99_depletion": _hunt_99_depletion_groups,
+}
+
+
+class ResponseCache:
+    """Least-recently-used cache of unit-rate step responses
+
+    All of the solutions are linear in the pumping rate, so the response
+    to any pumping schedule can be built from the response to a unit
+    pumping rate starting at time zero on the project time axis. Many
+    well-response pairs share the same dimensionless parameters (e.g.
+    the stream depletion factor dist**2 * S / T for Glover), so the unit
+    response is stored once for each solution, set of dimensionless
+    groups (rounded to a number of significant digits) and number of
+    times, and rescaled for the dimensional parameters of each lookup.
+
+    """
+
+    def __init__(self, maxsize=1024, digits=10) -> None:
+        """Cache of unit-rate step responses
+
+        Parameters
+        ----------
+        maxsize: int, optional
+            Maximum number of responses to keep. The least recently
+            used response is evicted when the cache is full. A maxsize
+            of 0 disables caching. Defaults to 1024.
+        digits: int, optional
+            Number of significant digits of the dimensionless groups
+            used in the cache key, so parameters that agree up to
+            rounding share a response. Defaults to 10.
+        """
+        if maxsize < 0:
+            raise PycapException(
+                "ResponseCache maxsize must be zero or positive, "
+                + f"not {maxsize}"
+            )
+        self.maxsize = maxsize
+        self.digits = digits
+        self.hits = 0
+        self.misses = 0
+        self._responses = OrderedDict()
+
+    def _round(self, value):
+        """round a key value to the number of significant digits"""
+        if isinstance(value, tuple):
+            return tuple(self._round(v) for v in value)
+        if isinstance(value, (float, np.floating)):
+            return float(f"{value:.{self.digits}g}")
+        return value
+
+    def _key(self, method, T, S, dist, ntimes, kwargs):
+        """cache key and scale factor for a unit-rate step response"""
+        groups = None
+        if method in DIMENSIONLESS_GROUPS:
+            groups = DIMENSIONLESS_GROUPS[method](T, S, dist, kwargs)
+        if groups is None:
+            # no dimensionless form, so key on all of the parameters
+            groups = (
+                (T, S, dist) + tuple((k, kwargs[k]) for k in sorted(kwargs)),
+                1.0,
+            )
+        values, scale = groups
+        return (method, ntimes, self._round(values)), scale
+
+    def unit_response(self, method, T, S, dist, ntimes, **kwargs):
+        """Unit-rate step response of a solution on the project time axis
+
+        Parameters
+        ----------
+        method: string
+            name of a solution in ALL_DD_METHODS or ALL_DEPL_METHODS
+        T: float
+            Aquifer Transmissivity [L**2/T], in the units the solution expects
+        S: float
+            Aquifer Storage [unitless]
+        dist: float
+            Distance between well and response [L]
+        ntimes: int
+            number of times on the time axis, 0 to ntimes - 1 [T]
+        **kwargs: extra values required by the solution
+
+        Returns
+        -------
+        response: np.array
+            read-only response to a unit pumping rate starting at
+            time zero, for each time on the time axis
+        """
+        method = method.lower()
+        key, scale = self._key(method, T, S, dist, ntimes, kwargs)
+        if key in self._responses:
+            self.hits += 1
+            self._responses.move_to_end(key)
+            response = self._responses[key] * scale
+        else:
+            self.misses += 1
+            func = {**pycap.ALL_DD_METHODS, **pycap.ALL_DEPL_METHODS}[method]
+            response = np.atleast_1d(
+                np.asarray(
+                    func(T, S, list(range(ntimes)), dist, 1.0, **kwargs),
+                    dtype=float,
+                )
+            )
+            if self.maxsize > 0:
+                self._responses[key] = response / scale
+                while len(self._responses) > self.maxsize:
+                    self._responses.popitem(last=False)
+        response.setflags(write=False)
+        return response
+
+    def info(self):
+        """Cache statistics
+
+        Returns
+        -------
+        info: CacheInfo
+            named tuple of hits, misses, maxsize and currsize
+        """
+        return CacheInfo(
+            self.hits, self.misses, self.maxsize, len(self._responses)
+        )
+
+    def clear(self):
+        """Remove all responses and reset the hit and miss counters"""
+        self._responses.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# cache shared by all WellResponse objects in the process
+RESPONSE_CACHE = ResponseCache()
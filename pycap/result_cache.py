@@ -0,0 +1,237 @@
+import hashlib
+import os
+import tempfile
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+
+from pycap.pycap_exceptions import PycapException
+
+""" Persistent, content-addressed cache of well response results
+    as part of the pycap suite.
+
+"""
+
+ResultCacheInfo = namedtuple(
+    "ResultCacheInfo", ["hits", "misses", "maxsize", "currsize"]
+)
+
+# version of the cache key, changed whenever the results stored
+# for the same inputs could change
+_KEY_VERSION = 1
+# default maximum size of the cache on disk, in bytes
+_DEFAULT_MAXSIZE = 2**30
+_SUFFIX = ".npy"
+
+
+def _digest_Q(Q):
+    """digest of the values and times of a pumping time series that,
+    unlike _hash_Q, is the same in every process and session"""
+    digest = hashlib.sha256()
+    if isinstance(Q, (pd.Series, pd.DataFrame)):
+        index = np.asarray(Q.index)
+        digest.update(str(index.dtype).encode())
+        if index.dtype.kind in "biufcmM":
+            digest.update(index.tobytes())
+        else:
+            # the bytes of an object index are pointers, so hash the
+            # labels themselves
+            digest.update(
+                pd.util.hash_pandas_object(Q.index, index=False)
+                .to_numpy()
+                .tobytes()
+            )
+    digest.update(np.ascontiguousarray(Q, dtype=float).tobytes())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Least-recently-used cache of drawdown and depletion results on disk
+
+    Each result is stored in a file named from a hash of all of the inputs
+    of the well-response evaluation: the solution, T, S, distance, extra
+    arguments, superposition method, stream apportionment and the pumping
+    schedule. When a Project is run again (e.g. after editing one well in
+    the YML file), only the pairs whose inputs changed are evaluated and
+    the remaining results are loaded from the cache. Files that were not
+    used for the longest time are removed when the cache is larger than
+    maxsize.
+
+    """
+
+    def __init__(self, directory, maxsize=_DEFAULT_MAXSIZE) -> None:
+        """Cache of results in a directory
+
+        Parameters
+        ----------
+        directory: str or pathlib.Path
+            Directory for the cache, created if it does not exist.
+            The directory can be shared by many Projects.
+        maxsize: int, optional
+            Maximum size of the files in the cache, in bytes. The least
+            recently used results are removed when the cache is larger.
+            Defaults to 1 GiB.
+        """
+        if maxsize < 0:
+            raise PycapException(
+                "ResultCache maxsize must be zero or positive, "
+                + f"not {maxsize}"
+            )
+        self.directory = str(directory)
+        self.maxsize = int(maxsize)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+        # subdirectories known to exist
+        self._subdirs = set()
+        # sizes of the files in the cache, least recently used first
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(_SUFFIX):
+                    stat = os.stat(os.path.join(root, name))
+                    files.append(
+                        (stat.st_mtime, name[: -len(_SUFFIX)], stat.st_size)
+                    )
+        self._sizes = OrderedDict(
+            (key, size) for _, key, size in sorted(files)
+        )
+        self._currsize = sum(self._sizes.values())
+        self._evict()
+
+    def key(self, response, kind):
+        """Key of the result of a WellResponse in the cache
+
+        Parameters
+        ----------
+        response: pycap.wells.WellResponse
+            response to look up
+        kind: str
+            either 'drawdown' or 'depletion'
+
+        Returns
+        -------
+        key: str
+            hex digest of the inputs of the result
+        """
+        signature = response._signature(kind, hash_Q=_digest_Q)
+        return hashlib.sha256(
+            repr((_KEY_VERSION, kind, signature)).encode()
+        ).hexdigest()
+
+    def _path(self, key):
+        """path of the file for a key, in a subdirectory named from the
+        first two characters of the key to keep directories small"""
+        return os.path.join(self.directory, key[:2], key + _SUFFIX)
+
+    def get(self, key):
+        """Result for a key, or None if it is not in the cache
+
+        Parameters
+        ----------
+        key: str
+            key from ResultCache.key
+
+        Returns
+        -------
+        result: np.array or None
+            read-only result
+        """
+        path = self._path(key)
+        try:
+            result = np.load(path, allow_pickle=False)
+        except (OSError, ValueError):
+            # not in the cache, removed by another process or incomplete
+            self.misses += 1
+            self._forget(key)
+            return None
+        self.hits += 1
+        # the modification time marks the most recent use, so the order
+        # is kept when the cache is opened again
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        if key in self._sizes:
+            self._sizes.move_to_end(key)
+        else:
+            self._sizes[key] = os.path.getsize(path)
+            self._currsize += self._sizes[key]
+        result.setflags(write=False)
+        return result
+
+    def put(self, key, result):
+        """Store a result, then remove the least recently used results
+        if the cache is larger than maxsize
+
+        Parameters
+        ----------
+        key: str
+            key from ResultCache.key
+        result: np.array
+            drawdown or depletion result
+        """
+        if self.maxsize == 0:
+            return
+        path = self._path(key)
+        if key[:2] not in self._subdirs:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._subdirs.add(key[:2])
+        # write to a temporary file and rename it, so other processes
+        # never read a partial file
+        fd, tmpname = tempfile.mkstemp(
+            suffix=".tmp", dir=os.path.dirname(path)
+        )
+        try:
+            with os.fdopen(fd, "wb") as ofp:
+                np.save(ofp, np.asarray(result, dtype=float))
+            os.replace(tmpname, path)
+        except BaseException:
+            if os.path.exists(tmpname):
+                os.remove(tmpname)
+            raise
+        self._forget(key)
+        self._sizes[key] = os.path.getsize(path)
+        self._currsize += self._sizes[key]
+        self._evict()
+
+    def _forget(self, key):
+        """remove a key from the index of the cache"""
+        if key in self._sizes:
+            self._currsize -= self._sizes.pop(key)
+
+    def _evict(self):
+        """remove the least recently used files until the cache
+        is no larger than maxsize"""
+        while self._sizes and self._currsize > self.maxsize:
+            key = next(iter(self._sizes))
+            self._forget(key)
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def info(self):
+        """Cache statistics
+
+        Returns
+        -------
+        info: ResultCacheInfo
+            named tuple of hits (results loaded), misses (results
+            calculated), maxsize and currsize, in bytes
+        """
+        return ResultCacheInfo(
+            self.hits, self.misses, self.maxsize, self._currsize
+        )
+
+    def clear(self):
+        """Remove all results and reset the hit and miss counters"""
+        for key in list(self._sizes):
+            self._forget(key)
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,363 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from pycap.pycap_exceptions import PycapException
+
+""" Binary, chunked and compressed stores of the results of
+    an analysis Project as part of the pycap suite.
+
+"""
+
+# file extension of the store written for each output format
+STORE_FORMATS = {"parquet": ".parquet", "netcdf": ".nc", "zarr": ".zarr"}
+# number of days in each chunk along the time dimension
+_STORE_TIME_CHUNK = 365
+# maximum number of rows in each parquet row group
+_PARQUET_ROW_GROUP = 2**20
+CATEGORIES = ("existing", "proposed", "total")
+
+
+def _results_variables(project):
+    """Internal function to collect the results of a Project as labeled
+    arrays, with the response dimension first and time second so each
+    chunk holds one response for a window of time
+
+    Parameters
+    ----------
+    project: pycap.analysis_project.Project
+        Project with aggregated results
+
+    Returns
+    -------
+    coords: dict
+        labels for each dimension
+    aux_coords: dict
+        additional labels along a dimension, as (dim, labels) tuples
+    variables: dict
+        (dims, values, attrs) tuples for each variable
+    attrs: dict
+        attributes of the Project
+    """
+    depl = project.depletion_results
+    dd = project.drawdown_results
+    nwells = len(depl.wells)
+    times = np.arange(1, project.ts_len + 1)
+
+    # full drawdown time series for each well and response
+    dd_index = {ck: i for i, ck in enumerate(dd.responses)}
+    dd_cube = np.full((len(dd.responses), len(times), nwells), np.nan)
+    for i, cwell in enumerate(dd.wells):
+        for ck, v in project.wells[cwell].drawdown.items():
+            dd_cube[dd_index[ck], :, i] = v
+
+    # aggregated results for each category of wells
+    depl_index = {ck: i for i, ck in enumerate(depl.responses)}
+    base_streams = list(project.total_aggregated_base_stream_sum_depletion)
+    base_index = {ck: i for i, ck in enumerate(base_streams)}
+    agg_depl = np.full((len(depl_index), len(times), 3), np.nan)
+    agg_max = np.full((len(depl_index), 3), np.nan)
+    agg_dd = np.full((len(dd_index), 3), np.nan)
+    agg_base = np.full((len(base_index), len(times), 3), np.nan)
+    for c, category in enumerate(CATEGORIES):
+        for ck, v in getattr(
+            project, f"{category}_aggregated_sum_depletion"
+        ).items():
+            agg_depl[depl_index[ck], :, c] = v
+        for ck, v in getattr(
+            project, f"{category}_aggregated_max_depletion"
+        ).items():
+            agg_max[depl_index[ck], c] = v
+        for ck, v in getattr(
+            project, f"{category}_aggregated_drawdown"
+        ).items():
+            agg_dd[dd_index[ck], c] = v
+        for ck, v in getattr(
+            project, f"{category}_aggregated_base_stream_sum_depletion"
+        ).items():
+            agg_base[base_index[ck], :, c] = v
+
+    coords = {
+        "well": np.array([str(i) for i in depl.wells], dtype=object),
+        "stream_response": np.array(depl.responses, dtype=object),
+        "drawdown_response": np.array(dd.responses, dtype=object),
+        "base_stream": np.array(base_streams, dtype=object),
+        "category": np.array(CATEGORIES, dtype=object),
+        "time": times,
+    }
+    aux_coords = {"status": ("well", np.array(depl.status, dtype=object))}
+    cfs = {"units": "cfs"}
+    ft = {"units": "ft"}
+    variables = {
+        "depletion": (
+            ("stream_response", "time", "well"),
+            np.where(depl.present[:, :, None], depl.values, np.nan).transpose(
+                1, 2, 0
+            ),
+            {"long_name": "stream depletion of each well", **cfs},
+        ),
+        "drawdown": (
+            ("drawdown_response", "time", "well"),
+            dd_cube,
+            {"long_name": "drawdown of each well", **ft},
+        ),
+        "dd_days": (
+            ("well",),
+            np.array([project.wells[i].theis_dd_days for i in dd.wells]),
+            {"long_name": "time of reported drawdown", "units": "days"},
+        ),
+        "aggregated_depletion": (
+            ("stream_response", "time", "category"),
+            agg_depl,
+            {"long_name": "stream depletion summed over wells", **cfs},
+        ),
+        "aggregated_max_depletion": (
+            ("stream_response", "category"),
+            agg_max,
+            {
+                "long_name": "maximum stream depletion summed over wells",
+                **cfs,
+            },
+        ),
+        "base_stream_depletion": (
+            ("base_stream", "time", "category"),
+            agg_base,
+            {
+                "long_name": "stream depletion summed over wells "
+                + "and responses on each base stream",
+                **cfs,
+            },
+        ),
+        "aggregated_drawdown": (
+            ("drawdown_response", "category"),
+            agg_dd,
+            {
+                "long_name": "drawdown at the time of reported drawdown "
+                + "summed over wells",
+                **ft,
+            },
+        ),
+    }
+    attrs = {
+        "name": str(project.name),
+        "ymlfile": str(project.ymlfile),
+        "T": project.T,
+        "T_units": "ft**2/day",
+        "S": project.S,
+        "depl_method": str(project.depl_method),
+        "time_units": "days",
+    }
+    return coords, aux_coords, variables, attrs
+
+
+def _long_frame(name, dims, values, coords, aux_coords, start=0):
+    """Internal function to make a long-format DataFrame with a column
+    for each dimension of an array and a column of its non-missing values,
+    for a block of values starting at index start along the first
+    dimension"""
+    if values.dtype.kind == "f":
+        idx = np.nonzero(~np.isnan(values))
+    else:
+        idx = np.nonzero(np.ones(values.shape, dtype=bool))
+    data = {}
+    for dim, i in zip(dims, (idx[0] + start,) + idx[1:]):
+        labels = coords[dim]
+        if labels.dtype.kind == "O":
+            # categories of all labels, so every block has the same schema
+            data[dim] = pd.Categorical.from_codes(i, categories=labels)
+        else:
+            data[dim] = labels[i]
+        for aux_name, (aux_dim, aux_labels) in aux_coords.items():
+            if aux_dim == dim:
+                categories, codes = np.unique(aux_labels, return_inverse=True)
+                data[aux_name] = pd.Categorical.from_codes(
+                    codes[i], categories=categories
+                )
+    data[name] = values[idx]
+    return pd.DataFrame(data)
+
+
+def _write_parquet(filename, coords, aux_coords, variables, attrs):
+    """Internal function to write a directory with a parquet file
+    for each variable, sorted by response and then time"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise PycapException("pyarrow is required to write a parquet store")
+
+    os.makedirs(filename, exist_ok=True)
+    for name, (dims, values, var_attrs) in variables.items():
+        if values.size == 0:
+            continue
+        metadata = {
+            "pycap": json.dumps(
+                {"variable": name, "dims": dims, **var_attrs, **attrs}
+            )
+        }
+        writer = None
+        # write one response at a time
+        step = 1 if values.ndim > 1 else values.shape[0]
+        for start in range(0, values.shape[0], step):
+            table = pa.Table.from_pandas(
+                _long_frame(
+                    name,
+                    dims,
+                    values[start : start + step],
+                    coords,
+                    aux_coords,
+                    start=start,
+                ),
+                preserve_index=False,
+            )
+            table = table.replace_schema_metadata(
+                {**table.schema.metadata, **metadata}
+            )
+            if writer is None:
+                writer = pq.ParquetWriter(
+                    os.path.join(filename, f"{name}.parquet"),
+                    table.schema,
+                    compression="zstd",
+                )
+            writer.write_table(table, row_group_size=_PARQUET_ROW_GROUP)
+        writer.close()
+
+
+def _write_xarray(
+    filename, output_format, coords, aux_coords, variables, attrs
+):
+    """Internal function to write a netcdf or zarr store with chunks of
+    one response for a window of time"""
+    try:
+        import xarray as xr
+    except ImportError:
+        raise PycapException(
+            f"xarray is required to write a {output_format} store"
+        )
+
+    variables = {
+        name: v for name, v in variables.items() if v[1].size > 0
+    }
+    ds = xr.Dataset(
+        variables, coords={**coords, **aux_coords}, attrs=attrs
+    )
+    encoding = {}
+    for name, (dims, values, _) in variables.items():
+        chunks = tuple(
+            min(n, _STORE_TIME_CHUNK) if dim == "time" else n
+            for dim, n in zip(dims, values.shape)
+        )
+        if len(dims) > 1:
+            chunks = (1,) + chunks[1:]
+        if output_format == "netcdf":
+            encoding[name] = {
+                "zlib": True,
+                "complevel": 4,
+                "chunksizes": chunks,
+            }
+        else:
+            encoding[name] = {"chunks": chunks}
+    if output_format == "netcdf":
+        ds.to_netcdf(filename, encoding=encoding)
+    else:
+        ds.to_zarr(filename, mode="w", encoding=encoding)
+
+
+def write_results_store(project, filename, output_format="parquet"):
+    """Write the results of a Project to a binary store
+
+    The depletion and drawdown time series of every well at every
+    response are written as (response, time, well) arrays, with the
+    sums over existing, proposed and all wells, the maximum depletion
+    and drawdown reported in the tables of write_responses_csv, units
+    and the Project parameters. The arrays are compressed and chunked
+    by response and time, so one response or a window of time can be
+    read without reading the whole store (see read_results_store).
+
+    For "parquet", filename is a directory with a long-format file for
+    each variable, sorted by response and then time. "netcdf" and "zarr"
+    stores are written with xarray.
+
+    Parameters
+    ----------
+    project: pycap.analysis_project.Project
+        Project with aggregated results
+    filename: str or pathlib.Path
+        path to the store
+    output_format: str, optional
+        one of STORE_FORMATS. Defaults to "parquet".
+    """
+    if output_format not in STORE_FORMATS:
+        raise PycapException(
+            f"output format {output_format} not recognized.\n"
+            + f"Must be one of {list(STORE_FORMATS.keys())}"
+        )
+    coords, aux_coords, variables, attrs = _results_variables(project)
+    if output_format == "parquet":
+        _write_parquet(filename, coords, aux_coords, variables, attrs)
+    else:
+        _write_xarray(
+            filename, output_format, coords, aux_coords, variables, attrs
+        )
+
+
+def read_results_store(
+    filename, variable="depletion", response=None, times=None
+):
+    """Read one variable of a results store written by write_results_store
+
+    Parameters
+    ----------
+    filename: str or pathlib.Path
+        path to the store, with the extension of one of STORE_FORMATS
+    variable: str, optional
+        name of the variable to read. Defaults to "depletion".
+    response: str, optional
+        only read the values for one response (or base stream)
+    times: tuple of int, optional
+        only read the values for times from times[0] to times[1] inclusive
+
+    Returns
+    -------
+    results: pd.DataFrame or xarray.DataArray
+        for a parquet store, a long-format DataFrame with a column for
+        each dimension and a column of values, with the units and Project
+        parameters in its attrs. For a netcdf or zarr store, a lazily
+        loaded xarray.DataArray.
+    """
+    ext = os.path.splitext(str(filename).rstrip("/"))[1]
+    if ext == STORE_FORMATS["parquet"]:
+        import pyarrow.parquet as pq
+
+        path = os.path.join(filename, f"{variable}.parquet")
+        metadata = json.loads(pq.read_schema(path).metadata[b"pycap"])
+        filters = []
+        if response is not None:
+            filters.append((metadata["dims"][0], "==", response))
+        if times is not None:
+            filters.extend(
+                [("time", ">=", times[0]), ("time", "<=", times[1])]
+            )
+        results = pq.read_table(path, filters=filters or None).to_pandas()
+        results.attrs = metadata
+        return results
+
+    import xarray as xr
+
+    if ext == STORE_FORMATS["zarr"]:
+        ds = xr.open_zarr(filename)
+    elif ext == STORE_FORMATS["netcdf"]:
+        ds = xr.open_dataset(filename)
+    else:
+        raise PycapException(
+            f"{filename} is not a results store. The extension must be "
+            + f"one of {list(STORE_FORMATS.values())}"
+        )
+    results = ds[variable]
+    if response is not None:
+        results = results.sel({results.dims[0]: response})
+    if times is not None:
+        results = results.sel(time=slice(times[0], times[1]))
+    return results
@@ -1,11 +1,15 @@
 import sys
 import warnings
+from collections import namedtuple
+
 import numpy as np
 import pandas as pd
 import scipy.integrate as integrate
+import scipy.signal as signal
 import scipy.special as sps
-from scipy.special import gammaln
 
+from pycap.backends import _backend_kernel
+from pycap.laplace_inversion import invert_laplace
 from pycap.pycap_exceptions import PycapException
 
 
@@ -30,6 +34,33 @@ def _make_arrays(a):
         return np.atleast_1d(a).astype(float)
 
 
+def _broadcast_arrays(funcname, *args):
+    """private function to broadcast all inputs to float
+    arrays with a common shape
+    """
+    try:
+        return np.broadcast_arrays(*[np.asarray(a, dtype=float) for a in args])
+    except ValueError:
+        raise PycapException(
+            f"the array arguments to {funcname} have shapes\n"
+            + ", ".join(str(np.shape(a)) for a in args)
+            + "\nwhich cannot be broadcast together"
+        )
+
+
+def _scalar_or_array(result, *args, scalar=True):
+    """private function to return a scalar (or, if scalar is False, an
+    array of one value) if all of the inputs were scalars or single
+    values in a list or 1D array, as the solutions returned before they
+    were broadcast, otherwise return the broadcast array
+    """
+    if all(np.size(a) == 1 and np.ndim(a) <= 1 for a in args):
+        if scalar:
+            return np.ravel(result)[0]
+        return np.ravel(result)
+    return result
+
+
 # suppress divide by zero errors
 np.seterr(divide="ignore", invalid="ignore")
 
@@ -80,55 +111,56 @@ def theis_drawdown(T, S, time, dist, Q, **kwargs):
 
         https://pubs.usgs.gov/publication/70198446
 
+        All arguments may be arrays that broadcast together with NumPy
+        rules, e.g. time with shape (1, ntimes) and dist with shape
+        (ndist, 1) return drawdown with shape (ndist, ntimes).
+
     Parameters
     ----------
-    T: float
+    T: float, optionally np.array or list
         transmissivity [L**2/T]
-    S: float
+    S: float, optionally np.array or list
         storage [dimensionless]
     time: float, optionally np.array or list
         time at which to calculate results [T]
     dist: float, optionally np.array or list
         distance at which to calculate results in [L]
-    Q: float
+    Q: float, optionally np.array or list
         pumping rate (+ is extraction) [L**3/T]
     **kwargs: included to all drawdown methods for extra values required
         in some calls
 
     Returns
     -------
-    drawdown: float or array of floats
-        drawdown values at input parameter times/distances [L]
+    drawdown: array of floats
+        drawdown values at input parameter times/distances [L],
+        an array of one value if all inputs are scalars, otherwise
+        an array with the broadcast shape of the inputs
     """
+    T_b, S_b, time_b, dist_b, Q_b = _broadcast_arrays(
+        "theis_drawdown", T, S, time, dist, Q
+    )
 
-    time = _make_arrays(time)
-    dist = _make_arrays(dist)
-    if len(dist) > 1 and len(time) > 1:
-        _time_dist_error("theis_drawdown")
-
-    # construct the well function argument
-    # is dist is zero, then function does not exist
-    # trap for dist==0 and set to small value
-
-    # sort out geometry of solution
-    if len(dist) >= len(time):
-        if time[0] == 0:
-            return 0
-        else:
-            ddn = np.zeros_like(dist)
-            u = dist**2.0 * S / (4.0 * T * time)
-            ddn[dist != 0] = (Q / (4.0 * np.pi * T)) * sps.exp1(u[dist != 0])
-            return ddn
-    elif len(time) > len(dist):
-        ddn = np.zeros_like(time)
-        u = np.zeros_like(time)
-        u[time != 0] = dist**2.0 * S / (4.0 * T * time[time != 0])
-        ddn[time != 0] = (Q / (4.0 * np.pi * T)) * sps.exp1(u[time != 0])
-        return ddn
+    # the well function does not exist at zero distance or zero
+    # time, so drawdown is reported as zero in both cases
+    valid = (time_b != 0) & (dist_b != 0)
+    u = dist_b**2.0 * S_b / (4.0 * T_b * time_b)
+    ddn = np.where(valid, (Q_b / (4.0 * np.pi * T_b)) * sps.exp1(u), 0.0)
+    return _scalar_or_array(ddn, T, S, time, dist, Q, scalar=False)
 
 
 def hunt_99_drawdown(
-    T, S, time, dist, Q, streambed_conductance=None, x=None, y=None, **kwargs
+    T,
+    S,
+    time,
+    dist,
+    Q,
+    streambed_conductance=None,
+    x=None,
+    y=None,
+    integration="quad",
+    tol=1e-8,
+    **kwargs,
 ):
     """Function to calculate drawdown in an aquifer with a partially
         penetrating stream including streambed resistance (Hunt, 1999).
@@ -167,6 +199,16 @@ def hunt_99_drawdown(
         x locations at which to report calculated drawdown.
     y: float, optionally ndarray
         y locations at which to report calculated drawdown.
+    integration: string, optional
+        'quad' integrates the streambed term with one adaptive
+        scipy.integrate.quad call per time and location. 'vectorized'
+        integrates all locations at once for each time with
+        scipy.integrate.quad_vec, which is much faster for meshgrids.
+        Defaults to 'quad'.
+    tol: float, optional
+        relative tolerance of the 'vectorized' integration, measured
+        against the largest value of the integral over all locations.
+        Defaults to 1e-8.
     **kwargs:  included to all drawdown methods for extra values required
         in some calls
 
@@ -195,21 +237,46 @@ def hunt_99_drawdown(
     if isinstance(x, np.ndarray):
         spacescalar = False
 
+    if integration not in ("quad", "vectorized"):
+        raise PycapException(
+            "integration must be 'quad' or 'vectorized' in hunt_99_drawdown"
+        )
+    # compiled integrand if a compiled backend is active
+    ddwn2 = _backend_kernel("ddwn2_integrand", _ddwn2)
+
+    # integrate all x, y locations together for each time
+    if integration == "vectorized":
+        xa, ya = np.broadcast_arrays(
+            np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        )
+        drawdowns = np.zeros((len(time),) + xa.shape)
+        for i, tm in enumerate(time):
+            # special case for zero time
+            if tm != 0:
+                drawdowns[i] = (Q / (4.0 * np.pi * T)) * (
+                    _ddwn1(dist[0], xa, ya, T, streambed_conductance, tm, S)
+                    - _ddwn2_vec(
+                        dist[0], xa, ya, T, streambed_conductance, tm, S, tol
+                    )
+                )
+        if spacescalar and len(time) == 1:
+            return drawdowns[0]
+        return drawdowns
+
     # compute a single x, y point at a given time
     if len(time) == 1 and spacescalar:
         # handle zero time
         if time[0] == 0:
             return 0
         else:
-            warnings.filterwarnings(
-                "ignore", category=integrate.IntegrationWarning
-            )
-            [strmintegral, err] = integrate.quad(
-                _ddwn2,
-                0.0,
-                np.inf,
-                args=(dist[0], x, y, T, streambed_conductance, time[0], S),
-            )
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", integrate.IntegrationWarning)
+                [strmintegral, err] = integrate.quad(
+                    ddwn2,
+                    0.0,
+                    np.inf,
+                    args=(dist[0], x, y, T, streambed_conductance, time[0], S),
+                )
             return (Q / (4.0 * np.pi * T)) * (
                 _ddwn1(dist[0], x, y, T, streambed_conductance, time[0], S)
                 - strmintegral
@@ -221,15 +288,16 @@ def hunt_99_drawdown(
         for i, tm in enumerate(time):
             # special case for zero time
             if tm != 0:
-                warnings.filterwarnings(
-                    "ignore", category=integrate.IntegrationWarning
-                )
-                [strmintegral, err] = integrate.quad(
-                    _ddwn2,
-                    0.0,
-                    np.inf,
-                    args=(dist[0], x, y, T, streambed_conductance, tm, S),
-                )
+                with warnings.catch_warnings():
+                    warnings.simplefilter(
+                        "ignore", integrate.IntegrationWarning
+                    )
+                    [strmintegral, err] = integrate.quad(
+                        ddwn2,
+                        0.0,
+                        np.inf,
+                        args=(dist[0], x, y, T, streambed_conductance, tm, S),
+                    )
                 drawdowns[i] = (Q / (4.0 * np.pi * T)) * (
                     _ddwn1(dist[0], x, y, T, streambed_conductance, tm, S)
                     - strmintegral
@@ -249,23 +317,24 @@ def hunt_99_drawdown(
                     if time[time_idx] == 0:
                         drawdowns[time_idx, i, j] = 0
                     else:
-                        warnings.filterwarnings(
-                            "ignore", category=integrate.IntegrationWarning
-                        )
-                        [strmintegral, err] = integrate.quad(
-                            _ddwn2,
-                            0.0,
-                            np.inf,
-                            args=(
-                                dist[0],
-                                x[i, j],
-                                y[i, j],
-                                T,
-                                streambed_conductance,
-                                time[time_idx],
-                                S,
-                            ),
-                        )
+                        with warnings.catch_warnings():
+                            warnings.simplefilter(
+                                "ignore", integrate.IntegrationWarning
+                            )
+                            [strmintegral, err] = integrate.quad(
+                                ddwn2,
+                                0.0,
+                                np.inf,
+                                args=(
+                                    dist[0],
+                                    x[i, j],
+                                    y[i, j],
+                                    T,
+                                    streambed_conductance,
+                                    time[time_idx],
+                                    S,
+                                ),
+                            )
                         drawdowns[time_idx, i, j] = (Q / (4.0 * np.pi * T)) * (
                             _ddwn1(
                                 dist[0],
@@ -290,10 +359,7 @@ def _ddwn1(dist, x, y, T, streambed, time, S):
     # construct the well function argument
     # if (l-x) is zero, then function does not exist
     # trap for (l-x)==0 and set to small value
-    dist = dist - x
-    
-    if dist == 0.0:
-        dist = 0.001
+    dist = np.where(dist - x == 0.0, 0.001, dist - x)
 
     u1 = ((dist) ** 2 + y**2) / (4.0 * T * time / S)
 
@@ -316,6 +382,35 @@ def _ddwn2(theta, dist, x, y, T, streambed, time, S):
     return np.exp(-theta) * sps.exp1(u2)
 
 
+def _ddwn2_vec(dist, x, y, T, streambed, time, S, tol):
+    """Internal method to integrate _ddwn2 over theta for arrays of
+    x and y locations at once, using scipy.integrate.quad_vec
+
+    For small streambed conductance the integrand is concentrated near
+    theta=0, below the value of theta at which the streambed resistance
+    length equals the diffusion length, so the integral is split there.
+    """
+    if streambed == 0.0:
+        return np.zeros(np.shape(x))
+    theta_c = min(streambed * np.sqrt(4.0 * T * time / S) / (2.0 * T), 1.0)
+    strmintegral = np.zeros(np.shape(x))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", integrate.IntegrationWarning)
+        for lower, upper in ((0.0, theta_c), (theta_c, np.inf)):
+            part, err = integrate.quad_vec(
+                lambda theta: _ddwn2(
+                    theta, dist, x, y, T, streambed, time, S
+                ),
+                lower,
+                upper,
+                epsabs=0.0,
+                epsrel=tol,
+                norm="max",
+            )
+            strmintegral += part
+    return strmintegral
+
+
 def ward_lough_drawdown(
     T1,
     S1,
@@ -333,6 +428,8 @@ def ward_lough_drawdown(
     y=None,
     NSteh1=2,
     NSteh2=2,
+    laplace_method="stehfest",
+    laplace_accuracy=None,
     **kwargs,
 ):
     """Compute drawdown using Ward and Lough (2011) solution
@@ -393,10 +490,18 @@ def ward_lough_drawdown(
         (with origin being y=0 at pumping well location) [L]
     NSteh1: int
         Number of Stehfest series levels - algorithmic tuning parameter.
-        Defaults to 2.
+        Must be an even number. Defaults to 2.
     NStehl2: int
         Number of Stehfest series levels - algorithmic tuning parameter.
-        Defaults to 2.
+        Must be an even number. Defaults to 2.
+    laplace_method: str
+        Numerical Laplace inversion method, one of "stehfest",
+        "talbot" or "dehoog". Defaults to "stehfest".
+    laplace_accuracy: float
+        Target relative accuracy of the Laplace inversion, used to
+        choose the number of terms. If None, the Stehfest method uses
+        NSteh1 and NSteh2 and the other methods use their defaults.
+        Defaults to None.
     width: float
         stream width (b in paper) [L]
 
@@ -446,38 +551,23 @@ def ward_lough_drawdown(
     s1 = np.zeros_like(t)
     s2 = np.zeros_like(t)
 
-    # Inverse Fourier transform
-    for ii in range(len(t)):
-        # special case for zero time
-        if t[ii] == 0:
-            s1[ii] = 0
-            s2[ii] = 0
-        else:
-            try:
-                s1[ii] = _StehfestCoeff(1, NSteh1) * _if1(
-                    T1, S1, K, lambd, x, y, np.log(2) / t[ii]
-                )
-                for jj in range(2, NSteh1 + 1):
-                    s1[ii] += _StehfestCoeff(jj, NSteh1) * _if1(
-                        T1, S1, K, lambd, x, y, jj * np.log(2) / t[ii]
-                    )
-                s1[ii] *= np.log(2) / t[ii]
-            except OverflowError as e:
-                print(f"Overflow error in s1 calculation at index {ii}: {e}")
-                s1[ii] = np.nan  # Assign NaN if there's an overflow
-
-            try:
-                s2[ii] = _StehfestCoeff(1, NSteh2) * _if2(
-                    T1, S1, K, lambd, x, y, np.log(2) / t[ii]
-                )
-                for jj in range(2, NSteh2 + 1):
-                    s2[ii] += _StehfestCoeff(jj, NSteh2) * _if2(
-                        T1, S1, K, lambd, x, y, jj * np.log(2) / t[ii]
-                    )
-                s2[ii] *= np.log(2) / t[ii]
-            except OverflowError as e:
-                print(f"Overflow error in s2 calculation at index {ii}: {e}")
-                s2[ii] = np.nan  # Assign NaN if there's an overflow
+    # Inverse Fourier transform, evaluated for all times and
+    # Laplace parameters at once
+    tpos = t != 0  # special case for zero time
+    s1[tpos] = invert_laplace(
+        lambda p: _if1(T1, S1, K, lambd, x, y, p),
+        t[tpos],
+        laplace_method,
+        laplace_accuracy,
+        **_laplace_terms(laplace_method, laplace_accuracy, NSteh1),
+    )
+    s2[tpos] = invert_laplace(
+        lambda p: _if2(T1, S1, K, lambd, x, y, p),
+        t[tpos],
+        laplace_method,
+        laplace_accuracy,
+        **_laplace_terms(laplace_method, laplace_accuracy, NSteh2),
+    )
 
     return np.array(list(zip(s1 * Q / T2, s2 * Q / T2)))  # re-dimensionalize
 
@@ -494,53 +584,38 @@ def glover_depletion(T, S, time, dist, Q, **kwargs):
     a well near a river, Eos Transactions of the American Geophysical Union,
     v. 35, no. 3, pg. 468-470, https://doi.org/10.1029/TR035i003p00468.
 
+    All arguments may be arrays that broadcast together with NumPy rules.
+
     Parameters
     ----------
-    T: float
+    T: float, optionally np.array or list
         transmissivity [L**2/T]
-    S: float
+    S: float, optionally np.array or list
         storage [unitless]
     time: float, optionally np.array or list
         time at which to calculate results [T]
     dist: float, optionally np.array or list
         distance at which to calculate results in [ft]
-    Q: float
+    Q: float, optionally np.array or list
         pumping rate (+ is extraction) [L**3/T]
     **kwargs: included to all depletion methods for extra values required in some calls
 
     Returns
     -------
     drawdown: float
-        depletion values at at input parameter times/distances
+        depletion values at at input parameter times/distances,
+        float if all inputs are scalars, otherwise an array with
+        the broadcast shape of the inputs
 
 
     """
-    # turn lists into np.array so they get handled correctly
-    time = _make_arrays(time)
-    dist = _make_arrays(dist)
-    if len(dist) > 1 and len(time) > 1:
-        _time_dist_error("glover_depletion")
-
-    if len(time) == 1 and len(dist) == 1:
-        if time == 0:
-            return 0
-        else:
-            return Q * sps.erfc(dist[0] / np.sqrt(4 * (T / S) * time[0]))
-
-    elif len(time) == 1 and len(dist) > 1:
-        # handle zero time condition for list-like times
-        if time[0] == 0:
-            return np.zeros_like(dist)
-        else:
-            z = dist / np.sqrt(4 * (T / S) * time)
-            return Q * sps.erfc(z)
-    elif len(time) > 1 and len(dist) == 1:
-        # handle zero time condition for list-like times
-        z = np.zeros_like(time)
-        z[time != 0] = dist / np.sqrt(4 * (T / S) * time[time != 0])
-        depl = np.zeros_like(time)
-        depl[time != 0] = Q * sps.erfc(z[time != 0])
-        return depl
+    T_b, S_b, time_b, dist_b, Q_b = _broadcast_arrays(
+        "glover_depletion", T, S, time, dist, Q
+    )
+    # handle zero time condition
+    z = dist_b / np.sqrt(4 * (T_b / S_b) * time_b)
+    depl = np.where(time_b != 0, Q_b * sps.erfc(z), 0.0)
+    return _scalar_or_array(depl, T, S, time, dist, Q)
 
 
 def sdf(T, S, dist, **kwargs):
@@ -588,61 +663,49 @@ def walton_depletion(T, S, time, dist, Q, **kwargs):
     Note that unlike the other depletion functions, this Walton function
     is unit-specific, using feet and days as dimensions.
 
+    All arguments may be arrays that broadcast together with NumPy rules.
+
     Parameters
     ----------
-    T: float
+    T: float, optionally np.array or list
         transmissivity [gal per d per ft]
-    S: float
+    S: float, optionally np.array or list
         storage [unitless]
     time: float, optionally np.array or list
         time at which to calculate results [d]
     dist: float, optionally np.array or list
         distance at which to calculate results in [ft]
-    Q: float
+    Q: float, optionally np.array or list
         pumping rate (+ is extraction) [ft**3/d]
     **kwargs: included to all depletion methods for extra values required in some calls
 
     Returns
     -------
     drawdown: float
-        depletion values at at input parameter times/distances
+        depletion values at at input parameter times/distances,
+        float if all inputs are scalars, otherwise an array with
+        the broadcast shape of the inputs
 
     """
-    # turn lists into np.array so they get handled correctly
-    time = _make_arrays(time)
-    dist = _make_arrays(dist)
-    if len(dist) > 1 and len(time) > 1:
-        _time_dist_error("walton_depletion")
-
-    if len(time) == 1:
-        if time[0] == 0:
-            return 0
-        else:
-            # avoid divide by zero for time==0
-            # time = time.values
-            G = dist / np.sqrt((0.535 * time * T / S))
-    elif len(dist) == 1:
-        G = np.zeros_like(time).astype(float)
-        G[time != 0] = dist / np.sqrt((0.535 * time[time != 0] * T / S))
-        I = (
-            1
-            + 0.0705230784 * G
-            + 0.0422820123 * (G**2)
-            + 9.2705272e-03 * (G**3)
-        )
-        J = (
-            I
-            + 1.52014e-04 * (G**4)
-            + 2.76567e-04 * (G**5)
-            + 4.30638e-05 * (G**6)
-        ) ** 16
-        depl = Q * (1 / J)
-        # handle zero time condition
-        depl[time == 0] = 0.0
-        if len(depl) == 1:
-            return depl[0]
-        else:
-            return depl
+    T_b, S_b, time_b, dist_b, Q_b = _broadcast_arrays(
+        "walton_depletion", T, S, time, dist, Q
+    )
+    G = dist_b / np.sqrt((0.535 * time_b * T_b / S_b))
+    I = (
+        1
+        + 0.0705230784 * G
+        + 0.0422820123 * (G**2)
+        + 9.2705272e-03 * (G**3)
+    )
+    J = (
+        I
+        + 1.52014e-04 * (G**4)
+        + 2.76567e-04 * (G**5)
+        + 4.30638e-05 * (G**6)
+    ) ** 16
+    # handle zero time condition
+    depl = np.where(time_b != 0, Q_b * (1 / J), 0.0)
+    return _scalar_or_array(depl, T, S, time, dist, Q)
 
 
 def hunt_99_depletion(
@@ -657,67 +720,301 @@ def hunt_99_depletion(
         water pumping: Groundwater, v. 37, no. 1, pgs. 98-102,
         https://doi.org/10.1111/j.1745-6584.1999.tb00962.x
 
+        All arguments, including streambed_conductance, may be arrays
+        that broadcast together with NumPy rules.
+
     Parameters
     ----------
-    T: float
+    T: float, optionally np.array or list
         transmissivity [L**2/T]
-    S: float
+    S: float, optionally np.array or list
         storage [unitless]
     time: float, optionally np.array or list
         time at which to calculate results [T]
     dist: float, optionally np.array or list
         distance at which to calculate results in [L]
-    Q: float
+    Q: float, optionally np.array or list
         pumping rate (+ is extraction) [L**3/T]
     **kwargs: included to all depletion methods for extra values required in some calls
 
     Returns
     -------
     Qs: float
-        streamflow depletion rate, optionally np.array or list
-        depending on input of time and dist [L**3/T]
+        streamflow depletion rate, float if all inputs are scalars,
+        otherwise an array with the broadcast shape of the inputs [L**3/T]
 
     Other Parameters
     ----------------
-    streambed_conductance: float
+    streambed_conductance: float, optionally np.array or list
         streambed_conductance conductance [L/T] (lambda in the paper)
     """
     _check_nones(locals(), {"hunt_99_depletion": ["streambed_conductance"]})
-    # turn lists into np.array so they get handled correctly
-    time = _make_arrays(time)
-    dist = _make_arrays(dist)
-    if len(dist) > 1 and len(time) > 1:
-        _time_dist_error("hunt_99_depletion")
+    T_b, S_b, time_b, dist_b, Q_b, lam_b = _broadcast_arrays(
+        "hunt_99_depletion", T, S, time, dist, Q, streambed_conductance
+    )
+    a = np.sqrt(S_b * dist_b**2 / (4.0 * T_b * time_b))
+    b = (lam_b**2 * time_b) / (4 * S_b * T_b)
+    c = (lam_b * dist_b) / (2.0 * T_b)
+    y = np.sqrt(b) + a
+    t1 = sps.erfcx(y)
+    t2 = np.exp(b + c - y**2)
+    # handle zero time condition
+    depl = np.where(time_b != 0, sps.erfc(a) - (t1 * t2), 0.0)
+    return _scalar_or_array(
+        depl * Q_b, T, S, time, dist, Q, streambed_conductance
+    )
 
-    elif len(time) == 1:
-        if time[0] == 0:
-            return 0
-        else:
-            a = np.sqrt(S * dist**2 / (4.0 * T * time))
-            b = (streambed_conductance**2 * time) / (4 * S * T)
-            c = (streambed_conductance * dist) / (2.0 * T)
-            y = np.sqrt(b) + a
-            t1 = sps.erfcx(y)
-            t2 = np.exp(b + c - y**2)
-            depl = sps.erfc(a) - (t1 * t2)
-            if len(dist) > 1:
-                return depl * Q
-            else:
-                return depl[0] * Q
-
-    elif len(dist) == 1:
-        a = np.zeros_like(time)
-        a[time != 0] = np.sqrt(S * dist**2 / (4.0 * T * time[time != 0]))
-        b = (streambed_conductance**2 * time) / (4 * S * T)
-        c = (streambed_conductance * dist) / (2.0 * T)
-        y = np.sqrt(b) + a
-        t1 = sps.erfcx(y)
-        t2 = np.exp(b + c - y**2)
-        depl = np.zeros_like(a)
-        depl[time != 0] = sps.erfc(a[time != 0]) - (
-            t1[time != 0] * t2[time != 0]
+
+# analytic gradients of the closed-form solutions, which return the
+# solution and its partial derivatives from one evaluation
+Gradient = namedtuple("Gradient", ["value", "jacobian"])
+
+
+def _gradient_result(value, jacobian, *args, scalar=True):
+    """private function to package a solution and its partial
+    derivatives, with the return type of the solution"""
+    return Gradient(
+        _scalar_or_array(value, *args, scalar=scalar),
+        {
+            k: _scalar_or_array(v, *args, scalar=scalar)
+            for k, v in jacobian.items()
+        },
+    )
+
+
+def theis_drawdown_gradient(T, S, time, dist, Q, **kwargs):
+    """Theis drawdown and its partial derivatives with respect to
+    T, S and dist, from one evaluation of the well function
+
+    With u = dist**2 * S / (4 * T * time), the derivative of the well
+    function E1(u) is -exp(-u) / u, so all of the partial derivatives
+    share exp(-u).
+
+    Parameters
+    ----------
+    T: float, optionally np.array or list
+        transmissivity [L**2/T]
+    S: float, optionally np.array or list
+        storage [dimensionless]
+    time: float, optionally np.array or list
+        time at which to calculate results [T]
+    dist: float, optionally np.array or list
+        distance at which to calculate results in [L]
+    Q: float, optionally np.array or list
+        pumping rate (+ is extraction) [L**3/T]
+    **kwargs: included to all drawdown methods for extra values required
+        in some calls
+
+    Returns
+    -------
+    gradient: Gradient
+        named tuple of the drawdown (value) as from theis_drawdown and a
+        dictionary (jacobian) of its partial derivatives with respect to
+        'T', 'S' and 'dist', each with the shape of the drawdown
+    """
+    T_b, S_b, time_b, dist_b, Q_b = _broadcast_arrays(
+        "theis_drawdown", T, S, time, dist, Q
+    )
+    valid = (time_b != 0) & (dist_b != 0)
+    u = dist_b**2.0 * S_b / (4.0 * T_b * time_b)
+    scale = Q_b / (4.0 * np.pi * T_b)
+    well_function = sps.exp1(u)
+    expu = np.exp(-u)
+    ddn = np.where(valid, scale * well_function, 0.0)
+    jacobian = {
+        "T": np.where(valid, scale * (expu - well_function) / T_b, 0.0),
+        "S": np.where(valid, -scale * expu / S_b, 0.0),
+        "dist": np.where(valid, -2.0 * scale * expu / dist_b, 0.0),
+    }
+    return _gradient_result(ddn, jacobian, T, S, time, dist, Q, scalar=False)
+
+
+def glover_depletion_gradient(T, S, time, dist, Q, **kwargs):
+    """Glover and Balmer (1954) depletion and its partial derivatives
+    with respect to T, S and dist, from one evaluation
+
+    With z = dist * sqrt(S / (4 * T * time)), depletion is Q * erfc(z)
+    and the derivative of erfc(z) is -2 / sqrt(pi) * exp(-z**2).
+
+    Parameters
+    ----------
+    T: float, optionally np.array or list
+        transmissivity [L**2/T]
+    S: float, optionally np.array or list
+        storage [unitless]
+    time: float, optionally np.array or list
+        time at which to calculate results [T]
+    dist: float, optionally np.array or list
+        distance at which to calculate results in [ft]
+    Q: float, optionally np.array or list
+        pumping rate (+ is extraction) [L**3/T]
+    **kwargs: included to all depletion methods for extra values required in some calls
+
+    Returns
+    -------
+    gradient: Gradient
+        named tuple of the depletion (value) as from glover_depletion and
+        a dictionary (jacobian) of its partial derivatives with respect
+        to 'T', 'S' and 'dist', each with the shape of the depletion
+    """
+    T_b, S_b, time_b, dist_b, Q_b = _broadcast_arrays(
+        "glover_depletion", T, S, time, dist, Q
+    )
+    valid = time_b != 0
+    z = dist_b / np.sqrt(4 * (T_b / S_b) * time_b)
+    depl = np.where(valid, Q_b * sps.erfc(z), 0.0)
+    # derivative of Q * erfc(z) with respect to z
+    dz = -2.0 / np.sqrt(np.pi) * Q_b * np.exp(-(z**2))
+    jacobian = {
+        "T": np.where(valid, -dz * z / (2.0 * T_b), 0.0),
+        "S": np.where(valid, dz * z / (2.0 * S_b), 0.0),
+        "dist": np.where(
+            valid, dz * np.sqrt(S_b / (4.0 * T_b * time_b)), 0.0
+        ),
+    }
+    return _gradient_result(depl, jacobian, T, S, time, dist, Q)
+
+
+def walton_depletion_gradient(T, S, time, dist, Q, **kwargs):
+    """Walton (1987) depletion and its partial derivatives with respect
+    to T, S and dist, from one evaluation of the polynomial
+
+    Like walton_depletion, T is in gallons per day per foot.
+
+    Parameters
+    ----------
+    T: float, optionally np.array or list
+        transmissivity [gal per d per ft]
+    S: float, optionally np.array or list
+        storage [unitless]
+    time: float, optionally np.array or list
+        time at which to calculate results [d]
+    dist: float, optionally np.array or list
+        distance at which to calculate results in [ft]
+    Q: float, optionally np.array or list
+        pumping rate (+ is extraction) [ft**3/d]
+    **kwargs: included to all depletion methods for extra values required in some calls
+
+    Returns
+    -------
+    gradient: Gradient
+        named tuple of the depletion (value) as from walton_depletion and
+        a dictionary (jacobian) of its partial derivatives with respect
+        to 'T', 'S' and 'dist', each with the shape of the depletion
+    """
+    T_b, S_b, time_b, dist_b, Q_b = _broadcast_arrays(
+        "walton_depletion", T, S, time, dist, Q
+    )
+    valid = time_b != 0
+    G = dist_b / np.sqrt((0.535 * time_b * T_b / S_b))
+    I = (
+        1
+        + 0.0705230784 * G
+        + 0.0422820123 * (G**2)
+        + 9.2705272e-03 * (G**3)
+    )
+    P = I + 1.52014e-04 * (G**4) + 2.76567e-04 * (G**5) + 4.30638e-05 * (G**6)
+    J = P**16
+    depl = np.where(valid, Q_b * (1 / J), 0.0)
+    # derivative of Q / P(G)**16 with respect to G
+    dP = (
+        0.0705230784
+        + 2 * 0.0422820123 * G
+        + 3 * 9.2705272e-03 * (G**2)
+        + 4 * 1.52014e-04 * (G**3)
+        + 5 * 2.76567e-04 * (G**4)
+        + 6 * 4.30638e-05 * (G**5)
+    )
+    dG = -16.0 * Q_b * dP / (P * J)
+    jacobian = {
+        "T": np.where(valid, -dG * G / (2.0 * T_b), 0.0),
+        "S": np.where(valid, dG * G / (2.0 * S_b), 0.0),
+        "dist": np.where(
+            valid, dG / np.sqrt(0.535 * time_b * T_b / S_b), 0.0
+        ),
+    }
+    return _gradient_result(depl, jacobian, T, S, time, dist, Q)
+
+
+def hunt_99_depletion_gradient(
+    T, S, time, dist, Q, streambed_conductance=None, **kwargs
+):
+    """Hunt (1999) depletion and its partial derivatives with respect to
+    T, S, dist and streambed_conductance, from one evaluation
+
+    Depletion is Q * (erfc(a) - erfcx(y) * exp(b + c - y**2)) with the
+    terms a, b, c and y = sqrt(b) + a of hunt_99_depletion, and the
+    partial derivatives reuse erfcx(y), exp(b + c - y**2) and exp(-a**2).
+
+    Parameters
+    ----------
+    T: float, optionally np.array or list
+        transmissivity [L**2/T]
+    S: float, optionally np.array or list
+        storage [unitless]
+    time: float, optionally np.array or list
+        time at which to calculate results [T]
+    dist: float, optionally np.array or list
+        distance at which to calculate results in [L]
+    Q: float, optionally np.array or list
+        pumping rate (+ is extraction) [L**3/T]
+    **kwargs: included to all depletion methods for extra values required in some calls
+
+    Returns
+    -------
+    gradient: Gradient
+        named tuple of the depletion (value) as from hunt_99_depletion
+        and a dictionary (jacobian) of its partial derivatives with
+        respect to 'T', 'S', 'dist' and 'streambed_conductance', each
+        with the shape of the depletion
+
+    Other Parameters
+    ----------------
+    streambed_conductance: float, optionally np.array or list
+        streambed_conductance conductance [L/T] (lambda in the paper)
+    """
+    _check_nones(locals(), {"hunt_99_depletion": ["streambed_conductance"]})
+    T_b, S_b, time_b, dist_b, Q_b, lam_b = _broadcast_arrays(
+        "hunt_99_depletion", T, S, time, dist, Q, streambed_conductance
+    )
+    valid = time_b != 0
+    a = np.sqrt(S_b * dist_b**2 / (4.0 * T_b * time_b))
+    b = (lam_b**2 * time_b) / (4 * S_b * T_b)
+    c = (lam_b * dist_b) / (2.0 * T_b)
+    sqrt_b = np.sqrt(b)
+    y = sqrt_b + a
+    t1 = sps.erfcx(y)
+    t2 = np.exp(b + c - y**2)
+    depl = np.where(valid, sps.erfc(a) - (t1 * t2), 0.0)
+    # the depletion is erfc(a) - H with H = erfc(y) * exp(b + c), so
+    # dH = H * (db + dc) - 2 / sqrt(pi) * exp(b + c - y**2) * dy
+    H = t1 * t2
+    da_coef = -2.0 / np.sqrt(np.pi) * np.exp(-(a**2))
+    dy_coef = 2.0 / np.sqrt(np.pi) * t2
+
+    def _partial(da, db, dc, dy):
+        return np.where(
+            valid, Q_b * (da_coef * da - H * (db + dc) + dy_coef * dy), 0.0
         )
-        return depl * Q
+
+    # derivatives of a, b, c and y with respect to each parameter
+    k = np.sqrt(S_b / (4.0 * T_b * time_b))
+    g = np.sqrt(time_b / (4.0 * S_b * T_b))
+    jacobian = {
+        "T": _partial(
+            -a / (2.0 * T_b), -b / T_b, -c / T_b, -y / (2.0 * T_b)
+        ),
+        "S": _partial(
+            a / (2.0 * S_b), -b / S_b, 0.0, (a - sqrt_b) / (2.0 * S_b)
+        ),
+        "dist": _partial(k, 0.0, lam_b / (2.0 * T_b), k),
+        "streambed_conductance": _partial(
+            0.0, 2.0 * lam_b * g**2, dist_b / (2.0 * T_b), g
+        ),
+    }
+    return _gradient_result(
+        depl * Q_b, jacobian, T, S, time, dist, Q, streambed_conductance
+    )
 
 
 def hunt_03_depletion(
@@ -827,21 +1124,19 @@ def hunt_03_depletion(
 
     # numerical integration of F() and G() functions to
     # get correction to Hunt(1999) estimate of streamflow depletion
-    # because of storage in the semiconfining aquifer
-    correction = []
-    for dt in dtime:
-        # correcting for zero time
-        if dt == 0:
-            correction.append(0)
-        else:
-            warnings.filterwarnings(
-                "ignore", category=integrate.IntegrationWarning
-            )
-            # note that err from fixed_quad gets returned as None
-            y, err = integrate.fixed_quad(
-                _integrand, 0.0, 1.0, args=(dlam, dt, epsilon, dK), n=100
-            )
-            correction.append(dlam * y)
+    # because of storage in the semiconfining aquifer.
+    # All times are integrated at once with the 100-point
+    # Gauss-Legendre rule on a (ntimes x nodes) grid
+    # note correcting for zero time
+    nodes, weights = sps.roots_legendre(100)
+    alpha = (nodes + 1.0) / 2.0
+    correction = np.zeros_like(dtime)
+    correction[dtime != 0] = dlam * (
+        _integrand(
+            alpha[None, :], dlam, dtime[dtime != 0][:, None], epsilon, dK
+        )
+        @ (weights / 2.0)
+    )
 
     # terms for depletion, similar to Hunt (1999) but repeated
     # here so it matches the 2003 paper.
@@ -918,22 +1213,68 @@ def _f2(z, dlam, dtime, alpha):
     F = t1 * (1.0 + t2 * sumterm)  # equation 53 in paper
     return F
 
-def _fgt(n, ab, abterm):
-    """function for splitting up _G below"""
-    n2 = n*2
-    return np.exp(
-        np.log(sps.binom(n2, n))
-        + np.log(sps.gammainc(n2 + 1, ab))
-        + (n2) * np.log(abterm)
-    )
+# absolute tolerance on the remaining terms and maximum number
+# of terms of the series in the Hunt (2003) G function
+_G_TOL = 1e-14
+_G_NTERMS = 60
 
 
-def _flt(n, ab, abterm):
-    """function for splitting up _G below"""
-    n2 = n*2
-    return (
-        sps.binom(n2, n) * sps.gammainc(n2 + 1, ab) * abterm ** (n2)
+def _G_series(x, r2, tol=_G_TOL, nterms=_G_NTERMS):
+    """Internal function to sum the series in equation (53) of Hunt (2003)
+
+    Sums C(2n, n) * r2**n * P(2n + 1, x) for n = 0 to nterms - 1, where
+    P is the regularized lower incomplete gamma function, using upward
+    recurrences for both factors.  For integer order, P(2n + 1, x) is
+    the probability that a Poisson variable with mean x exceeds 2n, so
+    P(2n + 3, x) = P(2n + 1, x) - d(2n + 1) - d(2n + 2), where
+    d(k) = x**k * exp(-x) / k!.  The terms decrease by at least a factor
+    of 4 * r2 (r2 <= 1/4), so the sum stops for each element once the
+    remaining terms are bounded by tol.
+
+    Parameters
+    ----------
+    x: float or np.array
+        argument of the incomplete gamma function (a + b in the paper)
+    r2: float or np.array
+        a * b / (a + b)**2 in the paper
+    tol: float, optional
+        absolute tolerance on the sum of the remaining terms
+    nterms: int, optional
+        maximum number of terms
+
+    Returns
+    -------
+    sum1: np.array
+        value of the series with the broadcast shape of x and r2
+    """
+    x, r2 = np.broadcast_arrays(
+        np.asarray(x, dtype=float), np.asarray(r2, dtype=float)
     )
+    shape = x.shape
+    x = x.ravel()
+    r2 = r2.ravel()
+    sum1 = np.zeros(x.size)
+    active = np.arange(x.size)
+    coef = np.ones(x.size)  # C(2n, n) * r2**n
+    P = -np.expm1(-x)  # P(1, x)
+    d = x * np.exp(-x)  # d(1)
+    # bound on the sum of the remaining terms relative to the current term
+    tail = np.where(4.0 * r2 < 1.0, 1.0 / (1.0 - 4.0 * r2), np.inf)
+    for n in range(nterms):
+        term = coef * P
+        sum1[active] += term
+        # keep going only where remaining terms may exceed the tolerance
+        keep = term * tail > tol
+        if n == nterms - 1 or not np.any(keep):
+            break
+        active, coef, P, d, x, r2, tail = (
+            v[keep] for v in (active, coef, P, d, x, r2, tail)
+        )
+        coef = coef * 2.0 * (2 * n + 1) / (n + 1) * r2
+        d_even = d * x / (2 * n + 2)
+        P = np.maximum(P - d - d_even, 0.0)
+        d = d_even * x / (2 * n + 3)
+    return sum1.reshape(shape)
 
 
 def _G(alpha, epsilon, dK, dtime):
@@ -941,8 +1282,10 @@ def _G(alpha, epsilon, dK, dtime):
 
     This function is in equation (46) and expanded in
     equation (53). Function uses scipy special for
-    incomplete Gamma Function (P(a,b)), binomial coefficient,
-    and modified Bessel function of zero order (I0).
+    modified Bessel function of zero order (I0), and the
+    series for the incomplete Gamma Function (P(a,b)) and
+    binomial coefficient terms is summed by recurrence
+    in _G_series.
 
     Parameters
     ----------
@@ -969,10 +1312,9 @@ def _G(alpha, epsilon, dK, dtime):
     term1 = np.where(ab<80, np.exp(-ab) * sps.i0(2.0 * sqrt_atb), 0.0)
     abterm = sqrt_atb / ab
 
-    n = np.arange(60, dtype=np.float64)
-    sum1 = 0.
-    for n in np.arange(60, dtype=np.float64):
-        sum1 = sum1 + np.where(n <= 8, _flt(n, ab, abterm), _fgt(n, ab, abterm))
+    sum1 = _backend_kernel("G_series", _G_series)(
+        ab, abterm**2, _G_TOL, _G_NTERMS
+    )
 
     eqn52 = 0.5 * (1.0 - term1 + ((b - a) / ab) * sum1)
     
@@ -1012,6 +1354,166 @@ def _calc_deltaQ(Q):
     return deltaQ
 
 
+# maximum number of pumping changes for which the increments are
+# superposed directly rather than by FFT convolution
+_DIRECT_CONV_MAX = 32
+
+
+def _convolve_increments(increments, unit_response):
+    """internal function to convolve pumping increments with a
+    unit-rate step response along the time axis
+
+    Parameters
+    ----------
+    increments: np.array
+        change in pumping rate starting at each time step
+    unit_response: np.array
+        response to a unit pumping rate starting at time zero,
+        either 1D or 2D with time along the first axis
+
+    Returns
+    -------
+    response: np.array
+        superposed response with the same shape as unit_response
+    """
+    if unit_response.ndim > 1:
+        return np.column_stack(
+            [
+                _convolve_increments(increments, unit_response[:, i])
+                for i in range(unit_response.shape[1])
+            ]
+        )
+    nt = len(unit_response)
+    shifts = np.flatnonzero(increments)
+    # FFT spreads any nan over the whole record, so only use it
+    # when the unit response is finite and there are many changes
+    if len(shifts) <= _DIRECT_CONV_MAX or not np.all(
+        np.isfinite(unit_response)
+    ):
+        response = np.zeros(nt)
+        for shift in shifts:
+            response[shift:] += increments[shift] * unit_response[: nt - shift]
+        return response
+    return signal.fftconvolve(increments, unit_response)[:nt]
+
+
+def _superpose_schedules(Q, unit_response):
+    """internal function to superpose unit-rate step responses for
+    many pumping schedules at once by convolution along the time axis
+
+    Follows the same convention as superposition in WellResponse, with
+    each schedule indexed by sequential day starting at 1.
+
+    Parameters
+    ----------
+    Q: np.array
+        pumping schedules with shape (nwells, ntimes) [L**3/T]
+    unit_response: np.array
+        response to a unit pumping rate starting at time zero, with
+        shape (nwells, nresponses, ntimes)
+
+    Returns
+    -------
+    response: np.array
+        drawdown or depletion with shape (nwells, nresponses, ntimes)
+    """
+    nt = Q.shape[-1]
+    # the first pumping rate and the change at the second time both
+    # start from time zero, and later changes start one step earlier
+    increments = np.zeros(Q.shape)
+    increments[:, 0] = Q[:, 0]
+    increments[:, :-1] += np.diff(Q, axis=1)
+    increments = increments[:, None, :]
+    shifts = np.flatnonzero(np.any(increments != 0, axis=(0, 1)))
+    if len(shifts) <= _DIRECT_CONV_MAX or not np.all(
+        np.isfinite(unit_response)
+    ):
+        response = np.zeros(unit_response.shape)
+        for shift in shifts:
+            inc = increments[..., shift : shift + 1]
+            response[..., shift:] += np.where(
+                inc != 0, inc * unit_response[..., : nt - shift], 0.0
+            )
+        return response
+    return signal.fftconvolve(increments, unit_response, axes=-1)[..., :nt]
+
+
+def _superpose_convolution(func, T, S, dist, Q, Qfactor=1.0, **kwargs):
+    """internal function to superpose the response to a pumping time series
+    by convolution with a unit-rate step response
+
+    Gives the same result as calling the solution once for every change in
+    pumping (image wells in time) but the solution is evaluated only once
+    on the full time axis.  All solutions are linear in Q, so the response
+    to the pumping changes is the convolution of the unit-rate response
+    with the pumping increments, which is done by FFT for long records.
+
+    Parameters
+    ----------
+    func: function
+        drawdown or depletion function from ALL_DD_METHODS or ALL_DEPL_METHODS
+    T: float
+        transmissivity [L**2/T]
+    S: float
+        storage [unitless]
+    dist: float
+        distance between well and response [L]
+    Q: pandas Series
+        time series of pumping, indexed by sequential day [L**3/T]
+    Qfactor: float, optional
+        factor applied to all pumping rates (e.g. stream apportionment).
+        Defaults to 1.0
+    **kwargs: extra values required by func
+
+    Returns
+    -------
+    response: np.array
+        drawdown or depletion for each time in Q
+    """
+    unit_response = np.atleast_1d(
+        np.asarray(
+            func(T, S, list(range(len(Q))), dist, 1.0, **kwargs), dtype=float
+        )
+    )
+    return _superpose_unit_response(unit_response, Q) * Qfactor
+
+
+def _superpose_unit_response(unit_response, Q):
+    """internal function to superpose a unit-rate step response for
+    all of the changes in a pumping time series by convolution
+
+    Parameters
+    ----------
+    unit_response: np.array
+        response to a unit pumping rate starting at time zero, for
+        each time 0 to len(Q) - 1, optionally with more than one column
+    Q: pandas Series
+        time series of pumping, indexed by sequential day [L**3/T]
+
+    Returns
+    -------
+    response: np.array
+        drawdown or depletion for each time in Q
+    """
+    nt = len(Q)
+    deltaQ = _calc_deltaQ(Q.copy())
+    response = np.zeros_like(unit_response)
+    # the first pumping rate is evaluated at absolute time
+    idx = deltaQ.index[0] - 1
+    response[idx:] = deltaQ.iloc[0] * unit_response[idx:]
+    if len(deltaQ) > 1:
+        # later changes start from time zero two steps before their index,
+        # matching the image-well loop in WellResponse
+        increments = np.zeros(nt)
+        np.add.at(
+            increments,
+            np.asarray(deltaQ.index[1:]) - 2,
+            deltaQ.values[1:],
+        )
+        response += _convolve_increments(increments, unit_response)
+    return response
+
+
 def _WardLoughNonDimensionalize(
     T1,
     T2,
@@ -1056,6 +1558,8 @@ def ward_lough_depletion(
     aquitard_thick=None,
     aquitard_K=None,
     NSteh1=2,
+    laplace_method="stehfest",
+    laplace_accuracy=None,
     **kwargs,
 ):
     """
@@ -1109,7 +1613,15 @@ def ward_lough_depletion(
         hydraulic conductivity of intervening leaky aquifer, [L/T]
     NSteh1: int
         Number of Stehfest series levels - algorithmic tuning parameter.
-        Defaults to 2.
+        Must be an even number. Defaults to 2.
+    laplace_method: str
+        Numerical Laplace inversion method, one of "stehfest",
+        "talbot" or "dehoog". Defaults to "stehfest".
+    laplace_accuracy: float
+        Target relative accuracy of the Laplace inversion, used to
+        choose the number of terms. If None, the Stehfest method uses
+        NSteh1 and the other methods use their defaults.
+        Defaults to None.
     width: float
         stream width (b in paper) [L]
 
@@ -1154,193 +1666,288 @@ def ward_lough_depletion(
         if isinstance(t, list):
             t = np.array(t)
         DeltaQ = np.zeros_like(t)
-        DeltaQ[t != 0] = _StehfestCoeff(1, NSteh1) * _if1_dQ(
-            T1, S1, K, lambd, np.log(2) / t[t != 0]
-        )
-        for jj in range(2, NSteh1 + 1):
-            DeltaQ[t != 0] += _StehfestCoeff(jj, NSteh1) * _if1_dQ(
-                T1, S1, K, lambd, jj * np.log(2) / t[t != 0]
-            )
-        DeltaQ[t != 0] = (
-            2 * np.pi * lambd * DeltaQ[t != 0] * np.log(2) / t[t != 0]
+        # evaluate all times and Laplace parameters at once
+        DeltaQ[t != 0] = invert_laplace(
+            lambda p: _if1_dQ(T1, S1, K, lambd, p),
+            t[t != 0],
+            laplace_method,
+            laplace_accuracy,
+            **_laplace_terms(laplace_method, laplace_accuracy, NSteh1),
         )
+        DeltaQ[t != 0] = 2 * np.pi * lambd * DeltaQ[t != 0]
 
         return DeltaQ * Q  # redimentionalize
 
 
+def _laplace_terms(laplace_method, laplace_accuracy, NSteh):
+    """Internal function for Ward and Lough (2011) solution
+
+    Keeps the number of Stehfest levels given by NSteh unless
+    a target accuracy is requested for the Laplace inversion.
+    """
+    if laplace_method == "stehfest" and laplace_accuracy is None:
+        return {"N": NSteh}
+    return {}
+
+
 def _if1_dQ(T1, S1, K, lambda_, p):
     """Internal function for Ward and Lough (2011) solution"""
-    return _kernel1(T1, S1, K, lambda_, 0, 0, p) + _kernel2(
-        T1, S1, K, lambda_, 0, 0, p
+    coeffs = _coeffs(T1, S1, K, lambda_, 0, p)
+    return _kernel1(T1, S1, K, lambda_, 0, 0, p, coeffs) + _kernel2(
+        T1, S1, K, lambda_, 0, 0, p, coeffs
     )
 
 
+# relative tolerance and node limits for the shared Gauss-Legendre
+# grid used to invert the Fourier transform in the Ward and Lough solution
+_FOURIER_TOL = 1e-6
+_FOURIER_NODES = 64
+_FOURIER_MAX_NODES = 4096
+# maximum number of (node, p) integrand values evaluated at once
+_FOURIER_CHUNK = 2**20
+
+
+def _fourier_inverse(integrand, y, p):
+    """Internal function for Ward and Lough (2011) solution
+
+    Inverts the Fourier transform in y for an array of Laplace
+    parameters p at once.  The integral over theta = tan(phi) is
+    evaluated on a Gauss-Legendre grid in phi shared by all p,
+    doubling the number of nodes until successive estimates agree
+    to _FOURIER_TOL relative to the integral of the absolute value.
+
+    Parameters
+    ----------
+    integrand: function
+        function of (theta, p) returning the Fourier-domain solution,
+        broadcasting over theta and p
+    y: float
+        dimensionless y-coordinate
+    p: np.array
+        Laplace parameters, any shape, real or complex
+
+    Returns
+    -------
+    inverse: np.array
+        inverse Fourier transform with the same shape as p
+    """
+    p = np.asarray(p)
+    p = p.astype(np.result_type(p, float))
+    pflat = p.ravel()
+    inverse = np.zeros_like(pflat)
+
+    def _gauss_legendre(n, pchunk):
+        z, w = sps.roots_legendre(n)
+        phi = (z + 1.0) * np.pi / 4.0
+        w = w * np.pi / 4.0
+        theta = np.tan(phi)[:, None]
+        G = (
+            2
+            * integrand(theta, pchunk[None, :])
+            * np.cos(theta * y)
+            / np.cos(phi[:, None]) ** 2
+        )
+        return w @ G, w @ np.abs(G)
+
+    nchunk = max(1, _FOURIER_CHUNK // (2 * _FOURIER_NODES))
+    # number and worst relative error of the entries that did not
+    # converge within _FOURIER_MAX_NODES
+    nfailed = 0
+    worst = 0.0
+    for start in range(0, len(pflat), nchunk):
+        pchunk = pflat[start : start + nchunk]
+        n = _FOURIER_NODES
+        previous, _ = _gauss_legendre(n, pchunk)
+        while True:
+            n *= 2
+            current, scale = _gauss_legendre(n, pchunk)
+            error = np.abs(current - previous)
+            converged = (error <= _FOURIER_TOL * scale) | ~np.isfinite(
+                current
+            )
+            if np.all(converged) or n >= _FOURIER_MAX_NODES:
+                break
+            previous = current
+        if not np.all(converged):
+            nfailed += np.count_nonzero(~converged)
+            worst = max(worst, np.max(error[~converged] / scale[~converged]))
+        inverse[start : start + nchunk] = current
+    if nfailed > 0:
+        warnings.warn(
+            f"the Fourier inversion of {nfailed} of {len(pflat)} Laplace "
+            + f"parameters did not converge with {_FOURIER_MAX_NODES} "
+            + f"nodes, with relative errors up to {worst:.3g}",
+            integrate.IntegrationWarning,
+        )
+    return inverse.reshape(p.shape)
+
+
 def _if1(T1, S1, K, lambd, x, y, p):
     """Internal function for Ward and Lough (2011) solution"""
-    G = (
-        lambda phi: 2
-        * (
-            _kernel1(T1, S1, K, lambd, x, np.tan(phi), p)
-            + _kernel2(T1, S1, K, lambd, x, np.tan(phi), p)
+
+    def integrand(theta, p):
+        coeffs = _coeffs(T1, S1, K, lambd, theta, p)
+        return _kernel1(T1, S1, K, lambd, x, theta, p, coeffs) + _kernel2(
+            T1, S1, K, lambd, x, theta, p, coeffs
         )
-        * np.cos(np.tan(phi) * y)
-        / np.cos(phi) ** 2
-    )
-    warnings.filterwarnings("ignore", category=integrate.IntegrationWarning)
-    s1InvFour, _ = integrate.quad(
-        G, 0, np.pi / 2, epsrel=1e-1, epsabs=1e-1, limit=10000
-    )
-    return s1InvFour
+
+    return _fourier_inverse(integrand, y, p)
 
 
 def _if2(T1, S1, K, lambd, x, y, p):
     """Internal function for Ward and Lough (2011) solution"""
-    H = (
-        lambda phi: 2
-        * (
-            _coeff_s1_1(T1, S1, K, lambd, np.tan(phi), p)
-            * _kernel1(T1, S1, K, lambd, x, np.tan(phi), p)
-            + _coeff_s1_2(T1, S1, K, lambd, np.tan(phi), p)
-            * _kernel2(T1, S1, K, lambd, x, np.tan(phi), p)
-        )
-        * np.cos(np.tan(phi) * y)
-        / np.cos(phi) ** 2
-    )
-    warnings.filterwarnings("ignore", category=integrate.IntegrationWarning)
-    s2InvFour, errbnd = integrate.quad(
-        H, 0, np.pi / 2, epsrel=1e-1, epsabs=1e-1, limit=10000
-    )
-    return s2InvFour
 
+    def integrand(theta, p):
+        coeffs = _coeffs(T1, S1, K, lambd, theta, p)
+        return coeffs.B1 * _kernel1(
+            T1, S1, K, lambd, x, theta, p, coeffs
+        ) + coeffs.B2 * _kernel2(T1, S1, K, lambd, x, theta, p, coeffs)
+
+    return _fourier_inverse(integrand, y, p)
 
-def _coeff_s1_1(T1, S1, K, lambd, theta, p):
+
+def _coeff_s1_1(T1, S1, K, lambd, theta, p, coeffs=None):
     """Internal function for Ward and Lough (2011) solution"""
-    b11, b12, b22, mu1, mu2, l1, l2, beta1, beta2, A1, A2 = _coeffs(
-        T1, S1, K, lambd, theta, p
-    )
-    B1 = (mu1 * T1 - b11) / b12
-    return B1
+    if coeffs is None:
+        coeffs = _coeffs(T1, S1, K, lambd, theta, p)
+    return coeffs.B1
 
 
-def _coeff_s1_2(T1, S1, K, lambd, theta, p):
+def _coeff_s1_2(T1, S1, K, lambd, theta, p, coeffs=None):
     """Internal function for Ward and Lough (2011) solution"""
-    b11, b12, b22, mu1, mu2, l1, l2, beta1, beta2, A1, A2 = _coeffs(
-        T1, S1, K, lambd, theta, p
-    )
-    B2 = (mu2 * T1 - b11) / b12
-    return B2
+    if coeffs is None:
+        coeffs = _coeffs(T1, S1, K, lambd, theta, p)
+    return coeffs.B2
+
 
+def _kernel(x, A, beta, l, sqrt_mu, sqrt_mu_far):
+    """Internal function for Ward and Lough (2011) solution
 
-def _kernel1(T1, S1, K, lambd, x, theta_or_y, p):
+    Evaluates the kernel for arrays of x using masks instead of
+    branching on x < 0, 0 <= x <= 1 and x > 1.  sqrt_mu_far is the
+    square root of the eigenvalue used in the exponentials for x > 1.
+    """
+    x = np.asarray(x, dtype=float)
+    # the exponentials are only used for x >= 0, but can overflow
+    # for x < -1 before they are masked out
+    with np.errstate(over="ignore"):
+        sqrt_mu_image = np.where(x > 1, sqrt_mu_far, sqrt_mu)
+        image = (
+            beta
+            / (2 * sqrt_mu * l)
+            * (
+                np.exp(-np.abs(x - 1) * sqrt_mu_image)
+                - np.exp(-(x + 1) * sqrt_mu_image)
+            )
+        )
+    return A * np.exp(-np.abs(x) * sqrt_mu) + np.where(x >= 0, image, 0.0)
+
+
+def _kernel1(T1, S1, K, lambd, x, theta_or_y, p, coeffs=None):
     """Internal function for Ward and Lough (2011) solution"""
-    b11, b12, b22, mu1, mu2, l1, l2, beta1, beta2, A1, A2 = _coeffs(
-        T1, S1, K, lambd, theta_or_y, p
+    if coeffs is None:
+        coeffs = _coeffs(T1, S1, K, lambd, theta_or_y, p)
+    return _kernel(
+        x, coeffs.A1, coeffs.beta1, coeffs.l1, coeffs.sqrt_mu1, coeffs.sqrt_mu1
     )
 
-    if x < 0:
-        F1 = A1 * np.exp(x * np.sqrt(mu1))
-    elif 0 <= x <= 1:
-        F1 = A1 * np.exp(-x * np.sqrt(mu1)) + beta1 / (
-            2 * np.sqrt(mu1) * l1
-        ) * (np.exp((x - 1) * np.sqrt(mu1)) - np.exp(-(x + 1) * np.sqrt(mu1)))
-    else:
-        F1 = A1 * np.exp(-x * np.sqrt(mu1)) + beta1 / (
-            2 * np.sqrt(mu1) * l1
-        ) * (np.exp((1 - x) * np.sqrt(mu1)) - np.exp(-(x + 1) * np.sqrt(mu1)))
-    return F1
 
-
-def _kernel2(T1, S1, K, lambd, x, theta_or_y, p):
+def _kernel2(T1, S1, K, lambd, x, theta_or_y, p, coeffs=None):
     """Internal function for Ward and Lough (2011) solution"""
-    b11, b12, b22, mu1, mu2, l1, l2, beta1, beta2, A1, A2 = _coeffs(
-        T1, S1, K, lambd, theta_or_y, p
+    if coeffs is None:
+        coeffs = _coeffs(T1, S1, K, lambd, theta_or_y, p)
+    # note that for x > 1 the original implementation uses the
+    # first eigenvalue in the exponentials of the second kernel
+    return _kernel(
+        x, coeffs.A2, coeffs.beta2, coeffs.l2, coeffs.sqrt_mu2, coeffs.sqrt_mu1
     )
 
-    if x < 0:
-        F2 = A2 * np.exp(x * np.sqrt(mu2))
-    elif 0 <= x <= 1:
-        F2 = A2 * np.exp(-x * np.sqrt(mu2)) + beta2 / (
-            2 * np.sqrt(mu2) * l2
-        ) * (np.exp((x - 1) * np.sqrt(mu2)) - np.exp(-(x + 1) * np.sqrt(mu2)))
-    else:
-        F2 = A2 * np.exp(-x * np.sqrt(mu2)) + beta2 / (
-            2 * np.sqrt(mu2) * l2
-        ) * (np.exp((1 - x) * np.sqrt(mu1)) - np.exp(-(x + 1) * np.sqrt(mu1)))
-    return F2
+
+_WardLoughCoeffs = namedtuple(
+    "_WardLoughCoeffs",
+    [
+        "b11",
+        "b12",
+        "b22",
+        "mu1",
+        "mu2",
+        "sqrt_mu1",
+        "sqrt_mu2",
+        "B1",
+        "B2",
+        "l1",
+        "l2",
+        "beta1",
+        "beta2",
+        "A1",
+        "A2",
+    ],
+)
 
 
 def _coeffs(T1, S1, K, lambd, theta_or_y, p):
-    """Internal function for Ward and Lough (2011) solution"""
+    """Internal function for Ward and Lough (2011) solution
+
+    Computes all of the coefficients for arrays of theta and p at
+    once, so they can be shared by the kernels and the coefficients
+    for the second layer.
+    """
     b11 = T1 * theta_or_y**2 + S1 * p + K
     b12 = -K
     b22 = theta_or_y**2 + p + K
 
+    # eigenvalues written so the discriminant cannot cancel to a
+    # negative number and the smaller root is taken from the product
+    # of the roots, both of which matter at large theta
     mu1 = (b11 / T1 + b22) / 2 + np.sqrt(
-        (b11 / T1 + b22) ** 2 / 4 + (b12**2 - b11 * b22) / T1
-    )
-    mu2 = (b11 / T1 + b22) / 2 - np.sqrt(
-        (b11 / T1 + b22) ** 2 / 4 + (b12**2 - b11 * b22) / T1
+        (b11 / T1 - b22) ** 2 / 4 + b12**2 / T1
     )
-    l1 = T1 + ((mu1 * T1 - b11) / b12) ** 2
-    l2 = T1 + ((mu2 * T1 - b11) / b12) ** 2
+    mu2 = (b11 * b22 - b12**2) / (T1 * mu1)
+    sqrt_mu1 = np.sqrt(mu1)
+    sqrt_mu2 = np.sqrt(mu2)
 
-    beta1 = (mu1 * T1 - b11) / (b12 * 2 * np.pi * p)
-    beta2 = (mu2 * T1 - b11) / (b12 * 2 * np.pi * p)
+    B1 = (mu1 * T1 - b11) / b12
+    B2 = (mu2 * T1 - b11) / b12
+    l1 = T1 + B1**2
+    l2 = T1 + B2**2
+
+    beta1 = B1 / (2 * np.pi * p)
+    beta2 = B2 / (2 * np.pi * p)
 
-    Delta = 4 * np.sqrt(mu1 * mu2) + 2 * lambd * (
-        np.sqrt(mu1) / l2 + np.sqrt(mu2) / l1
+    Delta = 4 * sqrt_mu1 * sqrt_mu2 + 2 * lambd * (
+        sqrt_mu1 / l2 + sqrt_mu2 / l1
     )
 
+    exp1 = np.exp(-sqrt_mu1)
+    exp2 = np.exp(-sqrt_mu2)
     A1 = (
-        (
-            (lambd / l2 + 2 * np.sqrt(mu2)) * beta1 * np.exp(-np.sqrt(mu1))
-            - lambd * beta2 / l2 * np.exp(-np.sqrt(mu2))
-        )
+        ((lambd / l2 + 2 * sqrt_mu2) * beta1 * exp1 - lambd * beta2 / l2 * exp2)
         / Delta
         / l1
     )
-
     A2 = (
-        (
-            -lambd * beta1 / l1 * np.exp(-np.sqrt(mu1))
-            + (lambd / l1 + 2 * np.sqrt(mu1)) * beta2 * np.exp(-np.sqrt(mu2))
-        )
+        (-lambd * beta1 / l1 * exp1 + (lambd / l1 + 2 * sqrt_mu1) * beta2 * exp2)
         / Delta
         / l2
     )
 
-    return b11, b12, b22, mu1, mu2, l1, l2, beta1, beta2, A1, A2
-
-
-def _safe_factorial(n):
-    """Calculate factorial using logarithmic method to avoid overflow."""
-    if n < 0:
-        return float("inf")
-    elif n < 2:
-        return 1
-    else:
-        return np.exp(gammaln(n + 1))
-
-
-def _StehfestCoeff(jj, N):
-    """Internal function for Ward and Lough (2011) solution"""
-    LowerLimit = (jj + 1) // 2
-    UpperLimit = min(jj, N // 2)
-
-    V = 0
-    for kk in range(LowerLimit, UpperLimit + 1):
-        denominator = (
-            _safe_factorial(N // 2 - kk)
-            * _safe_factorial(kk)
-            * _safe_factorial(kk - 1)
-            * _safe_factorial(jj - kk)
-            * _safe_factorial(2 * kk - jj)
-        )
-        if denominator != 0:  # Prevent division by zero
-            V += kk ** (N // 2) * _safe_factorial(2 * kk) / denominator
-
-    V *= (-1) ** (N // 2 + jj)
-    return V
+    return _WardLoughCoeffs(
+        b11,
+        b12,
+        b22,
+        mu1,
+        mu2,
+        sqrt_mu1,
+        sqrt_mu2,
+        B1,
+        B2,
+        l1,
+        l2,
+        beta1,
+        beta2,
+        A1,
+        A2,
+    )
 
 
 # List drawdown and depletion methods so they can be called
@@ -1359,6 +1966,14 @@ ALL_DEPL_METHODS = {
     "ward_lough_depletion": ward_lough_depletion,
 }
 
+# solutions with analytic gradients (see WellResponse.gradient)
+GRADIENT_METHODS = {
+    "theis_drawdown": theis_drawdown_gradient,
+    "glover_depletion": glover_depletion_gradient,
+    "walton_depletion": walton_depletion_gradient,
+    "hunt_99_depletion": hunt_99_depletion_gradient,
+}
+
 GPM2CFD = 60 * 24 / 7.48  # factor to convert from GPM to CFD
 CFD2GPM = 1 / GPM2CFD  # factor to convert from CFD to GPM
 SEC2DAY = 60 * 60 * 24  # factor to conver x/sec to x/day
@@ -347,6 +347,37 @@ def test_distance():
     #  ([2,3],[9,32.9]), 30.70846788753877)
 
 
+def test_distance_matrix():
+    from pycap import analysis_project as ap
+
+    wells = [[89.38323, 43.07476], [89.4, 43.1], [89.2, 43.0]]
+    responses = [[89.38492, 43.07479], [89.5, 43.2]]
+    dist = ap._distance_matrix(wells, responses)
+    assert dist.shape == (3, 2)
+    assert np.allclose(
+        dist,
+        [[ap._loc_to_dist(w, r) for r in responses] for w in wells],
+    )
+
+
+def test_distance_matrix_crs():
+    from pycap import analysis_project as ap
+
+    pytest.importorskip("pyproj")
+    # projected coordinates in meters
+    dist = ap._distance_matrix(
+        [[0.0, 0.0], [300.0, 400.0]], [[0.0, 0.0]], crs="EPSG:3071"
+    )
+    assert np.allclose(dist[:, 0], [0.0, 500.0 / 0.3048])
+    # lat/long transformed to a projected crs
+    dist = ap._distance_matrix(
+        [[-89.38323, 43.07476]],
+        [[-89.38492, 43.07479]],
+        distance_crs="EPSG:3071",
+    )
+    assert np.isclose(dist[0, 0], 450.09, rtol=0.01)
+
+
 def test_glover_depletion():
     """Test for the glover calculations
     against the Glover & Balmer (1954) paper
@@ -548,6 +579,89 @@ def test_run_yml_example():
     ap.write_responses_csv()
 
 
+def test_aggregate_results():
+    """Aggregated results of a Project with the same stream
+    response names at several wells match sums of the
+    depletion time series of the wells"""
+    from pycap.analysis_project import Project
+
+    ap = Project(datapath / "example.yml")
+    ap.aggregate_results()
+    assert ap.depletion_results.values.shape == (4, 2, ap.ts_len)
+    assert ap.drawdown_results.values.shape == (4, 2)
+
+    nexist = 2 * len(ap.existing_wells)
+    for ck in ("Upp Creek", "no paddle"):
+        cols = [i for i, c in enumerate(ap.all_depl_ts.columns) if c == ck]
+        exist = ap.all_depl_ts.iloc[:, [i for i in cols if i < nexist]]
+        total = ap.all_depl_ts.iloc[:, cols]
+        assert np.allclose(
+            ap.existing_aggregated_base_stream_sum_depletion[ck],
+            exist.sum(axis=1),
+        )
+        assert np.allclose(
+            ap.total_aggregated_sum_depletion[ck], total.sum(axis=1)
+        )
+        assert np.isclose(
+            ap.total_aggregated_max_depletion[ck], total.max().sum()
+        )
+
+
+def test_results_store():
+    """The labeled arrays written to a results store agree with
+    the aggregated results of the Project"""
+    from pycap.analysis_project import Project
+    from pycap.results_store import _results_variables
+
+    ap = Project(datapath / "example.yml")
+    ap.aggregate_results()
+    coords, _, variables, attrs = _results_variables(ap)
+    assert attrs["depl_method"] == "walton_depletion"
+    _, depl, _ = variables["depletion"]
+    _, agg_depl, _ = variables["aggregated_depletion"]
+    assert depl.shape == (2, ap.ts_len, 4)
+    assert np.allclose(np.nansum(depl, axis=2), agg_depl[:, :, 2])
+    _, agg_dd, attrs = variables["aggregated_drawdown"]
+    assert attrs["units"] == "ft"
+    assert np.allclose(
+        agg_dd[:, 2], list(ap.total_aggregated_drawdown.values())
+    )
+    with pytest.raises(pycap.PycapException):
+        ap.write_responses("bogus")
+
+    pytest.importorskip("pyarrow")
+    from pycap.results_store import read_results_store
+
+    ap.write_responses("parquet")
+    df = read_results_store(
+        ap.store_filename, response="no paddle", times=(10, 20)
+    )
+    assert set(df.stream_response) == {"no paddle"}
+    assert df.time.min() == 10 and df.time.max() == 20
+    assert df.attrs["units"] == "cfs"
+    assert np.allclose(
+        df.groupby("time", observed=True).depletion.sum(),
+        agg_depl[1, 9:20, 2],
+    )
+
+
+def test_project_n_workers():
+    """A Project evaluated on a process pool reports the
+    same results as a serial run"""
+    from pycap.analysis_project import Project
+
+    results = {}
+    for n_workers in (1, 2):
+        ap = Project(datapath / "example2.yml", n_workers=n_workers)
+        ap.report_responses()
+        ap.write_responses_csv()
+        results[n_workers] = (ap.agg_df, ap.all_depl_ts)
+    pd.testing.assert_frame_equal(results[1][0], results[2][0])
+    pd.testing.assert_frame_equal(results[1][1], results[2][1])
+    with pytest.raises(pycap.PycapException):
+        Project(datapath / "example2.yml", n_workers=0)
+
+
 def test_hunt_99_depletion_results_multiple_times():
     """Test of hunt_99_depletion() function in the
     well.py module.  Compares computed stream depletion
@@ -681,6 +795,24 @@ def test_hunt_03_depletion_results(hunt_03_results):
     np.testing.assert_allclose(ratios, res, rtol=tol)
 
 
+def test_hunt_03_G_series():
+    """Recurrence sum of the Hunt (2003) G series matches the
+    direct sum of binomial and incomplete gamma terms"""
+    from scipy.special import comb, gammainc
+
+    from pycap.solutions import _G_series
+
+    x = np.array([1e-3, 0.5, 5.0, 40.0, 200.0, 900.0])[:, None]
+    r2 = np.array([0.0, 0.05, 0.2, 0.249, 0.25])[None, :]
+    n = np.arange(60)[:, None, None]
+    direct = np.sum(
+        comb(2 * n, n) * r2**n * gammainc(2 * n + 1, x), axis=0
+    )
+    np.testing.assert_allclose(_G_series(x, r2), direct, rtol=1e-12, atol=1e-13)
+    # scalars come back with the broadcast shape
+    assert _G_series(2.0, 0.1).shape == ()
+
+
 @pytest.mark.xfail
 def test_yml_ts_parsing1():
     from pycap.analysis_project import Project
@@ -689,6 +821,30 @@ def test_yml_ts_parsing1():
     Project(datapath / "example3.yml")
 
 
+def test_read_pumping_timeseries(tmp_path):
+    from pycap.analysis_project import _read_pumping_timeseries
+
+    csv_ts = pd.read_csv(datapath / "hunt_test_ts.csv").set_index(
+        "sequential_day"
+    )
+    Q_ts = _read_pumping_timeseries(datapath / "hunt_test_ts.csv", ["well1"])
+    assert list(Q_ts.columns) == ["well1"]
+    assert Q_ts.index.name == "sequential_day"
+    assert Q_ts.to_numpy().flags["C_CONTIGUOUS"]
+    assert np.allclose(Q_ts.well1, csv_ts.well1)
+
+    pytest.importorskip("pyarrow")
+    for ext in (".parquet", ".feather"):
+        tsfile = tmp_path / f"hunt_test_ts{ext}"
+        if ext == ".parquet":
+            csv_ts.reset_index().to_parquet(tsfile)
+        else:
+            csv_ts.reset_index().to_feather(tsfile)
+        Q_ts = _read_pumping_timeseries(tsfile, ["well1"])
+        assert list(Q_ts.columns) == ["well1"]
+        assert np.allclose(Q_ts.well1, csv_ts.well1)
+
+
 @pytest.fixture
 def SIR2009_5003_Table2_Batch_results():
     """The batch column from Table 2, SIR 2009-5003,
@@ -817,6 +973,68 @@ def test_hunt_continuous():
     )
 
 
+def test_solution_broadcasting():
+    """Closed-form solutions broadcast time against distance
+    and aquifer properties and match one call per distance
+    """
+    T = 1000.0
+    S = np.array([0.01, 0.2])[:, None, None]
+    dist = np.array([100.0, 500.0, 2500.0])[None, :, None]
+    time = np.arange(0.0, 50.0)[None, None, :]
+    Q = 2.0
+    lam = 10.0
+    funcs = {
+        "theis_drawdown": {},
+        "glover_depletion": {},
+        "walton_depletion": {},
+        "hunt_99_depletion": {"streambed_conductance": lam},
+    }
+    for fname, kwargs in funcs.items():
+        func = getattr(pycap, fname)
+        cube = func(T, S, time, dist, Q, **kwargs)
+        assert cube.shape == (2, 3, 50)
+        # zero time gives zero response
+        assert np.all(cube[:, :, 0] == 0)
+        for i, cS in enumerate(S.ravel()):
+            for j, cdist in enumerate(dist.ravel()):
+                np.testing.assert_allclose(
+                    cube[i, j], func(T, cS, time.ravel(), cdist, Q, **kwargs)
+                )
+
+
+@pytest.mark.parametrize(
+    "fname,kwargs,single_shape",
+    [
+        ("theis_drawdown", {}, (1,)),
+        ("glover_depletion", {}, ()),
+        ("walton_depletion", {}, ()),
+        ("hunt_99_depletion", {"streambed_conductance": 10.0}, ()),
+    ],
+)
+def test_solution_return_types(fname, kwargs, single_shape):
+    """Single values of time and distance, as scalars, lists or arrays,
+    return what the solutions returned before broadcasting: an array of
+    one value for Theis and a scalar for the depletion solutions"""
+    func = getattr(pycap, fname)
+    singles = (10.0, [10.0], np.array([10.0]))
+    for time in singles + (0.0,):
+        for dist in singles:
+            result = func(1000.0, 0.01, time, dist, 2.0, **kwargs)
+            assert np.shape(result) == single_shape
+            if single_shape == ():
+                assert isinstance(result, float)
+            else:
+                assert isinstance(result, np.ndarray)
+    for time, dist, shape in (
+        ([0.0, 10.0, 20.0], 100.0, (3,)),
+        (10.0, np.array([100.0, 200.0]), (2,)),
+        (np.array([0.0, 10.0]), [100.0, 200.0], (2,)),
+    ):
+        result = func(1000.0, 0.01, time, dist, 2.0, **kwargs)
+        assert isinstance(result, np.ndarray)
+        assert result.shape == shape
+
+
 def test_hunt_99_drawdown():
     """Test of hunt_99_drawdown() function in the
     well.py module.
@@ -839,6 +1057,41 @@ def test_hunt_99_drawdown():
     assert np.allclose(ddwn, no_stream)
 
 
+def test_hunt_99_drawdown_vectorized():
+    """The vectorized integration of hunt_99_drawdown must match
+    the adaptive quad integration at single points and on meshgrids,
+    without changing the warning filters of the process
+    """
+    import warnings
+
+    Q = 1000.0
+    dist = 200.0
+    T = 1000.0
+    S = 0.1
+    time = [0.0, 1.0, 28.0, 365.0]
+    x, y = np.meshgrid(np.linspace(-100, 400, 6), np.linspace(-300, 300, 5))
+    filters = list(warnings.filters)
+    for rlambda in [0.0, 1.0, 10.0, 1.0e4]:
+        pars = {"streambed_conductance": rlambda, "x": x, "y": y}
+        ddwn_quad = pycap.hunt_99_drawdown(T, S, time, dist, Q, **pars)
+        ddwn_vec = pycap.hunt_99_drawdown(
+            T, S, time, dist, Q, integration="vectorized", **pars
+        )
+        assert ddwn_vec.shape == (len(time), 5, 6)
+        np.testing.assert_allclose(ddwn_vec, ddwn_quad, rtol=1e-6, atol=1e-9)
+        # times at a single point
+        pars.update({"x": 50.0, "y": 10.0})
+        np.testing.assert_allclose(
+            pycap.hunt_99_drawdown(
+                T, S, time, dist, Q, integration="vectorized", **pars
+            ),
+            pycap.hunt_99_drawdown(T, S, time, dist, Q, **pars),
+            rtol=1e-6,
+            atol=1e-9,
+        )
+    assert warnings.filters == filters
+
+
 def test_transient_dd():
     # read in the pumping timeseries and the depletion results included as a column
     flname = datapath / "transient_dd_ts.csv"
@@ -879,6 +1132,74 @@ def test_ward_lough_depletion(ward_lough_test_data):
     )
 
 
+def test_stehfest_weights():
+    """Stehfest weights are exact, cached, and invert a known transform"""
+    from pycap.laplace_inversion import (
+        _stehfest_weights_exact,
+        stehfest_weights,
+    )
+
+    assert np.array_equal(stehfest_weights(2), [2, -2])
+    assert np.array_equal(stehfest_weights(4), [-2, 26, -48, 24])
+    assert stehfest_weights(12) is stehfest_weights(12)
+    for N in [2, 8, 16, 24]:
+        assert sum(_stehfest_weights_exact(N)) == 0
+    # invert F(p) = 1/(p+1) to f(t) = exp(-t)
+    t = np.array([0.5, 1.0, 2.0])
+    V = stehfest_weights(14)
+    p = np.arange(1, 15)[:, None] * np.log(2) / t
+    f = np.log(2) / t * np.sum(V[:, None] / (p + 1), axis=0)
+    np.testing.assert_allclose(f, np.exp(-t), rtol=1e-4)
+    with pytest.raises(pycap.PycapException):
+        stehfest_weights(3)
+
+
+@pytest.mark.parametrize("method", ["stehfest", "talbot", "dehoog"])
+def test_laplace_inversion_methods(method):
+    """Each Laplace inversion method recovers known transforms
+    to within its target accuracy"""
+    from scipy.special import erfc
+
+    from pycap.laplace_inversion import invert_laplace
+
+    t = np.array([0.1, 1.0, 5.0, 20.0])
+    accuracy = 1e-4 if method == "stehfest" else 1e-7
+    cases = [
+        (lambda p: 1 / (p + 1), np.exp(-t)),
+        (lambda p: 1 / p**2, t),
+        (lambda p: np.exp(-np.sqrt(p)) / p, erfc(1 / (2 * np.sqrt(t)))),
+    ]
+    for F, f in cases:
+        np.testing.assert_allclose(
+            invert_laplace(F, t, method, accuracy) / np.maximum(np.abs(f), 1),
+            f / np.maximum(np.abs(f), 1),
+            atol=50 * accuracy,
+        )
+    with pytest.raises(pycap.PycapException):
+        invert_laplace(cases[0][0], t, "euler")
+    with pytest.raises(pycap.PycapException):
+        invert_laplace(cases[0][0], [0.0, 1.0], method)
+
+
+def test_ward_lough_laplace_methods(ward_lough_test_data):
+    """Ward and Lough solutions agree across Laplace inversion methods"""
+    allpars = ward_lough_test_data["params"].copy()
+    allpars["t"] = np.array([0.0, 10.0, 100.0, 1000.0])
+    ref = pycap.ward_lough_drawdown(**allpars, NSteh1=12, NSteh2=12)
+    for method in ["talbot", "dehoog"]:
+        dd = pycap.ward_lough_drawdown(
+            **allpars, laplace_method=method, laplace_accuracy=1e-6
+        )
+        np.testing.assert_allclose(dd, ref, rtol=1e-3, atol=1e-8)
+    allpars.pop("x")
+    allpars.pop("y")
+    ref = pycap.ward_lough_depletion(**allpars, NSteh1=12)
+    depl = pycap.ward_lough_depletion(
+        **allpars, laplace_method="dehoog", laplace_accuracy=1e-6
+    )
+    np.testing.assert_allclose(depl, ref, rtol=1e-3, atol=1e-8)
+
+
 def test_ward_lough_drawdown(ward_lough_test_data):
     # note: the parameters defined below are intended to result in the nondimensional
     # parameters corresponding with Fig. 3 in DOI: 10.1061/ (ASCE)HE.1943-5584.0000382.
@@ -897,12 +1218,107 @@ def test_ward_lough_drawdown(ward_lough_test_data):
     )
 
 
-@pytest.mark.xfail
+def test_ward_lough_batched_fourier_inverse():
+    """The shared-grid Fourier inversion of the Ward and Lough
+    kernels must match tight adaptive quadrature for each p
+    """
+    import scipy.integrate as integrate
+
+    from pycap import solutions
+
+    T1, S1, K, lambd, x, y = 1.0, 1000.0, 0.1, 0.1, 0.5, 1.0
+    p = np.array([[1e-3, 1e-1], [1.0, 1e2]])
+
+    def integrand(phi, cp):
+        theta = np.tan(phi)
+        kern = solutions._kernel1(
+            T1, S1, K, lambd, x, theta, cp
+        ) + solutions._kernel2(T1, S1, K, lambd, x, theta, cp)
+        return 2 * kern * np.cos(theta * y) / np.cos(phi) ** 2
+
+    batched = solutions._if1(T1, S1, K, lambd, x, y, p)
+    assert batched.shape == p.shape
+    for cp, cval in zip(p.ravel(), batched.ravel()):
+        ref, _ = integrate.quad(
+            integrand, 0, np.pi / 2, args=(cp,), epsabs=0, epsrel=1e-10
+        )
+        assert np.isclose(cval, ref, rtol=1e-5)
+
+
+def test_ward_lough_fourier_inverse_warning(monkeypatch):
+    """A warning names the entries of the Fourier inversion that did
+    not converge within the maximum number of nodes"""
+    import warnings
+
+    import scipy.integrate as integrate
+
+    from pycap import solutions
+
+    T1, S1, K, lambd, x, y = 1.0, 1000.0, 0.1, 0.1, 0.5, 1.0
+    p = np.array([[1e-3, 1e-1], [1.0, 1e2]])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", integrate.IntegrationWarning)
+        converged = solutions._if1(T1, S1, K, lambd, x, y, p)
+    monkeypatch.setattr(solutions, "_FOURIER_TOL", 1e-15)
+    monkeypatch.setattr(solutions, "_FOURIER_MAX_NODES", 128)
+    with pytest.warns(
+        integrate.IntegrationWarning, match="4 of 4 Laplace parameters"
+    ):
+        capped = solutions._if1(T1, S1, K, lambd, x, y, p)
+    # the last estimate is still returned
+    np.testing.assert_allclose(capped, converged, rtol=1e-2)
+    # the warning is still issued after hunt_99_drawdown, which
+    # ignores the IntegrationWarnings of its own integrations
+    for integration in ("quad", "vectorized"):
+        pycap.hunt_99_drawdown(
+            1000.0,
+            0.1,
+            [1.0, 28.0],
+            200.0,
+            1000.0,
+            streambed_conductance=10.0,
+            x=50.0,
+            y=10.0,
+            integration=integration,
+        )
+    with warnings.catch_warnings(record=True) as caught:
+        solutions._if1(T1, S1, K, lambd, x, y, p)
+    assert [
+        i
+        for i in caught
+        if issubclass(i.category, integrate.IntegrationWarning)
+        and "4 of 4 Laplace parameters" in str(i.message)
+    ]
+
+
+def test_ward_lough_kernels_vectorized():
+    """Ward and Lough kernels accept arrays of x, theta and p and
+    match element-by-element evaluation across the x branches
+    """
+    from pycap import solutions
+
+    T1, S1, K, lambd = 1.0, 1000.0, 0.1, 0.1
+    x = np.array([-1.5, -0.2, 0.0, 0.5, 1.0, 1.7])
+    theta = np.array([0.0, 0.3, 2.0])[:, None, None]
+    p = np.array([0.01, 1.0])[None, :, None]
+    coeffs = solutions._coeffs(T1, S1, K, lambd, theta, p)
+    for kernel in (solutions._kernel1, solutions._kernel2):
+        batched = kernel(T1, S1, K, lambd, x, theta, p, coeffs)
+        assert batched.shape == (3, 2, 6)
+        for i, ct in enumerate(theta.ravel()):
+            for j, cp in enumerate(p.ravel()):
+                for k, cx in enumerate(x):
+                    assert np.isclose(
+                        batched[i, j, k], kernel(T1, S1, K, lambd, cx, ct, cp)
+                    )
+
+
 def test_custom_exception():
     from pycap import theis_drawdown
 
-    # this should raise an exception
-    theis_drawdown(1, 1, [1, 2], [1, 2], 5)
+    # shapes that cannot be broadcast raise a PycapException
+    with pytest.raises(pycap.PycapException):
+        theis_drawdown(1, 1, [1, 2], [1, 2, 3], 5)
 
 
 def test_complex_well(ward_lough_test_data):
@@ -943,3 +1359,706 @@ def test_complex_well(ward_lough_test_data):
 
     # now check against non-Well-object calcs only valid for depletion
     assert np.allclose(dep1[1:], depl["resp1"][1:])
+
+
+@pytest.mark.parametrize(
+    "method",
+    list(pycap.ALL_DEPL_METHODS.keys()) + list(pycap.ALL_DD_METHODS.keys()),
+)
+def test_convolution_superposition(method):
+    """Superposition by convolution of the unit-rate response must
+    reproduce the image-well-in-time loop for every solution
+    """
+    # variable schedule with many changes, including returns to zero
+    rng = np.random.default_rng(42)
+    Q = pd.Series(
+        index=range(1, 61),
+        data=np.repeat(rng.choice([0.0, 500.0, 800.0], size=20), 3),
+    )
+    # enough changes to exercise the FFT branch of the convolution
+    if method in ("glover_depletion", "walton_depletion", "theis_drawdown"):
+        Q = pd.Series(index=range(1, 731), data=rng.uniform(0, 1000, 730))
+    pars = {
+        "T": 1000.0,
+        "S": 0.01,
+        "dist": 500.0,
+        "Q": Q,
+        "stream_apportionment": 0.6,
+        "streambed_conductance": 10.0,
+        "Bprime": 20,
+        "Bdouble": 15,
+        "aquitard_K": 1.0,
+        "sigma": 0.1,
+        "width": 5,
+        "T2": 1000.0,
+        "S2": 0.01,
+        "streambed_thick": 10,
+        "streambed_K": 1,
+        "aquitard_thick": 10,
+        "x": 50.0,
+        "y": 100.0,
+    }
+    if method in pycap.ALL_DEPL_METHODS:
+        pars["depl_method"] = method
+        attr = "depletion"
+    else:
+        pars["dd_method"] = method
+        attr = "drawdown"
+    loop = getattr(pycap.WellResponse("r", "resp", **pars), attr)
+    conv = getattr(
+        pycap.WellResponse(
+            "r", "resp", superposition="convolution", **pars
+        ),
+        attr,
+    )
+    assert loop.shape == conv.shape
+    np.testing.assert_allclose(
+        conv, loop, rtol=1e-8, atol=1e-8 * np.nanmax(np.abs(loop))
+    )
+
+
+def test_response_cache():
+    """Unit-rate responses are shared by wells with the same
+    dimensionless groups and rescaled for each well"""
+    cache = pycap.ResponseCache(maxsize=2)
+    Q = pd.Series(index=range(1, 366), data=0.0)
+    Q.loc[30:200] = 1000.0
+    pars = {"S": 0.01, "dist": 500.0, "Q": Q, "response_cache": cache}
+    # same dist**2 * S / T with different T and S
+    r1 = pycap.WellResponse(
+        "a", "stream", T=1000.0, stream_apportionment=0.5, **pars
+    )
+    pars["S"] = 0.02
+    r2 = pycap.WellResponse(
+        "b", "well", T=2000.0, stream_apportionment=1.0, **pars
+    )
+    depl1 = r1.depletion
+    depl2 = r2.depletion
+    assert cache.info() == (1, 1, 2, 1)
+    np.testing.assert_allclose(depl2, 2 * depl1)
+    np.testing.assert_allclose(
+        depl1,
+        pycap.solutions._superpose_convolution(
+            pycap.glover_depletion, 1000.0, 0.01, 500.0, Q, 0.5
+        ),
+    )
+    # drawdown shares the groups but is rescaled by 1 / T
+    dd1 = r1.drawdown
+    dd2 = r2.drawdown
+    assert cache.info() == (2, 2, 2, 2)
+    np.testing.assert_allclose(dd1, 2 * dd2)
+    np.testing.assert_allclose(
+        dd2,
+        pycap.solutions._superpose_convolution(
+            pycap.theis_drawdown, 2000.0, 0.02, 500.0, Q
+        ),
+    )
+    # least recently used response is evicted
+    pycap.WellResponse(
+        "c", "stream", T=50.0, stream_apportionment=1.0, **pars
+    ).depletion
+    assert cache.info() == (2, 3, 2, 2)
+    # results are memoized on the response until cleared
+    r1.depletion
+    assert cache.info().misses == 3
+    r1.clear_cache()
+    r1.depletion
+    assert cache.info().misses == 4
+    cache.clear()
+    assert cache.info() == (0, 0, 2, 0)
+    with pytest.raises(pycap.PycapException):
+        pycap.ResponseCache(maxsize=-1)
+    # a well on the stream has no dimensionless drawdown location,
+    # so hunt_99_drawdown is cached on its dimensional parameters
+    pars = {
+        "T": 1000.0,
+        "S": 0.01,
+        "dist": 0.0,
+        "Q": Q,
+        "streambed_conductance": 5.0,
+        "x": 50.0,
+        "y": 30.0,
+    }
+    dd = pycap.WellResponse(
+        "d",
+        "well",
+        dd_method="hunt_99_drawdown",
+        response_cache=cache,
+        **pars,
+    ).drawdown
+    assert np.all(np.isfinite(dd))
+    np.testing.assert_allclose(
+        dd,
+        pycap.solutions._superpose_convolution(
+            pycap.hunt_99_drawdown,
+            1000.0,
+            0.01,
+            0.0,
+            Q,
+            streambed_conductance=5.0,
+            x=50.0,
+            y=30.0,
+        ),
+    )
+
+
+def test_project_response_cache_size(tmp_path):
+    """A response_cache_size in the YML file gives the Project its own
+    cache and leaves the cache shared by the process unchanged"""
+    import yaml
+
+    from pycap.analysis_project import Project
+    from pycap.benchmarks import write_synthetic_project
+
+    ymlfile = tmp_path / "sized.yml"
+    write_synthetic_project(ymlfile, nwells=2, timeseries=False)
+    with open(ymlfile) as ifp:
+        project = yaml.safe_load(ifp)
+    maxsize = pycap.RESPONSE_CACHE.maxsize
+    ap = Project(ymlfile)
+    assert ap.response_cache is pycap.RESPONSE_CACHE
+
+    project["project_properties"]["response_cache_size"] = 3
+    with open(ymlfile, "w") as ofp:
+        yaml.safe_dump(project, ofp)
+    ap = Project(ymlfile)
+    ap.aggregate_results()
+    assert ap.response_cache is not pycap.RESPONSE_CACHE
+    assert ap.response_cache.info().maxsize == 3
+    assert 0 < ap.response_cache.info().currsize <= 3
+    assert pycap.RESPONSE_CACHE.maxsize == maxsize
+
+    for size in (-1, "big", 2.5):
+        project["project_properties"]["response_cache_size"] = size
+        with open(ymlfile, "w") as ofp:
+            yaml.safe_dump(project, ofp)
+        with pytest.raises(pycap.PycapException):
+            Project(ymlfile)
+
+
+def test_set_backend():
+    """The numba backend gives the same results as numpy,
+    or falls back to numpy with a warning if numba is missing"""
+    pars = {
+        "T": 1000.0,
+        "S": 0.01,
+        "time": [0, 10, 100],
+        "dist": 200.0,
+        "Q": 1000.0,
+        "streambed_conductance": 5.0,
+        "x": 50.0,
+        "y": 30.0,
+    }
+    assert pycap.get_backend() == "numpy"
+    ref = pycap.hunt_99_drawdown(**pars)
+    try:
+        import numba  # noqa: F401
+    except ImportError:
+        with pytest.warns(UserWarning):
+            assert pycap.set_backend("numba") == "numpy"
+    else:
+        assert pycap.set_backend("numba") == "numba"
+    try:
+        np.testing.assert_allclose(pycap.hunt_99_drawdown(**pars), ref)
+    finally:
+        pycap.set_backend("numpy")
+    with pytest.raises(pycap.PycapException):
+        pycap.set_backend("fortran")
+
+
+def test_numba_G_series():
+    """The numba Hunt (2003) G series matches the numpy series, for
+    arrays and scalars, and in hunt_03_depletion"""
+    pytest.importorskip("numba")
+    from pycap import _numba_kernels
+    from pycap.solutions import _G_NTERMS, _G_TOL, _G_series
+
+    x = np.array([1e-3, 0.5, 5.0, 40.0, 200.0, 900.0])[:, None]
+    r2 = np.array([0.0, 0.05, 0.2, 0.249, 0.25])[None, :]
+    compiled = _numba_kernels.G_series(x, r2, _G_TOL, _G_NTERMS)
+    assert compiled.shape == (6, 5)
+    np.testing.assert_allclose(compiled, _G_series(x, r2), rtol=1e-12)
+    scalar = _numba_kernels.G_series(2.0, 0.1, _G_TOL, _G_NTERMS)
+    assert scalar.shape == ()
+    np.testing.assert_allclose(scalar, _G_series(2.0, 0.1), rtol=1e-12)
+
+    pars = {
+        "T": 1000.0,
+        "S": 0.001,
+        "time": np.array([0.0, 1.0, 10.0, 100.0, 1000.0]),
+        "dist": 500.0,
+        "Q": 48125.0,
+        "Bprime": 20.0,
+        "Bdouble": 15.0,
+        "aquitard_K": 1.0,
+        "sigma": 0.1,
+        "width": 5.0,
+        "streambed_conductance": 0.33,
+    }
+    ref = pycap.hunt_03_depletion(**pars)
+    assert pycap.set_backend("numba") == "numba"
+    try:
+        np.testing.assert_allclose(
+            pycap.hunt_03_depletion(**pars), ref, rtol=1e-10
+        )
+    finally:
+        pycap.set_backend("numpy")
+
+
+def test_well_field():
+    """WellField arrays match WellResponse results for every pair"""
+    rng = np.random.default_rng(7)
+    nwells, nresp, ntimes = 3, 2, 200
+    Q = np.repeat(rng.choice([0.0, 300.0, 800.0], size=(nwells, 20)), 10, 1)
+    well_xy = rng.uniform(0, 2000, (nwells, 2))
+    resp_xy = rng.uniform(0, 2000, (nresp, 2))
+    T = np.array([500.0, 1000.0, 1500.0])
+    apportionment = rng.uniform(0, 1, (nwells, nresp))
+    wf = pycap.WellField(
+        T,
+        0.01,
+        Q,
+        well_xy=well_xy,
+        drawdown_xy=resp_xy,
+        stream_xy=resp_xy,
+        stream_apportionment=apportionment,
+        streambed_conductance=5.0,
+        depl_method="hunt_99_depletion",
+    )
+    depl = wf.depletion
+    dd = wf.drawdown
+    assert depl.shape == dd.shape == (nwells, nresp, ntimes)
+    for i in range(nwells):
+        for j in range(nresp):
+            wr = pycap.WellResponse(
+                "r",
+                "stream",
+                T=T[i],
+                S=0.01,
+                dist=np.hypot(*(well_xy[i] - resp_xy[j])),
+                Q=pd.Series(index=range(1, ntimes + 1), data=Q[i]),
+                stream_apportionment=apportionment[i, j],
+                depl_method="hunt_99_depletion",
+                streambed_conductance=5.0,
+            )
+            np.testing.assert_allclose(depl[i, j], wr.depletion, atol=1e-10)
+            np.testing.assert_allclose(dd[i, j], wr.drawdown, atol=1e-10)
+    np.testing.assert_allclose(wf.max_depletion, depl.max(axis=-1))
+    with pytest.raises(pycap.PycapException):
+        pycap.WellField(T, 0.01, Q, stream_dist=np.ones((2, 2)))
+    with pytest.raises(pycap.PycapException):
+        pycap.WellField(T, 0.01, Q, dd_method="hunt_99_drawdown")
+
+
+def test_well_result_caching():
+    """Well results are computed once, and recomputed when inputs
+    change (including in place) or the cache is cleared"""
+    cache = pycap.ResponseCache(maxsize=0)  # counts every solution call
+    Q = pycap.Q2ts(90, 2, 500.0)
+    well = pycap.Well(
+        T=1000.0,
+        S=0.01,
+        Q=Q,
+        depletion_years=2,
+        theis_dd_days=90,
+        depl_pump_time=90,
+        stream_dist={"s1": 500.0, "s2": 900.0},
+        drawdown_dist={"w1": 300.0},
+        stream_apportionment={"s1": 0.4, "s2": 0.6},
+        depl_method="glover_depletion",
+        response_cache=cache,
+    )
+    depl = well.depletion
+    assert well.depletion["s1"] is depl["s1"]
+    well.max_depletion
+    well.drawdown
+    well.drawdown
+    assert cache.info().misses == 3
+    with pytest.raises(ValueError):
+        depl["s1"][0] = 1.0
+    # changing pumping in place invalidates the results
+    Q.iloc[:30] = 1000.0
+    assert np.all(well.depletion["s1"] >= depl["s1"])
+    assert not np.allclose(well.depletion["s1"], depl["s1"])
+    assert cache.info().misses == 5
+    well.T = 2000.0
+    well.max_depletion
+    assert cache.info().misses == 7
+    well.clear_cache()
+    well.depletion
+    assert cache.info().misses == 9
+    # WellResponse attributes are used directly by the calculation
+    wr = well.stream_responses[1]
+    before = wr.depletion
+    wr.dist = 5000.0
+    assert np.max(wr.depletion) < np.max(before)
+
+
+def test_benchmarks(tmp_path):
+    """Benchmarks are saved as JSON and compared between runs"""
+    from pycap.benchmarks import compare_benchmarks, run_benchmarks
+
+    filename = tmp_path / "benchmarks.json"
+    benchmarks = run_benchmarks(
+        methods=["theis_drawdown"],
+        kernels=False,
+        quick=True,
+        repeat=1,
+        filename=filename,
+    )
+    names = [r["name"] for r in benchmarks["results"]]
+    assert names == [
+        "theis_drawdown[scalar]",
+        "theis_drawdown[1k]",
+        "theis_drawdown[grid]",
+    ]
+    assert all(
+        r["evaluations_per_second"] > 0 and r["peak_memory_bytes"] > 0
+        for r in benchmarks["results"]
+    )
+    comparison = compare_benchmarks(filename, benchmarks)
+    assert np.allclose(comparison.speedup, 1.0)
+    with pytest.raises(pycap.PycapException):
+        run_benchmarks(methods=["not_a_method"])
+
+
+def test_scaling(tmp_path):
+    """The Project pipeline runs on synthetic projects of
+    increasing size, with and without time series files"""
+    from pycap.benchmarks import SCALING_STAGES, run_scaling
+
+    for timeseries in (True, False):
+        timings, exponents = run_scaling(
+            tmp_path,
+            values=(4, 8),
+            depl_methods=("walton_depletion", "hunt_99_depletion"),
+            timeseries=timeseries,
+        )
+        assert list(timings.nwells) == [4, 8, 4, 8]
+        assert (timings[list(SCALING_STAGES)] > 0).all().all()
+        assert list(exponents.index) == [
+            "walton_depletion",
+            "hunt_99_depletion",
+        ]
+
+
+def test_result_cache(tmp_path):
+    """Results are loaded from the persistent cache when the inputs
+    of a well-response pair did not change, and the cache is limited
+    to its maximum size"""
+    import yaml
+
+    from pycap.analysis_project import Project
+    from pycap.benchmarks import write_synthetic_project
+
+    ymlfile = tmp_path / "cached.yml"
+    write_synthetic_project(ymlfile, nwells=6, timeseries=False)
+    cache_dir = tmp_path / "result_cache"
+
+    def _run(**kwargs):
+        pycap.RESPONSE_CACHE.clear()
+        ap = Project(ymlfile, result_cache=cache_dir, **kwargs)
+        ap.aggregate_results()
+        return ap
+
+    ap = _run()
+    npairs = sum(
+        len(cw.stream_responses) + len(cw.drawdown_responses)
+        for cw in ap.wells.values()
+    )
+    assert (ap.result_cache_hits, ap.result_cache_misses) == (0, npairs)
+    ap2 = _run()
+    assert (ap2.result_cache_hits, ap2.result_cache_misses) == (npairs, 0)
+    assert np.allclose(
+        ap2.depletion_results.values, ap.depletion_results.values
+    )
+    assert np.allclose(
+        ap2.drawdown_results.values, ap.drawdown_results.values
+    )
+
+    # only the responses of an edited well are evaluated again
+    with open(ymlfile) as ifp:
+        d = yaml.safe_load(ifp)
+    d["well1"]["Q"] *= 2
+    with open(ymlfile, "w") as ofp:
+        yaml.safe_dump(d, ofp, sort_keys=False)
+    nedited = len(ap.wells["well1"].stream_responses) + len(
+        ap.wells["well1"].drawdown_responses
+    )
+    ap3 = _run(n_workers=2)
+    assert ap3.result_cache_misses == nedited
+    assert ap3.result_cache_hits == npairs - nedited
+    ap.wells["well1"].Q = ap.wells["well1"].Q * 2
+    ap.aggregate_results()
+    assert np.allclose(
+        ap3.depletion_results.values, ap.depletion_results.values
+    )
+
+    # least recently used results are removed
+    cache = pycap.ResultCache(tmp_path / "small", maxsize=0)
+    cache.put("ab", np.ones(10))
+    assert cache.get("ab") is None
+    size = pycap.ResultCache(cache_dir).info().currsize
+    assert size > 0
+    cache = pycap.ResultCache(cache_dir, maxsize=size // 2)
+    assert 0 < cache.info().currsize <= size // 2
+    cache.clear()
+    assert cache.info().currsize == 0
+    with pytest.raises(pycap.PycapException):
+        pycap.ResultCache(cache_dir, maxsize=-1)
+
+    # pumping schedules are digested from their contents, including
+    # labels of an object index, so keys are the same in every process
+    import subprocess
+    import sys
+
+    from pycap.result_cache import _digest_Q
+
+    code = (
+        "import pandas as pd; from pycap.result_cache import _digest_Q; "
+        + "print(_digest_Q(pd.Series([1.0, 2.0], index=['in', 'out'])))"
+    )
+    labels = ["".join(["i", "n"]), "".join(["o", "u", "t"])]
+    digest = _digest_Q(pd.Series([1.0, 2.0], index=labels))
+    other = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(pycap.__file__).parent.parent,
+    )
+    assert other.stdout.strip() == digest
+    assert digest != _digest_Q(pd.Series([1.0, 2.0], index=["in", "on"]))
+
+
+def test_batch(tmp_path):
+    """A batch of Projects writes the output of each Project and a
+    summary, reporting failed Projects without stopping"""
+    from pycap.batch import SUMMARY_COLUMNS, find_ymlfiles, run_batch
+    from pycap.benchmarks import write_synthetic_project
+
+    for i in range(3):
+        write_synthetic_project(
+            tmp_path / f"permit{i}.yml", nwells=3 + i, timeseries=False
+        )
+    with open(tmp_path / "broken.yml", "w") as ofp:
+        ofp.write("not_a_project: true\n")
+    ymlfiles = find_ymlfiles(tmp_path)
+    assert [i.name for i in ymlfiles] == [
+        "broken.yml",
+        "permit0.yml",
+        "permit1.yml",
+        "permit2.yml",
+    ]
+    with open(tmp_path / "manifest.txt", "w") as ofp:
+        ofp.write("# nightly permits\npermit1.yml\n\npermit0.yml\n")
+    assert find_ymlfiles(tmp_path / "manifest.txt") == [
+        tmp_path / "permit1.yml",
+        tmp_path / "permit0.yml",
+    ]
+
+    for n_workers in (1, 2):
+        summary = run_batch(
+            tmp_path,
+            n_workers=n_workers,
+            result_cache=tmp_path / "cache",
+            filename=tmp_path / "summary.csv",
+        )
+        assert list(summary.columns) == SUMMARY_COLUMNS
+        assert list(summary.status) == ["failed", "ok", "ok", "ok"]
+        assert list(summary.nwells[1:]) == [3, 4, 5]
+        assert isinstance(summary.error[0], str)
+        assert (tmp_path / "summary.csv").exists()
+        for i in range(3):
+            assert (
+                tmp_path / "output" / f"permit{i}.table_report.csv"
+            ).exists()
+    # the second batch loads all of the results from the shared cache
+    assert (summary.results_evaluated[1:] == 0).all()
+    assert (summary.results_loaded[1:] > 0).all()
+
+
+def test_ensemble(tmp_path):
+    """An ensemble with fixed parameters reproduces the Project,
+    and percentiles of sampled parameters are reproducible"""
+    import scipy.stats
+
+    from pycap.analysis_project import Project
+    from pycap.benchmarks import write_synthetic_project
+
+    for depl_method in ("glover_depletion", "hunt_99_depletion"):
+        ymlfile = tmp_path / f"{depl_method}.yml"
+        write_synthetic_project(
+            ymlfile, nwells=5, nyears=2, depl_method=depl_method
+        )
+        ap = Project(ymlfile)
+        ap.aggregate_results()
+        ens = pycap.Ensemble.from_project(ap).run()
+        assert ens.nrealizations == 1
+        assert np.allclose(
+            ens.max_depletion[0],
+            [
+                np.max(ap.total_aggregated_sum_depletion[ck])
+                for ck in ens.stream_names
+            ],
+        )
+        assert np.allclose(
+            ens.drawdown[0],
+            [ap.total_aggregated_drawdown[ck] for ck in ens.drawdown_names],
+        )
+
+        kwargs = {
+            "T": scipy.stats.lognorm(0.3, scale=ap.T),
+            "S": np.linspace(0.05, 0.2, 50),
+            "nrealizations": 50,
+            "seed": 2,
+        }
+        if depl_method == "hunt_99_depletion":
+            kwargs["streambed_conductance"] = scipy.stats.uniform(0.5, 5)
+        pcts = pycap.Ensemble.from_project(ap, **kwargs).percentiles()
+        assert list(pcts["max_depletion"].columns) == ["P10", "P50", "P90"]
+        assert list(pcts["max_depletion"].index) == ens.stream_names
+        assert list(pcts["drawdown"].index) == ens.drawdown_names
+        assert np.all(np.diff(pcts["max_depletion"].values, axis=1) >= 0)
+        pcts2 = pycap.Ensemble.from_project(ap, **kwargs).percentiles()
+        assert pcts["max_depletion"].equals(pcts2["max_depletion"])
+
+    with pytest.raises(pycap.PycapException):
+        pycap.Ensemble.from_project(ap, T=scipy.stats.norm(1000, 10))
+    with pytest.raises(pycap.PycapException):
+        pycap.Ensemble(1000, 0.1, np.ones((2, 10)), depl_method="hunt_03")
+
+
+def test_gradients():
+    """Analytic gradients match central finite differences, for
+    the solutions and for responses to a pumping schedule"""
+    from pycap.solutions import GRADIENT_METHODS
+
+    time = np.array([0.0, 1.0, 10.0, 100.0, 1000.0])
+    for method, func in GRADIENT_METHODS.items():
+        pars = {"T": 1000.0, "S": 0.1, "time": time, "dist": 250.0, "Q": 2.0}
+        if method == "hunt_99_depletion":
+            pars["streambed_conductance"] = 5.0
+        solution = {**pycap.ALL_DD_METHODS, **pycap.ALL_DEPL_METHODS}[method]
+        value, jacobian = func(**pars)
+        assert np.array_equal(value, solution(**pars))
+        for par, deriv in jacobian.items():
+            h = pars[par] * 1e-6
+            fd = (
+                solution(**{**pars, par: pars[par] + h})
+                - solution(**{**pars, par: pars[par] - h})
+            ) / (2 * h)
+            assert np.allclose(deriv, fd, rtol=1e-5, atol=1e-12)
+        # scalars in, the return type of the solution out
+        value, jacobian = func(**{**pars, "time": 10.0})
+        single = solution(**{**pars, "time": 10.0})
+        assert type(value) is type(single)
+        assert np.shape(value) == np.shape(single)
+        assert all(
+            np.shape(v) == np.shape(single) for v in jacobian.values()
+        )
+
+    Q = Q2ts(90, 2, 1.0) * 100.0
+    for superposition in ("loop", "convolution"):
+        for depl_method in ("walton_depletion", "hunt_99_depletion"):
+            pars = {
+                "T": 1000.0,
+                "S": 0.1,
+                "dist": 300.0,
+                "streambed_conductance": 5.0,
+            }
+
+            def _response(**kwargs):
+                return pycap.WellResponse(
+                    "test",
+                    "stream",
+                    Q=Q,
+                    stream_apportionment=0.5,
+                    depl_method=depl_method,
+                    superposition=superposition,
+                    **kwargs,
+                )
+
+            value, jacobian = _response(**pars).gradient("depletion")
+            assert np.allclose(value, _response(**pars).depletion)
+            if depl_method == "walton_depletion":
+                assert "streambed_conductance" not in jacobian
+            for par, deriv in jacobian.items():
+                h = pars[par] * 1e-6
+                fd = (
+                    _response(**{**pars, par: pars[par] + h}).depletion
+                    - _response(**{**pars, par: pars[par] - h}).depletion
+                ) / (2 * h)
+                assert np.allclose(deriv, fd, rtol=1e-5, atol=1e-8)
+    wr = pycap.WellResponse(
+        "test", "well", T=1000.0, S=0.1, dist=300.0, Q=Q
+    )
+    value, jacobian = wr.gradient("drawdown")
+    assert np.allclose(value, wr.drawdown)
+    assert set(jacobian) == {"T", "S", "dist"}
+    with pytest.raises(pycap.PycapException):
+        pycap.WellResponse(
+            "test",
+            "stream",
+            T=1000.0,
+            S=0.1,
+            dist=300.0,
+            Q=Q,
+            depl_method="hunt_03_depletion",
+        ).gradient()
+
+
+def test_max_pumping_rates(tmp_path):
+    """The maximum rate of a proposed well meets the binding limit
+    when the Project is run again at that rate"""
+    import yaml
+
+    from pycap.analysis_project import Project
+    from pycap.benchmarks import write_synthetic_project
+
+    ymlfile = tmp_path / "capacity.yml"
+    write_synthetic_project(ymlfile, nwells=8, timeseries=False)
+    ap = Project(ymlfile)
+    ap.aggregate_results()
+    depl = ap.total_aggregated_max_depletion
+    dd = ap.total_aggregated_drawdown
+    # limits just above the current totals
+    depletion_limit = {ck: 1.5 * v for ck, v in depl.items()}
+    drawdown_limit = 1.2 * max(dd.values())
+    rates = ap.max_pumping_rates(
+        depletion_limit, drawdown_limit, include_pending=True
+    )
+    assert list(rates.index) == ap.proposed_wells
+    assert (rates.max_Q > 0).all()
+    assert set(rates.binding_type) <= {"depletion", "drawdown"}
+
+    cwell = rates.index[0]
+    binding = rates.loc[cwell]
+    with open(ymlfile) as ifp:
+        d = yaml.safe_load(ifp)
+    wellkey = [k for k in d if k.startswith("well") and d[k]["name"] == cwell]
+    d[wellkey[0]]["Q"] = float(binding.max_Q)
+    with open(ymlfile, "w") as ofp:
+        yaml.safe_dump(d, ofp, sort_keys=False)
+    ap2 = Project(ymlfile)
+    ap2.aggregate_results()
+    if binding.binding_type == "depletion":
+        total = ap2.total_aggregated_max_depletion[binding.binding_response]
+    else:
+        total = ap2.total_aggregated_drawdown[binding.binding_response]
+    assert np.isclose(total, binding.limit)
+    # every other limit is met
+    for ck, limit in depletion_limit.items():
+        assert ap2.total_aggregated_max_depletion[ck] <= limit * (1 + 1e-9)
+    for ck, v in ap2.total_aggregated_drawdown.items():
+        assert v <= drawdown_limit * (1 + 1e-9)
+
+    # percent of streamflow, and limits that are already exceeded
+    rates = ap.max_pumping_rates(
+        depletion_limit=50.0, streamflow={ck: 0.0 for ck in depl}
+    )
+    assert (rates.max_Q == 0).all()
+    rates = ap.max_pumping_rates(drawdown_limit={"not_a_response": 1.0})
+    assert np.isinf(rates.max_Q).all()
+    with pytest.raises(pycap.PycapException):
+        ap.max_pumping_rates(1.0, wells=[ap.existing_wells[0]])
@@ -1,9 +1,21 @@
 import sys
 
 import numpy as np
+import pandas as pd
 
 import pycap
 
+# methods available to superpose changes in pumping over time
+SUPERPOSITION_METHODS = ("loop", "convolution")
+
+
+def _hash_Q(Q):
+    """hash of the values and times of a pumping time series, used to
+    detect changes (including changes in place) to a pumping schedule"""
+    if isinstance(Q, (pd.Series, pd.DataFrame)):
+        return hash((np.asarray(Q.index).tobytes(), Q.to_numpy().tobytes()))
+    return hash(np.asarray(Q).tobytes())
+
 
 class WellResponse:
     """Class to facilitate depletion or drawdown calculations
@@ -42,6 +54,9 @@ class WellResponse:
         aquitard_K=None,
         x=None,
         y=None,
+        superposition="loop",
+        response_cache=None,
+        result_cache=None,
     ) -> None:
         """Class to calculate a single response for a single pumping well.
 
@@ -76,6 +91,21 @@ class WellResponse:
         streambed_conductance: float
             Streambed conductance for the hunt_99_depletion depletion method [L/T].
             Defaults to None
+        superposition: string, optional
+            Method used to superpose changes in pumping over time. 'loop'
+            calls the solution once for each change in pumping (image wells
+            in time). 'convolution' evaluates the unit-rate response once and
+            convolves it with the changes in pumping, which is much faster for
+            long, variable pumping schedules. Defaults to 'loop'.
+        response_cache: ResponseCache, optional
+            Cache of unit-rate step responses that is checked before
+            calling the solution. Defaults to None, which uses the cache
+            shared by the whole process, pycap.RESPONSE_CACHE.
+        result_cache: ResultCache, optional
+            Persistent cache of drawdown and depletion results on disk
+            that is checked before calculating a result, and stores
+            calculated results. Defaults to None, which does not use a
+            persistent cache.
 
         Additional Parameters Used by Hunt and Ward/Lough Solutions
         -----------------------------------------------------------
@@ -110,6 +140,11 @@ class WellResponse:
         aquitard_thick: float
             thickness of intervening leaky aquitard, [L]
         """
+        if superposition not in SUPERPOSITION_METHODS:
+            raise pycap.PycapException(
+                f"superposition must be one of {SUPERPOSITION_METHODS}, "
+                + f"not '{superposition}'"
+            )
         self._drawdown = None
         self._depletion = None
         self.name = name  # name of response (stream, or drawdown response
@@ -117,7 +152,6 @@ class WellResponse:
         self.response_type = response_type  # might use this later to
         # sort out which response to return
         self.T = T
-        self.T_gpd_ft = T * 7.48
         self.S = S
         self.dist = dist
         self.dd_method = dd_method
@@ -139,99 +173,234 @@ class WellResponse:
         self.aquitard_K = aquitard_K
         self.x = x
         self.y = y
-        self.extra_args = {
-            "streambed_conductance": streambed_conductance,
-            "Bprime": Bprime,
-            "Bdouble": Bdouble,
-            "sigma": sigma,
-            "width": width,
-            "T2": T2,
-            "S2": S2,
-            "streambed_thick": streambed_thick,
-            "streambed_K": streambed_K,
-            "aquitard_thick": aquitard_thick,
-            "aquitard_K": aquitard_K,
-            "x": x,
-            "y": y,
+        self.superposition = superposition
+        if response_cache is None:
+            response_cache = pycap.RESPONSE_CACHE
+        self.response_cache = response_cache
+        self.result_cache = result_cache
+        # inputs used for the cached drawdown and depletion results
+        self._signatures = {}
+
+    @property
+    def T_gpd_ft(self):
+        return self.T * 7.48
+
+    @property
+    def extra_args(self):
+        """extra values passed to the solutions"""
+        return {
+            "streambed_conductance": self.streambed_conductance,
+            "Bprime": self.Bprime,
+            "Bdouble": self.Bdouble,
+            "sigma": self.sigma,
+            "width": self.width,
+            "T2": self.T2,
+            "S2": self.S2,
+            "streambed_thick": self.streambed_thick,
+            "streambed_K": self.streambed_K,
+            "aquitard_thick": self.aquitard_thick,
+            "aquitard_K": self.aquitard_K,
+            "x": self.x,
+            "y": self.y,
         }
 
-    def _calc_drawdown(self):
-        """calculate drawdown at requested distance and
-        time using solution given as attribute to the object"""
-        dd_f = pycap.ALL_DD_METHODS[self.dd_method.lower()]
-        # start with zero drawdown
-        if "lough" not in self.dd_method.lower():
-            dd = np.zeros(len(self.Q))
-        else:
-            dd = np.zeros((len(self.Q), 2))
+    def _signature(self, response, hash_Q=_hash_Q):
+        """inputs that determine a response, either 'drawdown' or
+        'depletion', used to detect when a cached result is stale,
+        with the pumping schedule summarized by hash_Q"""
+        method, T = self._solution(response)
+        signature = (
+            method,
+            T,
+            self.S,
+            self.dist,
+            self.superposition,
+            tuple(self.extra_args.items()),
+            hash_Q(self.Q),
+        )
+        if response == "depletion":
+            signature += (self.stream_apportionment,)
+        return signature
+
+    def _store(self, response, result):
+        """store a result for a response, either 'drawdown' or
+        'depletion', with the inputs used to calculate it"""
+        result = np.asarray(result)
+        # cached results are shared, so protect them from changes
+        result.setflags(write=False)
+        setattr(self, f"_{response}", result)
+        self._signatures[response] = self._signature(response)
+
+    def _cached(self, response, calc):
+        """cached result for a response, recalculated with calc
+        if there is no result or any of its inputs changed"""
+        if (
+            getattr(self, f"_{response}") is None
+            or self._signatures.get(response) != self._signature(response)
+        ):
+            if not self._load(response):
+                self._store(response, calc())
+                self._save(response)
+        return getattr(self, f"_{response}")
+
+    def _load(self, response):
+        """load a result for a response, either 'drawdown' or 'depletion',
+        from the persistent result cache, returning True if it was found"""
+        if self.result_cache is None:
+            return False
+        result = self.result_cache.get(self.result_cache.key(self, response))
+        if result is None:
+            return False
+        self._store(response, result)
+        return True
+
+    def _save(self, response):
+        """save the stored result for a response, either 'drawdown' or
+        'depletion', to the persistent result cache"""
+        if self.result_cache is not None:
+            self.result_cache.put(
+                self.result_cache.key(self, response),
+                getattr(self, f"_{response}"),
+            )
+
+    def clear_cache(self):
+        """Remove the cached drawdown and depletion results"""
+        self._drawdown = None
+        self._depletion = None
+        self._signatures = {}
+
+    def __getstate__(self):
+        """leave the response and result caches behind when pickled (e.g.
+        to send to a worker process), which uses its own process cache and
+        returns its results to be saved by the calling process"""
+        state = self.__dict__.copy()
+        state["response_cache"] = None
+        state["result_cache"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.response_cache is None:
+            self.response_cache = pycap.RESPONSE_CACHE
+
+    def _solution(self, response):
+        """solution name and transmissivity for a response, either
+        'drawdown' or 'depletion'"""
+        if response == "drawdown":
+            return self.dd_method.lower(), self.T
+        if self.depl_method.lower() == "walton_depletion":
+            # walton_depletion method (only) needs these goofy units of gpd/dt for T
+            return "walton_depletion", self.T_gpd_ft
+        return self.depl_method.lower(), self.T
+
+    def _cache_key(self, response):
+        """key of the unit-rate step response for a response,
+        either 'drawdown' or 'depletion', in the response cache"""
+        method, T = self._solution(response)
+        key, _ = self.response_cache._key(
+            method, T, self.S, self.dist, len(self.Q), self.extra_args
+        )
+        return key
+
+    def _unit_response(self, response):
+        """unit-rate step response on the full time axis, looked
+        up in the response cache before calling the solution"""
+        method, T = self._solution(response)
+        return self.response_cache.unit_response(
+            method, T, self.S, self.dist, len(self.Q), **self.extra_args
+        )
+
+    def _superpose(self, unit_response):
+        """superpose the unit-rate step response for all of the
+        changes in pumping using the superposition method"""
+        if self.superposition == "convolution":
+            return pycap.solutions._superpose_unit_response(
+                unit_response, self.Q
+            )
+        # start with zero response
+        response = np.zeros_like(unit_response)
         deltaQ = pycap._calc_deltaQ(self.Q.copy())
         # initialize with pumping at the first time being positive
         idx = deltaQ.index[0] - 1
-        cQ = deltaQ.iloc[0]
-        ct = list(range(idx, len(self.Q)))
-        dd[idx:] = dd_f(self.T, self.S, ct, self.dist, cQ, **self.extra_args)
+        response[idx:] = deltaQ.iloc[0] * unit_response[idx:]
         if len(deltaQ) > 1:
             deltaQ = deltaQ.iloc[1:]
             for idx, cQ in zip(deltaQ.index, deltaQ.values):
                 idx -= 2
-                ct = list(range(len(self.Q) - idx))
-                # note that by setting Q negative from the diff calculations, we always add
-                # below for the image wells
-                dd[idx:] += dd_f(
-                    self.T, self.S, ct, self.dist, cQ, **self.extra_args
-                )
-        return dd
+                # note that by setting Q negative from the diff
+                # calculations, we always add below for the image wells
+                response[idx:] += cQ * unit_response[: len(self.Q) - idx]
+        return response
+
+    def _calc_drawdown(self):
+        """calculate drawdown at requested distance and
+        time using solution given as attribute to the object"""
+        return self._superpose(self._unit_response("drawdown"))
 
     def _calc_depletion(self):
         """calculate streamflow depletion at
         time using solution given as attribute to the object"""
-        depl_f = pycap.ALL_DEPL_METHODS[self.depl_method.lower()]
-        # start with zero depletion
-        depl = np.zeros(len(self.Q))
+        return self.stream_apportionment * self._superpose(
+            self._unit_response("depletion")
+        )
 
-        deltaQ = pycap._calc_deltaQ(self.Q.copy())
+    def gradient(self, response="depletion"):
+        """Drawdown or depletion for the whole pumping schedule and its
+        partial derivatives with respect to the aquifer parameters
 
-        # initialize with pumping at the first time being positive
-        idx = deltaQ.index[0] - 1
-        cQ = deltaQ.iloc[0]
-        ct = list(range(idx, len(self.Q)))
-        if self.depl_method.lower() == "walton_depletion":
-            # walton_depletion method (only) needs these goofy units of gpd/dt for T
-            T = self.T_gpd_ft
-        else:
-            T = self.T
-        depl[idx:] = depl_f(
+        The unit-rate step response and its partial derivatives come from
+        one evaluation of the analytic gradient of the solution (see
+        pycap.solutions.GRADIENT_METHODS), and all of them are superposed
+        for the changes in pumping like the response itself.
+
+        Parameters
+        ----------
+        response: string, optional
+            either 'drawdown' or 'depletion'. Defaults to 'depletion'.
+
+        Returns
+        -------
+        gradient: pycap.solutions.Gradient
+            named tuple of the response for each time (value) and a
+            dictionary (jacobian) of its partial derivatives for each time
+            with respect to 'T', 'S', 'dist' and, for hunt_99_depletion,
+            'streambed_conductance'. The derivative with respect to T is
+            per ft**2/day, also for walton_depletion.
+        """
+        method, T = self._solution(response)
+        if method not in pycap.solutions.GRADIENT_METHODS:
+            raise pycap.PycapException(
+                f"no analytic gradient for {method}.\nMust be one of "
+                + f"{list(pycap.solutions.GRADIENT_METHODS.keys())}"
+            )
+        unit = pycap.solutions.GRADIENT_METHODS[method](
             T,
             self.S,
-            ct,
+            list(range(len(self.Q))),
             self.dist,
-            cQ * self.stream_apportionment,
+            1.0,
             **self.extra_args,
         )
-        if len(deltaQ) > 1:
-            deltaQ = deltaQ.iloc[1:]
-            for idx, cQ in zip(deltaQ.index, deltaQ.values):
-                idx -= 2
-                ct = list(range(len(self.Q) - idx))
-                # note that by setting Q negative from the diff
-                # calculations, we always add below for the image wells
-                depl[idx:] += depl_f(
-                    T,
-                    self.S,
-                    ct,
-                    self.dist,
-                    cQ * self.stream_apportionment,
-                    **self.extra_args,
-                )
-        return depl
+        factor = 1.0
+        if response == "depletion":
+            factor = self.stream_apportionment
+        jacobian = {
+            k: factor * self._superpose(v) for k, v in unit.jacobian.items()
+        }
+        if method == "walton_depletion":
+            # chain rule for T in gpd/ft
+            jacobian["T"] = jacobian["T"] * 7.48
+        return pycap.solutions.Gradient(
+            factor * self._superpose(unit.value), jacobian
+        )
 
     @property
     def drawdown(self):
-        return self._calc_drawdown()
+        return self._cached("drawdown", self._calc_drawdown)
 
     @property
     def depletion(self):
-        return self._calc_depletion()
+        return self._cached("depletion", self._calc_depletion)
 
 
 class Well:
@@ -267,6 +436,9 @@ class Well:
         aquitard_K=None,
         x=None,
         y=None,
+        superposition="loop",
+        response_cache=None,
+        result_cache=None,
     ) -> None:
         """
         Object to evaluate a pending (or existing,
@@ -307,6 +479,15 @@ class Well:
         streambed_conductance: float
             Streambed conductance for the hunt_99_depletion depletion method [L/T].
             Defaults to None
+        superposition: string, optional
+            Method used to superpose changes in pumping over time, either
+            'loop' or 'convolution'. See WellResponse. Defaults to 'loop'.
+        response_cache: ResponseCache, optional
+            Cache of unit-rate step responses shared by the WellResponse
+            objects. Defaults to None, which uses pycap.RESPONSE_CACHE.
+        result_cache: ResultCache, optional
+            Persistent cache of results on disk shared by the WellResponse
+            objects. Defaults to None, which does not use a persistent cache.
 
         Additional Parameters Used by Hunt and Ward/Lough Solutions
         -----------------------------------------------------------
@@ -342,10 +523,6 @@ class Well:
             thickness of intervening leaky aquitard, [L]
         """
 
-        # placeholders for values returned with @property decorators
-        self._depletion = None
-        self._drawdown = None
-        self._max_depletion = None
         self.depl_method = depl_method
         self.drawdown_method = drawdown_method
         self.stream_dist = stream_dist
@@ -370,6 +547,9 @@ class Well:
         self.aquitard_K = aquitard_K
         self.x = x
         self.y = y
+        self.superposition = superposition
+        self.response_cache = response_cache
+        self.result_cache = result_cache
         self.stream_responses = {}  # dict of WellResponse objects
         # for this well with streams
         self.drawdown_responses = {}  # dict of WellResponse objects
@@ -408,6 +588,13 @@ class Well:
             self.drawdown_response_names = list(self.drawdown_dist.keys())
 
         # now make all the WellResponse objects
+        self._create_responses()
+
+    def _create_responses(self):
+        """make all the WellResponse objects for the well, which
+        also removes any cached results"""
+        self.stream_responses = {}
+        self.drawdown_responses = {}
         # first for streams
         extra_args = {
             "Bprime": self.Bprime,
@@ -422,6 +609,9 @@ class Well:
             "aquitard_K": self.aquitard_K,
             "x": self.x,
             "y": self.y,
+            "superposition": self.superposition,
+            "response_cache": self.response_cache,
+            "result_cache": self.result_cache,
         }
         if self.stream_dist is not None:
             for cs, (cname, cdist) in enumerate(self.stream_dist.items()):
@@ -459,26 +649,329 @@ class Well:
                     dd_method=self.drawdown_method,
                     **extra_args,
                 )
+        # inputs used to create the responses
+        self._input_signature = self._signature()
+
+    def _signature(self):
+        """inputs that determine the responses of the well, used to
+        detect when the responses and their cached results are stale"""
+
+        def _freeze(value):
+            if isinstance(value, dict):
+                return tuple(sorted(value.items()))
+            return value
+
+        return (
+            self.T,
+            self.S,
+            _hash_Q(self.Q),
+            self.theis_dd_days,
+            self.depl_pump_time,
+            self.depl_method,
+            self.drawdown_method,
+            _freeze(self.stream_dist),
+            _freeze(self.drawdown_dist),
+            _freeze(self.stream_apportionment),
+            _freeze(self.streambed_conductance),
+            self.Bprime,
+            self.Bdouble,
+            self.sigma,
+            self.width,
+            self.T2,
+            self.S2,
+            self.streambed_thick,
+            self.streambed_K,
+            self.aquitard_thick,
+            self.aquitard_K,
+            self.x,
+            self.y,
+            self.superposition,
+        )
+
+    def _update_responses(self):
+        """recreate the responses if any of the inputs of the well changed"""
+        if self._signature() != self._input_signature:
+            self._create_responses()
+
+    def clear_cache(self):
+        """Remove the cached drawdown and depletion results
+        of all the responses of the well"""
+        for cwob in list(self.stream_responses.values()) + list(
+            self.drawdown_responses.values()
+        ):
+            cwob.clear_cache()
 
     @property
     def drawdown(self):
-        if self._drawdown is None:
-            self._drawdown = {}
-            for cw, cwob in self.drawdown_responses.items():
-                self._drawdown[cwob.name] = cwob.drawdown
-        return self._drawdown
+        self._update_responses()
+        return {
+            cwob.name: cwob.drawdown
+            for _, cwob in self.drawdown_responses.items()
+        }
 
     @property
     def depletion(self):
-        self._depletion = {}
-        for _, cwob in self.stream_responses.items():
-            self._depletion[cwob.name] = cwob.depletion
-
-        return self._depletion
+        self._update_responses()
+        return {
+            cwob.name: cwob.depletion
+            for _, cwob in self.stream_responses.items()
+        }
 
     @property
     def max_depletion(self):
+        self._update_responses()
         return {
             cwob.name: np.nanmax(cwob.depletion)
             for _, cwob in self.stream_responses.items()
         }
+
+
+# solutions that broadcast over arrays of all of their arguments,
+# so a WellField evaluates them for many wells and responses at once
+BROADCAST_METHODS = (
+    "theis_drawdown",
+    "glover_depletion",
+    "walton_depletion",
+    "hunt_99_depletion",
+)
+# maximum number of (well, response, time) values evaluated at once
+_WELLFIELD_CHUNK = 2**22
+
+
+class WellField:
+    """Array-backed drawdown and depletion for many wells and responses
+
+    A WellField holds the pumping schedules of many wells and the
+    distances to many responses as arrays, and returns drawdown and
+    depletion as dense (wells x responses x times) arrays. Solutions that
+    broadcast are evaluated for a block of wells and responses in a single
+    call, and the changes in pumping are superposed for all pairs at once
+    by convolution, so no Python object is created per well-response pair.
+
+    """
+
+    def __init__(
+        self,
+        T,
+        S,
+        Q,
+        drawdown_dist=None,
+        stream_dist=None,
+        well_xy=None,
+        drawdown_xy=None,
+        stream_xy=None,
+        stream_apportionment=None,
+        streambed_conductance=None,
+        dd_method="theis_drawdown",
+        depl_method="glover_depletion",
+        response_cache=None,
+        **kwargs,
+    ) -> None:
+        """Array-backed drawdown and depletion for many wells and responses
+
+        Parameters
+        ----------
+        T: float or np.array
+            Aquifer Transmissivity [L**2/T], scalar or one per well
+        S: float or np.array
+            Aquifer Storage [unitless], scalar or one per well
+        Q: np.array
+            Pumping schedules with shape (nwells, ntimes), with one rate
+            for each sequential day starting at day 1 [L**3/T]
+        drawdown_dist: np.array, optional
+            Distances between wells and drawdown responses with shape
+            (nwells, ndrawdown) [L]. Calculated from well_xy and
+            drawdown_xy if not given.
+        stream_dist: np.array, optional
+            Distances between wells and stream responses with shape
+            (nwells, nstreams) [L]. Calculated from well_xy and
+            stream_xy if not given.
+        well_xy: np.array, optional
+            Projected x, y coordinates of the wells with shape (nwells, 2) [L]
+        drawdown_xy: np.array, optional
+            Projected x, y coordinates of the drawdown responses
+            with shape (ndrawdown, 2) [L]
+        stream_xy: np.array, optional
+            Projected x, y coordinates of the closest point on each stream
+            with shape (nstreams, 2) [L]
+        stream_apportionment: float or np.array, optional
+            Fraction of depletion attributed to each stream, broadcast to
+            (nwells, nstreams). Defaults to None, which is 1.0 for all pairs.
+        streambed_conductance: float or np.array, optional
+            Streambed conductance for the Hunt depletion methods [L/T],
+            broadcast to (nwells, nstreams). Defaults to None.
+        dd_method: string, optional
+            Method to be used for drawdown calculations. Only
+            'theis_drawdown' is available. Defaults to 'theis_drawdown'.
+        depl_method: string, optional
+            Method to be used for depletion calculations.
+            Defaults to 'glover_depletion'.
+        response_cache: ResponseCache, optional
+            Cache of unit-rate step responses used for the solutions that
+            do not broadcast, which are evaluated for one pair at a time.
+            Defaults to None, which uses pycap.RESPONSE_CACHE.
+        **kwargs: extra scalar values required by the depletion method
+            (e.g. Bprime, Bdouble, sigma, width, aquitard_K)
+        """
+        if dd_method.lower() != "theis_drawdown":
+            raise pycap.PycapException(
+                "'theis_drawdown' must be used as drawdown method in WellField"
+            )
+        if depl_method.lower() not in pycap.ALL_DEPL_METHODS:
+            raise pycap.PycapException(
+                f"depletion method {depl_method} not recognized.\n"
+                + f"Must be one of {list(pycap.ALL_DEPL_METHODS.keys())}"
+            )
+        self.Q = np.atleast_2d(np.asarray(Q, dtype=float))
+        self.nwells, self.ntimes = self.Q.shape
+        self.T = self._broadcast("T", T, (self.nwells,))
+        self.S = self._broadcast("S", S, (self.nwells,))
+        self.drawdown_dist = self._distances(
+            "drawdown", drawdown_dist, well_xy, drawdown_xy
+        )
+        self.stream_dist = self._distances(
+            "stream", stream_dist, well_xy, stream_xy
+        )
+        self.stream_apportionment = None
+        self.streambed_conductance = None
+        if self.stream_dist is not None:
+            if stream_apportionment is None:
+                stream_apportionment = 1.0
+            self.stream_apportionment = self._broadcast(
+                "stream_apportionment",
+                stream_apportionment,
+                self.stream_dist.shape,
+            )
+            if streambed_conductance is not None:
+                self.streambed_conductance = self._broadcast(
+                    "streambed_conductance",
+                    streambed_conductance,
+                    self.stream_dist.shape,
+                )
+        self.dd_method = dd_method.lower()
+        self.depl_method = depl_method.lower()
+        if response_cache is None:
+            response_cache = pycap.RESPONSE_CACHE
+        self.response_cache = response_cache
+        self.extra_args = kwargs
+
+    @staticmethod
+    def _broadcast(name, value, shape):
+        """broadcast a parameter to the shape it needs for the wells
+        and responses, raising a PycapException if it cannot"""
+        try:
+            return np.broadcast_to(np.asarray(value, dtype=float), shape)
+        except ValueError:
+            raise pycap.PycapException(
+                f"{name} with shape {np.shape(value)} cannot be "
+                + f"broadcast to shape {shape} in WellField"
+            )
+
+    def _distances(self, name, dist, well_xy, response_xy):
+        """distances between wells and responses, either as given
+        or calculated from projected coordinates"""
+        if dist is not None:
+            return self._broadcast(
+                f"{name}_dist", dist, (self.nwells, np.shape(dist)[-1])
+            )
+        if response_xy is None:
+            return None
+        if well_xy is None:
+            raise pycap.PycapException(
+                f"well_xy is required to calculate {name} distances"
+            )
+        well_xy = self._broadcast("well_xy", well_xy, (self.nwells, 2))
+        response_xy = np.atleast_2d(np.asarray(response_xy, dtype=float))
+        return np.hypot(
+            well_xy[:, None, 0] - response_xy[None, :, 0],
+            well_xy[:, None, 1] - response_xy[None, :, 1],
+        )
+
+    def _unit_responses(self, method, T, S, dist, streambed_conductance):
+        """unit-rate step responses for a block of wells with shape
+        (nwells, nresponses, ntimes)"""
+        func = {**pycap.ALL_DD_METHODS, **pycap.ALL_DEPL_METHODS}[method]
+        shape = dist.shape + (self.ntimes,)
+        if method in BROADCAST_METHODS:
+            kwargs = dict(self.extra_args)
+            if streambed_conductance is not None:
+                kwargs["streambed_conductance"] = streambed_conductance[
+                    ..., None
+                ]
+            unit = func(
+                T[:, None, None],
+                S[:, None, None],
+                np.arange(self.ntimes),
+                dist[..., None],
+                1.0,
+                **kwargs,
+            )
+            return np.broadcast_to(unit, shape)
+        # one pair at a time, through the response cache
+        unit = np.zeros(shape)
+        for i, j in np.ndindex(dist.shape):
+            kwargs = dict(self.extra_args)
+            if streambed_conductance is not None:
+                kwargs["streambed_conductance"] = streambed_conductance[i, j]
+            unit[i, j] = self.response_cache.unit_response(
+                method, T[i], S[i], dist[i, j], self.ntimes, **kwargs
+            )
+        return unit
+
+    def _calc_response(self, method, dist, factor, streambed_conductance):
+        """superpose the pumping schedules for all wells and responses,
+        evaluating blocks of wells to limit memory use"""
+        if dist is None:
+            return None
+        T = self.T
+        if method == "walton_depletion":
+            # walton_depletion method (only) needs these goofy units of gpd/dt for T
+            T = self.T * 7.48
+        nresp = dist.shape[1]
+        response = np.zeros((self.nwells, nresp, self.ntimes))
+        chunk = max(1, _WELLFIELD_CHUNK // max(nresp * self.ntimes, 1))
+        for start in range(0, self.nwells, chunk):
+            w = slice(start, start + chunk)
+            unit = self._unit_responses(
+                method,
+                T[w],
+                self.S[w],
+                dist[w],
+                None
+                if streambed_conductance is None
+                else streambed_conductance[w],
+            )
+            response[w] = pycap.solutions._superpose_schedules(
+                self.Q[w], unit
+            )
+        if factor is not None:
+            response *= factor[..., None]
+        return response
+
+    @property
+    def drawdown(self):
+        """drawdown with shape (nwells, ndrawdown, ntimes), or
+        None if there are no drawdown responses"""
+        return self._calc_response(
+            self.dd_method, self.drawdown_dist, None, None
+        )
+
+    @property
+    def depletion(self):
+        """depletion with shape (nwells, nstreams, ntimes), or
+        None if there are no stream responses"""
+        return self._calc_response(
+            self.depl_method,
+            self.stream_dist,
+            self.stream_apportionment,
+            self.streambed_conductance,
+        )
+
+    @property
+    def max_depletion(self):
+        """maximum depletion over time with shape (nwells, nstreams),
+        or None if there are no stream responses"""
+        depletion = self.depletion
+        if depletion is None:
+            return None
+        return np.nanmax(depletion, axis=-1)
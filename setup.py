@@ -18,6 +18,11 @@ setuptools.setup(
                     "rasterio>=1.0", "rasterstats", "shapely", "rtree",
                     "pyproj>=2.0", "pyshp", "xlrd",
                     "openpyxl", "requests", "pytest"],
+    extras_require={
+        "numba": ["numba"],
+        "arrow": ["pyarrow"],
+        "store": ["pyarrow", "xarray", "netcdf4", "zarr"],
+    },
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: CC0 1.0 Universal (CC0 1.0) Public Domain Dedication",